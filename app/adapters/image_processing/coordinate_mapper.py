@@ -1,38 +1,12 @@
-from math import asin, atan2, cos, pi, radians, sin
+from functools import lru_cache
+from math import cos, radians, sin
 
 import numpy as np
 
 
-def perspective_bbox_to_equirectangular(
-    bbox: list,  # [xmin, ymin, xmax, ymax] in view coords
-    w_out: int,
-    h_out: int,
-    yaw: float,
-    pitch: float,
-    fov: float,
-    w_eq: int,
-    h_eq: int,
-) -> list:
-    """
-    Converts the perspective view bbox to an equirectangular image bbox.
-
-    Returns [xmin_eq, ymin_eq, xmax_eq, ymax_eq] in equirectangular pixels.
-    """
-
-    # Auxiliary function: from pixel to 3D vector in perspective camera
-    def pixel_to_dir(x, y):
-        fov_rad = radians(fov)
-        # Normalize pixel to [-1,1]
-        nx = (x / w_out) * 2 - 1
-        ny = 1 - (y / h_out) * 2
-
-        # Calculate direction in local camera (using fov)
-        focal = 1 / np.tan(fov_rad / 2)
-        dir_cam = np.array([nx, ny, focal])
-        dir_cam /= np.linalg.norm(dir_cam)
-        return dir_cam
-
-    # Rotation matrices
+@lru_cache(maxsize=256)
+def view_rotation_matrix(yaw: float, pitch: float) -> np.ndarray:
+    """Camera to world rotation of a perspective view. Cached and read-only."""
     yaw_rad = radians(yaw)
     pitch_rad = radians(pitch)
 
@@ -49,33 +23,157 @@ def perspective_bbox_to_equirectangular(
     )
 
     R = Rx @ Ry
+    R.setflags(write=False)
+    return R
+
+
+def _rotation_matrices(yaw, pitch, n: int) -> np.ndarray:
+    """Returns an (n, 3, 3) stack with the rotation matrix of each box's view."""
+    yaws = np.broadcast_to(np.asarray(yaw, dtype=float), (n,))
+    pitches = np.broadcast_to(np.asarray(pitch, dtype=float), (n,))
+
+    views, inverse = np.unique(
+        np.stack([yaws, pitches], axis=1), axis=0, return_inverse=True
+    )
+    matrices = np.stack([view_rotation_matrix(float(y), float(p)) for y, p in views])
+    return matrices[inverse.reshape(-1)]
+
+
+def _contains_pole(
+    R: np.ndarray, bboxes: np.ndarray, w_out, h_out, focal, pole_y: float
+) -> np.ndarray:
+    """Whether the world pole (0, pole_y, 0) projects inside each view bbox."""
+    # Pole direction in camera coordinates: R.T @ (0, pole_y, 0)
+    pole_cam = R[:, 1, :] * pole_y
+    in_front = pole_cam[:, 2] > 1e-9
+    z = np.where(in_front, pole_cam[:, 2], 1)
+
+    nx = pole_cam[:, 0] * focal / z
+    ny = pole_cam[:, 1] * focal / z
+    px = (nx + 1) / 2 * w_out
+    py = (1 - ny) / 2 * h_out
+
+    return (
+        in_front
+        & (bboxes[:, 0] <= px)
+        & (px <= bboxes[:, 2])
+        & (bboxes[:, 1] <= py)
+        & (py <= bboxes[:, 3])
+    )
+
+
+def perspective_bboxes_to_equirectangular(
+    bboxes,  # (N, 4) [xmin, ymin, xmax, ymax] in view coords
+    w_out,
+    h_out,
+    yaw,
+    pitch,
+    fov,
+    w_eq: int,
+    h_eq: int,
+    edge_samples: int = 8,
+) -> np.ndarray:
+    """
+    Converts N perspective view bboxes to equirectangular image bboxes at once.
 
-    # Convert each corner of the bbox to equirectangular coordinates
-    corners = [
-        (bbox[0], bbox[1]),  # xmin, ymin
-        (bbox[2], bbox[1]),  # xmax, ymin
-        (bbox[2], bbox[3]),  # xmax, ymax
-        (bbox[0], bbox[3]),  # xmin, ymax
-    ]
+    The view parameters (w_out, h_out, yaw, pitch, fov) are either scalars shared
+    by all boxes or (N,) arrays with the view of each box.
 
-    uv_points = []
-    for x, y in corners:
-        dir_cam = pixel_to_dir(x, y)
-        dir_world = R @ dir_cam
+    Box edges are straight lines in the view but curves in the panorama, so
+    edge_samples points are projected along each edge instead of only the
+    corners. Longitudes are unwrapped around the box center, so boxes crossing
+    the ±180° seam stay tight: they are returned with xmin in [0, w_eq) and
+    xmax > w_eq, meaning the box continues from 0 to xmax - w_eq. Boxes that
+    contain a pole span the full width and reach the top or bottom row.
 
-        lon = atan2(dir_world[0], dir_world[2])  # -pi .. pi
-        lat = asin(np.clip(dir_world[1], -1, 1))  # -pi/2 .. pi/2
+    Returns an (N, 4) array of [xmin_eq, ymin_eq, xmax_eq, ymax_eq] in
+    equirectangular pixels.
+    """
+    bboxes = np.asarray(bboxes, dtype=float).reshape(-1, 4)
+    n = len(bboxes)
+    if n == 0:
+        return np.empty((0, 4))
+
+    # Points along the perimeter of each bbox plus its center: (N, 4k + 1)
+    x0, y0, x1, y1 = np.split(bboxes, 4, axis=1)
+    t = np.linspace(0, 1, edge_samples, endpoint=False)
+    ones = np.ones_like(t)
+    xs = np.concatenate(
+        [x0 + (x1 - x0) * t, x1 * ones, x1 - (x1 - x0) * t, x0 * ones, (x0 + x1) / 2],
+        axis=1,
+    )
+    ys = np.concatenate(
+        [y0 * ones, y0 + (y1 - y0) * t, y1 * ones, y1 - (y1 - y0) * t, (y0 + y1) / 2],
+        axis=1,
+    )
+
+    # Normalize pixel to [-1,1]
+    w_out = np.broadcast_to(np.asarray(w_out, dtype=float), (n,))
+    h_out = np.broadcast_to(np.asarray(h_out, dtype=float), (n,))
+    nx = (xs / w_out[:, None]) * 2 - 1
+    ny = 1 - (ys / h_out[:, None]) * 2
+
+    # Calculate direction in local camera (using fov)
+    focal = 1 / np.tan(np.radians(np.asarray(fov, dtype=float)) / 2)
+    focal = np.broadcast_to(focal, (n,))
+    dir_cam = np.stack([nx, ny, np.broadcast_to(focal[:, None], nx.shape)], axis=-1)
+    dir_cam /= np.linalg.norm(dir_cam, axis=-1, keepdims=True)
+
+    R = _rotation_matrices(yaw, pitch, n)
+    dir_world = np.einsum("nij,nkj->nki", R, dir_cam)
+
+    lon = np.arctan2(dir_world[..., 0], dir_world[..., 2])  # -pi .. pi
+    lat = np.arcsin(np.clip(dir_world[..., 1], -1, 1))  # -pi/2 .. pi/2
 
-        u = (lon / (2 * pi) + 0.5) * w_eq
-        v = (0.5 - lat / pi) * h_eq
-        uv_points.append((u, v))
+    # Unwrap perimeter longitudes relative to the box center
+    lon_center = lon[:, -1:]
+    lon_delta = np.angle(np.exp(1j * (lon[:, :-1] - lon_center)))
+    lon_min = lon_center[:, 0] + lon_delta.min(axis=1)
+    lon_max = lon_center[:, 0] + lon_delta.max(axis=1)
 
-    u_coords = [p[0] for p in uv_points]
-    v_coords = [p[1] for p in uv_points]
+    u_min = (lon_min / (2 * np.pi) + 0.5) * w_eq
+    u_max = (lon_max / (2 * np.pi) + 0.5) * w_eq
+    shift = np.floor(u_min / w_eq) * w_eq
+    u_min -= shift
+    u_max = np.minimum(u_max - shift, u_min + w_eq)
 
-    xmin_eq = max(0, min(u_coords))
-    xmax_eq = min(w_eq, max(u_coords))
-    ymin_eq = max(0, min(v_coords))
-    ymax_eq = min(h_eq, max(v_coords))
+    v = (0.5 - lat / np.pi) * h_eq
+    v_min = np.maximum(0, v.min(axis=1))
+    v_max = np.minimum(h_eq, v.max(axis=1))
 
-    return [xmin_eq, ymin_eq, xmax_eq, ymax_eq]
+    north = _contains_pole(R, bboxes, w_out, h_out, focal, 1.0)
+    south = _contains_pole(R, bboxes, w_out, h_out, focal, -1.0)
+    around_pole = north | south
+    u_min[around_pole] = 0
+    u_max[around_pole] = w_eq
+    v_min[north] = 0
+    v_max[south] = h_eq
+
+    return np.stack([u_min, v_min, u_max, v_max], axis=1)
+
+
+def wraps_seam(bboxes_eq: np.ndarray, w_eq: int) -> np.ndarray:
+    """Whether each equirectangular bbox crosses the ±180° seam."""
+    return bboxes_eq[:, 2] > w_eq
+
+
+def perspective_bbox_to_equirectangular(
+    bbox: list,  # [xmin, ymin, xmax, ymax] in view coords
+    w_out: int,
+    h_out: int,
+    yaw: float,
+    pitch: float,
+    fov: float,
+    w_eq: int,
+    h_eq: int,
+) -> list:
+    """
+    Converts the perspective view bbox to an equirectangular image bbox.
+
+    Returns [xmin_eq, ymin_eq, xmax_eq, ymax_eq] in equirectangular pixels, with
+    xmax_eq > w_eq when the bbox crosses the ±180° seam.
+    """
+    bbox_eq = perspective_bboxes_to_equirectangular(
+        [bbox], w_out, h_out, yaw, pitch, fov, w_eq, h_eq
+    )
+    return bbox_eq[0].tolist()
@@ -0,0 +1,57 @@
+from io import BytesIO
+from math import ceil, cos, radians
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from app.entities.view_plan import ViewPlan
+
+# Reduction factors supported natively by the JPEG decoder
+REDUCED_COLOR_FLAGS = {
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+}
+
+
+class ImageDecodeError(ValueError):
+    pass
+
+
+def required_equirect_width(view_plan: ViewPlan) -> int:
+    """
+    Panorama width at which one equirectangular pixel covers no more than the
+    angle of any pixel of the plan's views. Pixels at the edges of a
+    perspective view cover cos²(fov / 2) of the angle of those at its center,
+    half of it at fov 90, so views of a narrower panorama are upsampled there.
+    """
+    half_fov = radians(view_plan.fov / 2)
+    return ceil(360 / view_plan.fov * view_plan.output_size[0] / cos(half_fov) ** 2)
+
+
+def decode_image(content: bytes, min_width: int = 0) -> np.ndarray:
+    """
+    Decodes an encoded image straight from memory. With min_width, decodes at
+    the largest reduction (1/2, 1/4, 1/8) that keeps the image at least
+    min_width pixels wide.
+
+    Raises ImageDecodeError, a ValueError, if the bytes are not a readable image.
+    """
+    flag = cv2.IMREAD_COLOR
+    if min_width:
+        try:
+            # Only reads the header
+            width, _ = Image.open(BytesIO(content)).size
+        except Exception as e:
+            raise ImageDecodeError(f"Could not decode image: {e}") from e
+
+        for factor, reduced_flag in REDUCED_COLOR_FLAGS.items():
+            if width // factor >= min_width:
+                flag = reduced_flag
+                break
+
+    img = cv2.imdecode(np.frombuffer(memoryview(content), dtype=np.uint8), flag)
+    if img is None:
+        raise ImageDecodeError("Could not decode image")
+    return img
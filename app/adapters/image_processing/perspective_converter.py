@@ -1,23 +1,35 @@
-from math import cos, radians, sin
-from typing import Tuple
+from functools import lru_cache
+from math import cos, radians, sin, tan
+from typing import Dict, Tuple
 
 import cv2
 import numpy as np
 
+from app.config import PERSPECTIVE_FIXED_POINT_MAPS, PERSPECTIVE_MAP_CACHE_SIZE
 
-def convert_to_perspective(
-    equirect_img: np.ndarray,
+
+@lru_cache(maxsize=PERSPECTIVE_MAP_CACHE_SIZE)
+def get_perspective_maps(
     yaw: float,
     pitch: float,
     fov: float,
     output_size: Tuple[int, int],
-) -> np.ndarray:
-    height, width = equirect_img.shape[:2]
+    equirect_size: Tuple[int, int],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Builds the cv2.remap lookup tables that project an equirectangular image of
+    equirect_size (width, height) to a perspective view.
+
+    The maps only depend on the arguments, so they are cached and shared between
+    calls; they are returned read-only.
+    """
+    width, height = equirect_size
     w_out, h_out = output_size
 
     # Create normalized 3D directions for each pixel
-    x = np.linspace(-1, 1, w_out)
-    y = np.linspace(-1, 1, h_out)
+    half_extent = tan(radians(fov) / 2)
+    x = np.linspace(-half_extent, half_extent, w_out)
+    y = np.linspace(-half_extent, half_extent, h_out)
     xv, yv = np.meshgrid(x, -y)
 
     zv = np.ones_like(xv)
@@ -57,6 +69,36 @@ def convert_to_perspective(
     map_x = u.astype(np.float32)
     map_y = v.astype(np.float32)
 
+    if PERSPECTIVE_FIXED_POINT_MAPS:
+        map_x, map_y = cv2.convertMaps(map_x, map_y, cv2.CV_16SC2)
+
+    map_x.setflags(write=False)
+    map_y.setflags(write=False)
+    return map_x, map_y
+
+
+def perspective_map_cache_info() -> Dict[str, int]:
+    info = get_perspective_maps.cache_info()
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "maxsize": info.maxsize or 0,
+        "currsize": info.currsize,
+    }
+
+
+def convert_to_perspective(
+    equirect_img: np.ndarray,
+    yaw: float,
+    pitch: float,
+    fov: float,
+    output_size: Tuple[int, int],
+) -> np.ndarray:
+    height, width = equirect_img.shape[:2]
+    map_x, map_y = get_perspective_maps(
+        yaw, pitch, fov, tuple(output_size), (width, height)
+    )
+
     result = cv2.remap(
         equirect_img,
         map_x,
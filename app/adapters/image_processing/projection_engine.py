@@ -0,0 +1,54 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.adapters.image_processing.perspective_converter import convert_to_perspective
+from app.config import PROJECTION_WORKERS
+
+# (yaw, pitch, fov, (w_out, h_out))
+ViewParams = Tuple[float, float, float, Tuple[int, int]]
+
+
+class ProjectionEngine:
+    """
+    Projects several perspective views of one equirectangular image concurrently.
+    cv2.remap releases the GIL, so the views run in parallel on a thread pool.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def project(
+        self, equirect_img: np.ndarray, view_params: List[ViewParams]
+    ) -> List[np.ndarray]:
+        """Returns the views in the order of view_params."""
+        if self.workers <= 1 or len(view_params) <= 1:
+            return [
+                convert_to_perspective(equirect_img, *params) for params in view_params
+            ]
+
+        executor = self._get_executor()
+        return list(
+            executor.map(
+                lambda params: convert_to_perspective(equirect_img, *params),
+                view_params,
+            )
+        )
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="projection"
+            )
+        return self._executor
+
+
+projection_engine = ProjectionEngine(PROJECTION_WORKERS)
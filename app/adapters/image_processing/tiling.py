@@ -0,0 +1,25 @@
+import math
+from typing import List, Tuple
+
+
+def tile_origins(
+    width: int, height: int, tile_size: int, overlap: float
+) -> List[Tuple[int, int]]:
+    """
+    Top-left corners of the fewest tile_size tiles covering a width x height
+    image with at least overlap (fraction of tile_size) between neighbours.
+    Tiles are spread evenly, so the last one ends at the image border.
+    """
+    return [
+        (x, y)
+        for y in _axis_origins(height, tile_size, overlap)
+        for x in _axis_origins(width, tile_size, overlap)
+    ]
+
+
+def _axis_origins(length: int, tile_size: int, overlap: float) -> List[int]:
+    if length <= tile_size:
+        return [0]
+    stride = tile_size * (1 - overlap)
+    n = math.ceil((length - tile_size) / stride) + 1
+    return [round(i * (length - tile_size) / (n - 1)) for i in range(n)]
@@ -0,0 +1,163 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+Labels = Tuple[Tuple[str, str], ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class _Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        idx = bisect_left(self.buckets, value)
+        if idx < len(self.buckets):
+            self.counts[idx] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    Minimal in-process counters, gauges and histograms, rendered in the
+    Prometheus text exposition format.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._types: Dict[str, str] = {}
+        self._values: Dict[Tuple[str, Labels], float] = {}
+        self._histograms: Dict[Tuple[str, Labels], _Histogram] = {}
+
+    def inc_counter(self, name: str, value: float = 1, **labels):
+        self._add(name, "counter", value, labels)
+
+    def set_counter(self, name: str, value: float, **labels):
+        """Exports a total kept by another component, which only ever grows."""
+        self._set(name, "counter", value, labels)
+
+    def add_gauge(self, name: str, delta: float, **labels):
+        self._add(name, "gauge", delta, labels)
+
+    def set_gauge(self, name: str, value: float, **labels):
+        self._set(name, "gauge", value, labels)
+
+    def observe(
+        self,
+        name: str,
+        value: float,
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+        **labels,
+    ):
+        key = (name, _labels_key(labels))
+        with self._lock:
+            self._types[name] = "histogram"
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram(buckets)
+            histogram.observe(value)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for name, metric_type in sorted(self._types.items()):
+                lines.append(f"# TYPE {name} {metric_type}")
+                if metric_type == "histogram":
+                    lines.extend(self._render_histograms(name))
+                else:
+                    for (value_name, labels), value in sorted(self._values.items()):
+                        if value_name == name:
+                            lines.append(f"{name}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def _set(self, name: str, metric_type: str, value: float, labels: Dict):
+        key = (name, _labels_key(labels))
+        with self._lock:
+            self._types[name] = metric_type
+            self._values[key] = value
+
+    def _add(self, name: str, metric_type: str, value: float, labels: Dict):
+        key = (name, _labels_key(labels))
+        with self._lock:
+            self._types[name] = metric_type
+            self._values[key] = self._values.get(key, 0) + value
+
+    def _render_histograms(self, name: str) -> Iterator[str]:
+        for (histogram_name, labels), histogram in sorted(self._histograms.items()):
+            if histogram_name != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                bucket_labels = labels + (("le", str(bound)),)
+                yield f"{name}_bucket{_format_labels(bucket_labels)} {cumulative}"
+            inf_labels = labels + (("le", "+Inf"),)
+            yield f"{name}_bucket{_format_labels(inf_labels)} {histogram.count}"
+            yield f"{name}_sum{_format_labels(labels)} {histogram.sum}"
+            yield f"{name}_count{_format_labels(labels)} {histogram.count}"
+
+
+def _labels_key(labels: Dict) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (key, value.replace("\\", "\\\\").replace('"', '\\"')) for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+metrics = MetricsRegistry()
+
+# Stage durations of the request being handled, for the per-request timing log.
+# Threads working for the request share its dict through a copied context.
+_request_stages_lock = threading.Lock()
+_request_stages: ContextVar[Optional[Dict[str, float]]] = ContextVar(
+    "request_stages", default=None
+)
+
+
+def start_request_stages():
+    _request_stages.set({})
+
+
+def request_stages() -> Dict[str, float]:
+    with _request_stages_lock:
+        return dict(_request_stages.get() or {})
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """
+    Times a pipeline stage: records it in the stage latency histogram, tracks it
+    in the in-flight gauge and adds it to the current request's timings.
+    """
+    metrics.add_gauge("stage_in_flight", 1, stage=stage)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics.add_gauge("stage_in_flight", -1, stage=stage)
+        record_stage(stage, elapsed)
+
+
+def record_stage(stage: str, elapsed: float):
+    """Records a stage timed elsewhere, e.g. in a model worker process."""
+    metrics.observe("stage_duration_seconds", elapsed, stage=stage)
+
+    stages = _request_stages.get()
+    if stages is not None:
+        with _request_stages_lock:
+            stages[stage] = stages.get(stage, 0) + elapsed
@@ -0,0 +1,125 @@
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from app.typing.detection_model import DetectionModel
+
+
+@dataclass
+class _PendingRequest:
+    model: DetectionModel
+    imgs: list
+    classes: List[int]
+    conf: float
+    future: Future = field(default_factory=Future)
+
+    def batch_key(self):
+        return (id(self.model), tuple(self.classes), self.conf)
+
+
+class MicroBatchScheduler:
+    """
+    Gathers images from concurrent predict calls for up to max_wait_ms or
+    max_batch_size images, runs each compatible group (same model, classes and
+    conf) through one model call and routes the results back to each caller.
+    A single call larger than max_batch_size runs on its own.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[DetectionModel, list, List[int], float], list],
+        max_batch_size: int,
+        max_wait_ms: float,
+    ):
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_ms / 1000
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        # Guards starting the worker and _batch_sizes, updated by the worker
+        self._lock = threading.Lock()
+        self._batch_sizes: Counter = Counter()
+        # Request that did not fit in the previous batch, only used by the worker
+        self._carry: Optional[_PendingRequest] = None
+
+    def predict(
+        self, model: DetectionModel, imgs: list, classes: List[int], conf: float
+    ):
+        """Blocks until the batch holding imgs ran; returns one result per image."""
+        self._ensure_started()
+        request = _PendingRequest(model, imgs, classes, conf)
+        self._queue.put(request)
+        return request.future.result()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            batch_sizes = dict(self._batch_sizes)
+        return {
+            "queue_depth": self._queue.qsize(),
+            "batches": sum(batch_sizes.values()),
+            "batch_size_histogram": dict(sorted(batch_sizes.items())),
+        }
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._work, name="micro-batch", daemon=True
+                )
+                self._thread.start()
+
+    def _work(self):
+        while True:
+            batch = self._collect()
+
+            groups: Dict[tuple, List[_PendingRequest]] = {}
+            for request in batch:
+                groups.setdefault(request.batch_key(), []).append(request)
+
+            for requests in groups.values():
+                self._run_group(requests)
+
+    def _collect(self) -> List[_PendingRequest]:
+        first = self._carry or self._queue.get()
+        self._carry = None
+        batch = [first]
+        n_images = len(first.imgs)
+        deadline = time.monotonic() + self.max_wait_s
+
+        while n_images < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if n_images + len(request.imgs) > self.max_batch_size:
+                self._carry = request
+                break
+            batch.append(request)
+            n_images += len(request.imgs)
+
+        return batch
+
+    def _run_group(self, requests: List[_PendingRequest]):
+        imgs = [img for request in requests for img in request.imgs]
+        head = requests[0]
+        try:
+            results = self.run_batch(head.model, imgs, head.classes, head.conf)
+        except Exception as e:
+            for request in requests:
+                request.future.set_exception(e)
+            return
+
+        with self._lock:
+            self._batch_sizes[len(imgs)] += 1
+        start = 0
+        for request in requests:
+            end = start + len(request.imgs)
+            request.future.set_result(results[start:end])
+            start = end
@@ -0,0 +1,106 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import psutil
+
+from app.adapters.object_detection.yolo_inference import load_model
+from app.config import MODEL_DEVICE, MODEL_PATH
+from app.typing.detection_model import DetectionModel
+
+
+@dataclass
+class LoadedModel:
+    model: DetectionModel
+    model_path: str
+    device: Optional[str]
+    load_time_s: float
+    rss_delta_bytes: int
+
+
+class ModelRegistry:
+    """
+    Loads each weights file once per process and hands out the shared instance,
+    keyed by (model_path, device).
+    """
+
+    def __init__(self):
+        self._models: Dict[Tuple[str, Optional[str]], LoadedModel] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self, model_path: str = MODEL_PATH, device: Optional[str] = MODEL_DEVICE
+    ) -> LoadedModel:
+        key = (model_path, device)
+        loaded = self._models.get(key)
+        if loaded is not None:
+            return loaded
+
+        with self._lock:
+            loaded = self._models.get(key)
+            if loaded is None:
+                loaded = self._load(model_path, device)
+                self._models[key] = loaded
+        return loaded
+
+    def register(
+        self,
+        model: DetectionModel,
+        model_path: str = MODEL_PATH,
+        device: Optional[str] = MODEL_DEVICE,
+    ):
+        """Serves an already built model for (model_path, device)."""
+        with self._lock:
+            self._models[(model_path, device)] = LoadedModel(
+                model=model,
+                model_path=model_path,
+                device=device,
+                load_time_s=0.0,
+                rss_delta_bytes=0,
+            )
+
+    def is_available(self, model_path: str) -> bool:
+        """Whether model_path can be served: its file exists or it is registered."""
+        if os.path.exists(model_path):
+            return True
+        return any(path == model_path for path, _ in list(self._models))
+
+    def stats(self) -> List[Dict]:
+        return [
+            {
+                "model_path": loaded.model_path,
+                "device": loaded.device,
+                "load_time_s": loaded.load_time_s,
+                "rss_delta_bytes": loaded.rss_delta_bytes,
+            }
+            for loaded in self._models.values()
+        ]
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+    @staticmethod
+    def _load(model_path: str, device: Optional[str]) -> LoadedModel:
+        process = psutil.Process()
+        rss_before = process.memory_info().rss
+        start = time.perf_counter()
+
+        model = load_model(model_path)
+        if device:
+            model.to(device)
+
+        load_time_s = time.perf_counter() - start
+        rss_delta_bytes = process.memory_info().rss - rss_before
+        return LoadedModel(
+            model=model,
+            model_path=model_path,
+            device=device,
+            load_time_s=load_time_s,
+            rss_delta_bytes=rss_delta_bytes,
+        )
+
+
+model_registry = ModelRegistry()
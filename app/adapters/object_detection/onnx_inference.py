@@ -0,0 +1,196 @@
+import ast
+import os
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+import onnxruntime
+import torch
+import torchvision
+
+from app.config import INFERENCE_THREADS
+
+# Same defaults as the ultralytics predictor, so both backends agree
+NMS_IOU_THRESHOLD = 0.7
+MAX_DETECTIONS = 300
+MAX_NMS_CANDIDATES = 30000
+LETTERBOX_COLOR = (114, 114, 114)
+
+
+class OnnxBoxes:
+    """Detections of one image, with the cls/conf/xyxy fields of ultralytics Boxes."""
+
+    def __init__(self, cls: np.ndarray, conf: np.ndarray, xyxy: np.ndarray):
+        self.cls = cls
+        self.conf = conf
+        self.xyxy = xyxy
+
+    def __len__(self) -> int:
+        return len(self.cls)
+
+    def __iter__(self):
+        for i in range(len(self.cls)):
+            j = i + 1
+            yield OnnxBoxes(self.cls[i:j], self.conf[i:j], self.xyxy[i:j])
+
+
+class OnnxResult:
+    def __init__(self, boxes: OnnxBoxes, names: Dict[int, str], orig_shape):
+        self.boxes = boxes
+        self.names = names
+        self.orig_shape = orig_shape
+
+
+class OnnxModel:
+    """
+    Runs a YOLO detection model exported with export_onnx on ONNX Runtime (CPU).
+
+    predict() follows the ultralytics contract used by yolo_inference: BGR images
+    in, one result per image out, each with boxes exposing cls, conf and xyxy in
+    the pixel coordinates of the input image. Preprocessing (letterbox) and
+    postprocessing (class-aware NMS) mirror the ultralytics predictor.
+    """
+
+    def __init__(self, model_path: str, threads: int = INFERENCE_THREADS):
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = (
+            onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        )
+        options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+        options.inter_op_num_threads = 1
+        if threads > 0:
+            options.intra_op_num_threads = threads
+
+        self.model_path = model_path
+        self.session = onnxruntime.InferenceSession(
+            model_path, options, providers=["CPUExecutionProvider"]
+        )
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        # Static exports take exactly one image per run
+        self.max_batch = (
+            model_input.shape[0] if isinstance(model_input.shape[0], int) else 0
+        )
+
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.names: Dict[int, str] = ast.literal_eval(metadata.get("names", "{}"))
+        imgsz = ast.literal_eval(metadata.get("imgsz", "[640, 640]"))
+        self.imgsz: Tuple[int, int] = (int(imgsz[0]), int(imgsz[1]))
+
+    def to(self, device: Optional[str]):
+        if device and device != "cpu":
+            raise ValueError(f"ONNX models only run on cpu, not {device}")
+        return self
+
+    def predict(self, img, conf=0.5, classes=None, **kwargs) -> List[OnnxResult]:
+        imgs = img if isinstance(img, list) else [img]
+        if not imgs:
+            return []
+
+        inputs, letterboxes = zip(*(self._letterbox(image) for image in imgs))
+        batch = np.stack(inputs)
+        step = self.max_batch or len(batch)
+        outputs = []
+        for start in range(0, len(batch), step):
+            end = start + step
+            outputs.append(
+                self.session.run(None, {self.input_name: batch[start:end]})[0]
+            )
+        predictions = np.concatenate(outputs)
+
+        return [
+            self._postprocess(prediction, image.shape, letterbox, conf, classes)
+            for prediction, image, letterbox in zip(predictions, imgs, letterboxes)
+        ]
+
+    def _letterbox(self, image: np.ndarray) -> Tuple[np.ndarray, Tuple]:
+        h, w = image.shape[:2]
+        new_h, new_w = self.imgsz
+        ratio = min(new_h / h, new_w / w)
+        resized_w, resized_h = round(w * ratio), round(h * ratio)
+        pad_w, pad_h = (new_w - resized_w) / 2, (new_h - resized_h) / 2
+
+        if (resized_w, resized_h) != (w, h):
+            image = cv2.resize(
+                image, (resized_w, resized_h), interpolation=cv2.INTER_LINEAR
+            )
+        top, bottom = round(pad_h - 0.1), round(pad_h + 0.1)
+        left, right = round(pad_w - 0.1), round(pad_w + 0.1)
+        image = cv2.copyMakeBorder(
+            image, top, bottom, left, right, cv2.BORDER_CONSTANT, value=LETTERBOX_COLOR
+        )
+
+        tensor = image[:, :, ::-1].transpose(2, 0, 1)
+        tensor = np.ascontiguousarray(tensor, dtype=np.float32) / 255
+        return tensor, (ratio, left, top)
+
+    def _postprocess(
+        self, prediction: np.ndarray, shape, letterbox: Tuple, conf, classes
+    ) -> OnnxResult:
+        end_to_end = prediction.shape[-1] == 6
+        if end_to_end:
+            # End-to-end exports already ran NMS: [x1, y1, x2, y2, conf, cls]
+            boxes = prediction[:, :4]
+            scores = prediction[:, 4]
+            class_ids = prediction[:, 5].astype(np.int64)
+        else:
+            # Raw detection head: (4 + classes, anchors) with cx, cy, w, h first
+            prediction = prediction.T
+            class_scores = prediction[:, 4:]
+            class_ids = class_scores.argmax(axis=1)
+            scores = class_scores[np.arange(len(class_ids)), class_ids]
+            cx, cy, bw, bh = prediction[:, :4].T
+            boxes = np.stack(
+                [cx - bw / 2, cy - bh / 2, cx + bw / 2, cy + bh / 2], axis=1
+            )
+
+        mask = scores > conf
+        if classes:
+            mask &= np.isin(class_ids, classes)
+        boxes, scores, class_ids = boxes[mask], scores[mask], class_ids[mask]
+
+        if not end_to_end and len(boxes):
+            order = scores.argsort()[::-1][:MAX_NMS_CANDIDATES]
+            boxes, scores, class_ids = boxes[order], scores[order], class_ids[order]
+            keep = torchvision.ops.batched_nms(
+                torch.from_numpy(np.ascontiguousarray(boxes)),
+                torch.from_numpy(np.ascontiguousarray(scores)),
+                torch.from_numpy(class_ids),
+                NMS_IOU_THRESHOLD,
+            ).numpy()[:MAX_DETECTIONS]
+            boxes, scores, class_ids = boxes[keep], scores[keep], class_ids[keep]
+
+        ratio, left, top = letterbox
+        h, w = shape[:2]
+        boxes = (boxes - [left, top, left, top]) / ratio
+        boxes = np.clip(boxes, 0, [w, h, w, h]).astype(np.float32)
+
+        return OnnxResult(
+            OnnxBoxes(class_ids.astype(np.float32), scores.astype(np.float32), boxes),
+            self.names,
+            shape[:2],
+        )
+
+
+def export_onnx(model_path: str, imgsz: int = 640, int8: bool = False) -> str:
+    """
+    Exports PyTorch YOLO weights to ONNX next to them, with a dynamic batch axis
+    so views can be batched. With int8 the weights are also quantized
+    (dynamic quantization, no calibration data needed) into <name>_int8.onnx.
+    Returns the path of the exported model.
+    """
+    from ultralytics import YOLO
+
+    onnx_path = YOLO(model_path).export(
+        format="onnx", imgsz=imgsz, dynamic=True, simplify=True
+    )
+    if not int8:
+        return onnx_path
+
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    root, ext = os.path.splitext(onnx_path)
+    int8_path = f"{root}_int8{ext}"
+    # ONNX Runtime's CPU ConvInteger kernel only takes unsigned 8-bit weights
+    quantize_dynamic(onnx_path, int8_path, weight_type=QuantType.QUInt8)
+    return int8_path
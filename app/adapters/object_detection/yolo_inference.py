@@ -1,20 +1,100 @@
+import threading
+import weakref
+from typing import Tuple
+
 import cv2
+import numpy as np
+import torch
 from ultralytics import YOLO
 
+from app.adapters.object_detection.batch_scheduler import MicroBatchScheduler
+from app.adapters.object_detection.onnx_inference import OnnxModel
+from app.config import MICROBATCH_ENABLED, MICROBATCH_MAX_IMAGES, MICROBATCH_MAX_WAIT_MS
+from app.typing.detection_model import DetectionModel
+
+# Ultralytics predictors are not thread safe, so calls on a shared model
+# instance are serialized per model.
+_model_locks: "weakref.WeakKeyDictionary[DetectionModel, threading.Lock]" = (
+    weakref.WeakKeyDictionary()
+)
+_model_locks_guard = threading.Lock()
 
-def load_model(model_path: str = "models/yolo11x.pt") -> YOLO:
+
+def load_model(model_path: str = "models/yolo11x.pt") -> DetectionModel:
+    """.onnx files run on ONNX Runtime, anything else on ultralytics."""
+    if model_path.endswith(".onnx"):
+        return OnnxModel(model_path)
     return YOLO(model_path)
 
 
-def predict(model: YOLO, img, classes=[], conf=0.5):
-    if classes:
-        return model.predict(img, classes=classes, conf=conf)
-    else:
-        return model.predict(img, conf=conf)
+def _model_lock(model: DetectionModel) -> threading.Lock:
+    with _model_locks_guard:
+        if model not in _model_locks:
+            _model_locks[model] = threading.Lock()
+        return _model_locks[model]
+
+
+def _predict_direct(model: DetectionModel, img, classes=[], conf=0.5):
+    with _model_lock(model):
+        if classes:
+            return model.predict(img, classes=classes, conf=conf)
+        else:
+            return model.predict(img, conf=conf)
+
+
+micro_batch_scheduler = MicroBatchScheduler(
+    _predict_direct, MICROBATCH_MAX_IMAGES, MICROBATCH_MAX_WAIT_MS
+)
+
+
+def predict(model: DetectionModel, img, classes=[], conf=0.5):
+    """
+    With MICROBATCH_ENABLED, images from concurrent calls are merged into shared
+    model calls by micro_batch_scheduler; results are the same either way.
+    """
+    if MICROBATCH_ENABLED:
+        imgs = img if isinstance(img, list) else [img]
+        return micro_batch_scheduler.predict(model, imgs, classes, conf)
+    return _predict_direct(model, img, classes, conf)
+
+
+def predict_batch(
+    model: DetectionModel, imgs: list, classes=[], conf=0.5, batch_size=12
+):
+    """
+    Runs predict over imgs in chunks of at most batch_size images per model call.
+    Returns one result per image, in input order.
+    """
+    results = []
+    for start in range(0, len(imgs), batch_size):
+        end = start + batch_size
+        results.extend(predict(model, imgs[start:end], classes, conf))
+    return results
+
+
+def result_columns(result) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Class ids, confidences and (N, 4) xyxy boxes of a result, as numpy arrays."""
+    boxes = result.boxes
+    return (
+        _to_numpy(boxes.cls).astype(np.int32),
+        _to_numpy(boxes.conf).astype(np.float32),
+        _to_numpy(boxes.xyxy).astype(np.float32).reshape(-1, 4),
+    )
+
+
+def _to_numpy(values) -> np.ndarray:
+    if isinstance(values, torch.Tensor):
+        return values.cpu().numpy()
+    return np.asarray(values)
 
 
 def predict_and_annotate(
-    model: YOLO, img, classes=[], conf=0.5, rectangle_thickness=2, text_thickness=1
+    model: DetectionModel,
+    img,
+    classes=[],
+    conf=0.5,
+    rectangle_thickness=2,
+    text_thickness=1,
 ):
     results = predict(model, img, classes, conf)
     for result in results:
@@ -0,0 +1,62 @@
+import numpy as np
+
+
+def equirect_boxes_to_sphere(boxes: np.ndarray, w_eq: int, h_eq: int):
+    """
+    Returns the unit direction of each equirectangular box center, shape (N, 3),
+    and its angular radius in radians, shape (N,).
+    """
+    cx = (boxes[:, 0] + boxes[:, 2]) / 2
+    cy = (boxes[:, 1] + boxes[:, 3]) / 2
+    lon = (cx / w_eq - 0.5) * 2 * np.pi
+    lat = (0.5 - cy / h_eq) * np.pi
+
+    centers = np.stack(
+        [np.cos(lat) * np.sin(lon), np.sin(lat), np.cos(lat) * np.cos(lon)], axis=1
+    )
+
+    # Longitude spans shrink with cos(lat) on the sphere
+    width_ang = (boxes[:, 2] - boxes[:, 0]) / w_eq * 2 * np.pi * np.cos(lat)
+    height_ang = (boxes[:, 3] - boxes[:, 1]) / h_eq * np.pi
+    radii = np.hypot(width_ang, height_ang) / 2
+
+    return centers, radii
+
+
+def spherical_deduplication(
+    boxes: np.ndarray,
+    scores: np.ndarray,
+    class_ids: np.ndarray,
+    w_eq: int,
+    h_eq: int,
+    distance_ratio: float = 0.75,
+) -> np.ndarray:
+    """
+    Greedy deduplication of detections of the same object seen from overlapping
+    views. Two detections of the same class are duplicates when the great-circle
+    distance between their centers is below distance_ratio times their mean
+    angular radius; the highest score one is kept.
+
+    Unlike DeepSORT it only uses geometry, so no appearance embeddings are
+    computed. Returns the indices of the kept boxes, sorted by decreasing score.
+    """
+    if len(boxes) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    centers, radii = equirect_boxes_to_sphere(boxes, w_eq, h_eq)
+    order = np.argsort(scores)[::-1]
+
+    keep = []
+    while order.size > 0:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+
+        cos_dist = np.clip(centers[rest] @ centers[i], -1, 1)
+        distance = np.arccos(cos_dist)
+        threshold = distance_ratio * (radii[i] + radii[rest]) / 2
+
+        duplicate = (class_ids[rest] == class_ids[i]) & (distance < threshold)
+        order = rest[~duplicate]
+
+    return np.array(keep, dtype=np.int64)
@@ -0,0 +1,88 @@
+import os
+
+# Model size served by default (n, s, m, l or x); requests may pick another one,
+# loaded from MODEL_DIR/yolo11<size>.pt. MODEL_PATH overrides the default model.
+MODEL_SIZE = os.getenv("MODEL_SIZE", "x")
+MODEL_DIR = os.getenv("MODEL_DIR", "models")
+MODEL_PATH = os.getenv("MODEL_PATH") or f"{MODEL_DIR}/yolo11{MODEL_SIZE}.pt"
+DETECTION_CONF = float(os.getenv("DETECTION_CONF", "0.5"))
+# Comma-separated COCO class ids, "all" for every class; empty detects the
+# furniture classes of CLASS_ID_TO_NAME
+DETECTION_CLASSES = os.getenv("DETECTION_CLASSES", "")
+# Tiled inference: views larger than TILE_SIZE are also sliced into overlapping
+# tiles (TILE_OVERLAP fraction), at most TILE_MAX_PER_IMAGE tiles per panorama
+TILED_INFERENCE = os.getenv("TILED_INFERENCE", "false").lower() == "true"
+TILE_SIZE = int(os.getenv("TILE_SIZE", "640"))
+TILE_OVERLAP = float(os.getenv("TILE_OVERLAP", "0.2"))
+TILE_MAX_PER_IMAGE = int(os.getenv("TILE_MAX_PER_IMAGE", "24"))
+# Adaptive view selection: "off", "stats" (skips views without image detail) or
+# "model" (skips views where a small model finds nothing)
+VIEW_SELECTION = os.getenv("VIEW_SELECTION", "off")
+VIEW_SELECTION_MIN_DETAIL = float(os.getenv("VIEW_SELECTION_MIN_DETAIL", "2.0"))
+VIEW_SELECTION_MODEL_SIZE = os.getenv("VIEW_SELECTION_MODEL_SIZE", "n")
+VIEW_SELECTION_CONF = float(os.getenv("VIEW_SELECTION_CONF", "0.1"))
+# Fraction of images whose skipped views still run, to measure the lost recall.
+# Audited results are cached, so cache hits for an image are not re-audited.
+VIEW_SELECTION_AUDIT_RATE = float(os.getenv("VIEW_SELECTION_AUDIT_RATE", "0"))
+MODEL_DEVICE = os.getenv("MODEL_DEVICE") or None
+WARMUP_MODEL = os.getenv("WARMUP_MODEL", "false").lower() == "true"
+# ONNX Runtime intra-op threads for .onnx models, 0 leaves the runtime default
+INFERENCE_THREADS = int(os.getenv("INFERENCE_THREADS", "0"))
+DETECTION_BATCH_SIZE = int(os.getenv("DETECTION_BATCH_SIZE", "12"))
+PERSPECTIVE_MAP_CACHE_SIZE = int(os.getenv("PERSPECTIVE_MAP_CACHE_SIZE", "64"))
+PERSPECTIVE_FIXED_POINT_MAPS = (
+    os.getenv("PERSPECTIVE_FIXED_POINT_MAPS", "false").lower() == "true"
+)
+# 0 uses one projection thread per CPU core
+PROJECTION_WORKERS = int(os.getenv("PROJECTION_WORKERS", "0"))
+VIEW_PLAN = os.getenv("VIEW_PLAN", "grid_12")
+DEDUP_MODE = os.getenv("DEDUP_MODE", "deepsort")
+DOWNLOAD_CONCURRENCY = int(os.getenv("DOWNLOAD_CONCURRENCY", "8"))
+DOWNLOAD_TIMEOUT = float(os.getenv("DOWNLOAD_TIMEOUT", "30"))
+DOWNLOAD_MAX_BYTES = int(os.getenv("DOWNLOAD_MAX_BYTES", str(100 * 1024 * 1024)))
+# Uploads are written to SCRATCH_UPLOAD_DIR for the duration of a request (or
+# job) and /preprocess views to SCRATCH_VIEWS_DIR; entries older than the TTL
+# are removed. REQUEST_MAX_BYTES caps a whole request body, UPLOAD_MAX_BYTES
+# each uploaded file.
+REQUEST_MAX_BYTES = int(os.getenv("REQUEST_MAX_BYTES", str(1024 * 1024 * 1024)))
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(100 * 1024 * 1024)))
+SCRATCH_UPLOAD_DIR = os.getenv("SCRATCH_UPLOAD_DIR", "temp_uploads")
+SCRATCH_UPLOAD_MAX_BYTES = int(
+    os.getenv("SCRATCH_UPLOAD_MAX_BYTES", str(2 * 1024 * 1024 * 1024))
+)
+SCRATCH_UPLOAD_TTL = float(os.getenv("SCRATCH_UPLOAD_TTL", "3600"))
+SCRATCH_VIEWS_DIR = os.getenv("SCRATCH_VIEWS_DIR", "output_views")
+SCRATCH_VIEWS_MAX_BYTES = int(
+    os.getenv("SCRATCH_VIEWS_MAX_BYTES", str(10 * 1024 * 1024 * 1024))
+)
+SCRATCH_VIEWS_TTL = float(os.getenv("SCRATCH_VIEWS_TTL", "86400"))
+# Writes are refused once the disk holding the scratch directories has less free
+SCRATCH_MIN_FREE_BYTES = int(
+    os.getenv("SCRATCH_MIN_FREE_BYTES", str(1024 * 1024 * 1024))
+)
+DECODE_REDUCED_RESOLUTION = (
+    os.getenv("DECODE_REDUCED_RESOLUTION", "true").lower() == "true"
+)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "16"))
+JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", "3600"))
+MICROBATCH_ENABLED = os.getenv("MICROBATCH_ENABLED", "false").lower() == "true"
+MICROBATCH_MAX_IMAGES = int(os.getenv("MICROBATCH_MAX_IMAGES", "32"))
+MICROBATCH_MAX_WAIT_MS = float(os.getenv("MICROBATCH_MAX_WAIT_MS", "10"))
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "256"))
+# Empty disables the on-disk tier
+RESULT_CACHE_DIR = os.getenv("RESULT_CACHE_DIR", "")
+RESULT_CACHE_DISK_MAX_BYTES = int(
+    os.getenv("RESULT_CACHE_DISK_MAX_BYTES", str(1024 * 1024 * 1024))
+)
+# 0 runs detection in the HTTP process; otherwise number of model worker processes
+MODEL_WORKERS = int(os.getenv("MODEL_WORKERS", "0"))
+# torch, ONNX Runtime and projection threads of each model worker, 0 splits the
+# CPU cores evenly between workers
+MODEL_WORKER_THREADS = int(os.getenv("MODEL_WORKER_THREADS", "0"))
+# Seconds a request waits for its model worker task before failing
+MODEL_WORKER_TIMEOUT = float(os.getenv("MODEL_WORKER_TIMEOUT", "300"))
+SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "5151"))
+SERVER_THREADS = int(os.getenv("SERVER_THREADS", "16"))
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -0,0 +1,88 @@
+import os
+from dataclasses import dataclass
+from typing import Optional, Tuple, Union
+
+from app.config import (
+    DETECTION_CLASSES,
+    DETECTION_CONF,
+    MODEL_DIR,
+    MODEL_PATH,
+    MODEL_SIZE,
+    TILED_INFERENCE,
+    VIEW_SELECTION,
+)
+from app.entities.class_names import CLASS_ID_TO_NAME
+
+MODEL_SIZES = ("n", "s", "m", "l", "x")
+VIEW_SELECTION_MODES = ("off", "stats", "model")
+
+
+@dataclass(frozen=True)
+class DetectionSettings:
+    model_path: str
+    conf: float
+    classes: Tuple[int, ...]  # Filter applied during inference, empty for all
+    tiled: bool = False
+    view_selection: str = "off"  # One of VIEW_SELECTION_MODES
+
+
+def model_path_for_size(model_size: str) -> str:
+    if model_size not in MODEL_SIZES:
+        raise ValueError(
+            f"Unknown model size: {model_size}. Available: {', '.join(MODEL_SIZES)}"
+        )
+    if model_size == MODEL_SIZE:
+        return MODEL_PATH
+    return os.path.join(MODEL_DIR, f"yolo11{model_size}.pt")
+
+
+def parse_classes(value: str) -> Tuple[int, ...]:
+    """Comma-separated class ids; "all" for no filter, empty for furniture only."""
+    value = value.strip()
+    if not value:
+        return tuple(sorted(CLASS_ID_TO_NAME))
+    if value == "all":
+        return ()
+    try:
+        classes = tuple(sorted({int(class_id) for class_id in value.split(",")}))
+    except ValueError:
+        raise ValueError(f"Invalid classes: {value}. Expected comma-separated ids")
+    if any(class_id < 0 for class_id in classes):
+        raise ValueError(f"Invalid classes: {value}. Ids must not be negative")
+    return classes
+
+
+def get_detection_settings(
+    model_size: Optional[str] = None,
+    conf: Optional[Union[str, float]] = None,
+    classes: Optional[str] = None,
+    tiled: Optional[Union[str, bool]] = None,
+    view_selection: Optional[str] = None,
+) -> DetectionSettings:
+    """Settings for one request; missing values fall back to the configuration."""
+    try:
+        conf = float(DETECTION_CONF if conf is None else conf)
+    except ValueError:
+        raise ValueError(f"Invalid conf: {conf}. Expected a number")
+    if not 0 <= conf <= 1:
+        raise ValueError(f"Invalid conf: {conf}. Expected a value between 0 and 1")
+
+    if tiled is None:
+        tiled = TILED_INFERENCE
+    elif isinstance(tiled, str):
+        tiled = tiled.lower() == "true"
+
+    view_selection = view_selection or VIEW_SELECTION
+    if view_selection not in VIEW_SELECTION_MODES:
+        raise ValueError(
+            f"Unknown view selection: {view_selection}. "
+            f"Available: {', '.join(VIEW_SELECTION_MODES)}"
+        )
+
+    return DetectionSettings(
+        model_path=model_path_for_size(model_size or MODEL_SIZE),
+        conf=conf,
+        classes=parse_classes(DETECTION_CLASSES if classes is None else classes),
+        tiled=tiled,
+        view_selection=view_selection,
+    )
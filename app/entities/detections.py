@@ -0,0 +1,117 @@
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.entities.view_metadata import ViewMetadata
+
+
+@dataclass
+class Detections:
+    """
+    Boxes detected in the views of one panorama, as numpy columns with one row
+    per box: the index of its view in views, class id, confidence and xyxy in
+    view pixels. Rows of a view need not be contiguous.
+
+    skipped flags the views that were not run through the model. to_dicts
+    builds the per-view JSON of the API; everything before it works on columns.
+    """
+
+    views: List[ViewMetadata]
+    view: np.ndarray  # (N,) int32
+    class_id: np.ndarray  # (N,) int32
+    confidence: np.ndarray  # (N,) float32
+    xyxy: np.ndarray  # (N, 4) float32
+    skipped: Optional[np.ndarray] = None  # (len(views),) bool
+
+    @classmethod
+    def empty(cls, views: List[ViewMetadata]) -> "Detections":
+        return cls(
+            views,
+            np.empty(0, np.int32),
+            np.empty(0, np.int32),
+            np.empty(0, np.float32),
+            np.empty((0, 4), np.float32),
+        )
+
+    def __len__(self) -> int:
+        return len(self.view)
+
+    def append(
+        self,
+        view: np.ndarray,
+        class_id: np.ndarray,
+        confidence: np.ndarray,
+        xyxy: np.ndarray,
+    ) -> "Detections":
+        """New Detections with the given rows added."""
+        return Detections(
+            self.views,
+            np.concatenate([self.view, view]).astype(np.int32, copy=False),
+            np.concatenate([self.class_id, class_id]).astype(np.int32, copy=False),
+            np.concatenate([self.confidence, confidence]).astype(
+                np.float32, copy=False
+            ),
+            np.concatenate([self.xyxy, xyxy.reshape(-1, 4)]).astype(
+                np.float32, copy=False
+            ),
+            self.skipped,
+        )
+
+    def view_counts(self) -> np.ndarray:
+        """Number of boxes of each view."""
+        return np.bincount(self.view, minlength=len(self.views))
+
+    def view_params(self) -> np.ndarray:
+        """(N, 5) width, height, yaw, pitch and fov of the view of each box."""
+        params = np.array(
+            [(v.width, v.height, v.yaw, v.pitch, v.fov) for v in self.views],
+            dtype=float,
+        ).reshape(-1, 5)
+        return params[self.view]
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Per-view results with a dict per box, as returned by the API."""
+        order = np.argsort(self.view, kind="stable")
+        bounds = np.searchsorted(self.view[order], np.arange(len(self.views) + 1))
+        class_ids = self.class_id[order].tolist()
+        confidences = self.confidence[order].tolist()
+        boxes = self.xyxy[order].tolist()
+
+        results = []
+        for idx, meta in enumerate(self.views):
+            start, end = bounds[idx], bounds[idx + 1]
+            result: Dict[str, Any] = asdict(meta)
+            result["detections"] = [
+                {"class_id": class_id, "confidence": confidence, "xyxy": xyxy}
+                for class_id, confidence, xyxy in zip(
+                    class_ids[start:end], confidences[start:end], boxes[start:end]
+                )
+            ]
+            if self.skipped is not None and self.skipped[idx]:
+                result["skipped"] = True
+            results.append(result)
+        return results
+
+    def to_columns(self) -> Dict[str, Any]:
+        """JSON-serializable columns, read back by from_columns."""
+        return {
+            "views": [asdict(meta) for meta in self.views],
+            "view": self.view.tolist(),
+            "class_id": self.class_id.tolist(),
+            "confidence": self.confidence.tolist(),
+            "xyxy": self.xyxy.tolist(),
+            "skipped": None if self.skipped is None else self.skipped.tolist(),
+        }
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, Any]) -> "Detections":
+        skipped = columns["skipped"]
+        return cls(
+            [ViewMetadata(**meta) for meta in columns["views"]],
+            np.array(columns["view"], np.int32),
+            np.array(columns["class_id"], np.int32),
+            np.array(columns["confidence"], np.float32),
+            np.array(columns["xyxy"], np.float32).reshape(-1, 4),
+            None if skipped is None else np.array(skipped, bool),
+        )
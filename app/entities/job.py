@@ -0,0 +1,61 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from app.entities.detections import Detections
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str  # "detect" or "process"
+    total_images: int
+    status: str = JOB_QUEUED
+    completed_images: int = 0
+    # Per-image results in the order images finish, each with the index of its
+    # image in the request; views_detected holds Detections until to_dict
+    results: List[Dict[str, Any]] = field(default_factory=list)
+    aggregate: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    def add_result(self, index: int, result: Dict[str, Any]):
+        """Records the result of the index-th image of the request."""
+        with self._lock:
+            self.results.append(dict(result, index=index))
+            self.completed_images += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Snapshot, as worker threads keep adding results while clients poll
+        with self._lock:
+            results = list(self.results)
+            completed_images = self.completed_images
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "total_images": self.total_images,
+            "completed_images": completed_images,
+            "results": [_result_to_dict(result) for result in results],
+            "aggregate": self.aggregate,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+def _result_to_dict(result: Dict[str, Any]) -> Dict[str, Any]:
+    detections = result.get("views_detected")
+    if isinstance(detections, Detections):
+        return dict(result, views_detected=detections.to_dicts())
+    return result
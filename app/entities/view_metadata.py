@@ -7,3 +7,5 @@ class ViewMetadata:
     yaw: float
     pitch: float
     fov: float
+    width: int = 512
+    height: int = 512
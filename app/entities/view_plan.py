@@ -0,0 +1,58 @@
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+
+@dataclass(frozen=True)
+class ViewPlan:
+    name: str
+    angles: Tuple[Tuple[float, float], ...]  # (yaw, pitch) of each view
+    fov: float
+    output_size: Tuple[int, int]  # (width, height) of each view
+
+
+def _grid(yaws, pitches) -> Tuple[Tuple[float, float], ...]:
+    return tuple((yaw, pitch) for pitch in pitches for yaw in yaws)
+
+
+# 4 horizontal faces plus up and down: cheapest full coverage of the sphere
+CUBE_6 = ViewPlan(
+    name="cube_6",
+    angles=_grid([0, 90, 180, 270], [0]) + ((0, 90), (0, -90)),
+    fov=90,
+    output_size=(512, 512),
+)
+
+GRID_12 = ViewPlan(
+    name="grid_12",
+    angles=_grid([0, 90, 180, 270], [45, 0, -45]),  # Up, horizontal, down
+    fov=90,
+    output_size=(512, 512),
+)
+
+# Neighbouring views overlap by half a field of view
+DENSE_24 = ViewPlan(
+    name="dense_24",
+    angles=_grid([0, 45, 90, 135, 180, 225, 270, 315], [45, 0, -45]),
+    fov=90,
+    output_size=(512, 512),
+)
+
+# GRID_12 at twice the resolution, for tiled inference on high-resolution panoramas
+GRID_12_HD = ViewPlan(
+    name="grid_12_hd",
+    angles=GRID_12.angles,
+    fov=90,
+    output_size=(1024, 1024),
+)
+
+VIEW_PLANS: Dict[str, ViewPlan] = {
+    plan.name: plan for plan in (CUBE_6, GRID_12, DENSE_24, GRID_12_HD)
+}
+
+
+def get_view_plan(name: str) -> ViewPlan:
+    if name not in VIEW_PLANS:
+        raise ValueError(
+            f"Unknown view plan: {name}. Available: {', '.join(VIEW_PLANS)}"
+        )
+    return VIEW_PLANS[name]
@@ -1,6 +1,6 @@
 import json
 import os
-from typing import List, Tuple
+from typing import Callable, List, Optional, Tuple
 
 import cv2
 import numpy as np
@@ -8,17 +8,55 @@ import numpy as np
 from app.entities.view_metadata import ViewMetadata
 
 
-def save_views(output_dir: str, views: List[Tuple[np.ndarray, ViewMetadata]]):
+def save_views(
+    output_dir: str,
+    views: List[Tuple[np.ndarray, ViewMetadata]],
+    reserve: Optional[Callable[[int], None]] = None,
+):
+    """
+    Writes views as JPEGs with a metadata.json. Each file is encoded in memory
+    first and its size passed to reserve, which may raise to refuse it, before
+    it is written.
+    """
     os.makedirs(output_dir, exist_ok=True)
 
     metadata_list = []
     for idx, (img, meta) in enumerate(views):
         filename = f"view_{idx:03}.jpg"
-        filepath = os.path.join(output_dir, filename)
-        cv2.imwrite(filepath, img)
+        ok, encoded = cv2.imencode(".jpg", img)
+        if not ok:
+            raise ValueError(f"Could not encode view {filename}")
+        _write(output_dir, filename, encoded.tobytes(), reserve)
 
         meta.filename = filename
         metadata_list.append(meta.__dict__)
 
-    with open(os.path.join(output_dir, "metadata.json"), "w") as f:
-        json.dump(metadata_list, f, indent=2)
+    metadata = json.dumps(metadata_list, indent=2).encode()
+    _write(output_dir, "metadata.json", metadata, reserve)
+
+
+def _write(
+    output_dir: str,
+    filename: str,
+    content: bytes,
+    reserve: Optional[Callable[[int], None]],
+):
+    if reserve is not None:
+        reserve(len(content))
+    with open(os.path.join(output_dir, filename), "wb") as f:
+        f.write(content)
+
+
+def load_views(input_dir: str) -> List[Tuple[np.ndarray, ViewMetadata]]:
+    with open(os.path.join(input_dir, "metadata.json"), "r") as f:
+        metadata_list = json.load(f)
+
+    views = []
+    for meta_dict in metadata_list:
+        meta = ViewMetadata(**meta_dict)
+        img = cv2.imread(os.path.join(input_dir, meta.filename))
+        if img is None:
+            raise FileNotFoundError(f"View not found: {meta.filename}")
+        views.append((img, meta))
+
+    return views
@@ -0,0 +1,131 @@
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.adapters.instrumentation.metrics import stage_timer
+from app.config import DOWNLOAD_CONCURRENCY, DOWNLOAD_MAX_BYTES, DOWNLOAD_TIMEOUT
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class DownloadTooLargeError(requests.exceptions.RequestException):
+    pass
+
+
+class ImageDownloader:
+    """
+    Downloads images concurrently through one pooled HTTP session, with at most
+    `concurrency` downloads in flight. Each fetch also holds at most
+    `concurrency` downloads, finished or not, that its caller has not consumed,
+    so a slow consumer does not pile up a whole batch of images in memory.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = DOWNLOAD_CONCURRENCY,
+        timeout: float = DOWNLOAD_TIMEOUT,
+        max_bytes: int = DOWNLOAD_MAX_BYTES,
+    ):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="download"
+        )
+
+    def download(self, url: str) -> bytes:
+        """
+        Raises requests.exceptions.RequestException on HTTP errors, on timeouts
+        (per read and for the whole body) and when the body exceeds max_bytes.
+        """
+        with stage_timer("download"):
+            return self._download(url)
+
+    def _download(self, url: str) -> bytes:
+        deadline = time.monotonic() + self.timeout
+        with self.session.get(url, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+
+            content_length = int(response.headers.get("Content-Length") or 0)
+            if content_length > self.max_bytes:
+                raise DownloadTooLargeError(
+                    f"{url} is {content_length} bytes, limit is {self.max_bytes}"
+                )
+
+            content = bytearray()
+            for chunk in response.iter_content(CHUNK_SIZE):
+                content.extend(chunk)
+                if len(content) > self.max_bytes:
+                    raise DownloadTooLargeError(
+                        f"{url} exceeds the {self.max_bytes} bytes limit"
+                    )
+                if time.monotonic() > deadline:
+                    raise requests.exceptions.Timeout(
+                        f"{url} took more than {self.timeout}s to download"
+                    )
+
+        return bytes(content)
+
+    def fetch(self, urls: List[str]) -> Iterator[Tuple[str, bytes]]:
+        """
+        Downloads urls concurrently and yields (url, content) as each download
+        finishes, so callers can process early images while the rest arrive.
+        Download errors are raised when their url comes up; pending downloads
+        are cancelled if the caller stops iterating.
+        """
+        for url, content, error in self.fetch_settled(urls):
+            if error is not None:
+                raise error
+            yield url, content or b""
+
+    def fetch_settled(
+        self, urls: List[str]
+    ) -> Iterator[Tuple[str, Optional[bytes], Optional[Exception]]]:
+        """
+        Like fetch, but yields (url, None, error) for failed downloads instead of
+        raising, so one bad url does not stop the others.
+        """
+        queued = iter(urls)
+        in_flight: Dict[Future, str] = {}
+
+        def submit_next():
+            url = next(queued, None)
+            if url is not None:
+                # Runs in the caller's context, so the download time is added
+                # to the timings of the request that asked for it
+                context = contextvars.copy_context()
+                future = self._executor.submit(context.run, self.download, url)
+                in_flight[future] = url
+
+        for _ in range(self.concurrency):
+            submit_next()
+        try:
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url = in_flight.pop(future)
+                    error = future.exception()
+                    if error is None:
+                        yield url, future.result(), None
+                    elif isinstance(error, Exception):
+                        yield url, None, error
+                    else:
+                        raise error
+                    # Only replaced once consumed, bounding unconsumed results
+                    submit_next()
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+
+image_downloader = ImageDownloader()
@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from app.config import RESULT_CACHE_DIR, RESULT_CACHE_DISK_MAX_BYTES, RESULT_CACHE_SIZE
+
+
+class ResultCache:
+    """
+    Caches JSON-serializable detection results by image content and detection
+    parameters. A memory tier with LRU eviction sits in front of an optional
+    on-disk tier capped at disk_max_bytes (oldest files are evicted first).
+
+    Cached values are shared between callers and must not be mutated.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = RESULT_CACHE_SIZE,
+        disk_dir: Optional[str] = RESULT_CACHE_DIR,
+        disk_max_bytes: int = RESULT_CACHE_DISK_MAX_BYTES,
+    ):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(content: bytes, **params) -> str:
+        digest = hashlib.sha256(content)
+        digest.update(json.dumps(params, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return self._memory[key]
+
+        value = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["disk_hits"] += 1
+            self._put_memory(key, value)
+        return value
+
+    def put(self, key: str, value: Any):
+        with self._lock:
+            self._put_memory(key, value)
+        self._write_disk(key, value)
+
+    def clear(self):
+        """Empties the memory tier; the disk tier is left as is."""
+        with self._lock:
+            self._memory.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        stats["disk_bytes"] = self._disk_usage()
+        return stats
+
+    def _put_memory(self, key: str, value: Any):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir or "", f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[Any]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "r") as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # Refresh the mtime so eviction is least recently used
+        os.utime(path)
+        return value
+
+    def _write_disk(self, key: str, value: Any):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(value, f)
+        os.replace(tmp_path, path)
+        self._evict_disk()
+
+    def _disk_files(self):
+        if not self.disk_dir:
+            return []
+        with os.scandir(self.disk_dir) as entries:
+            return [
+                entry
+                for entry in entries
+                if entry.is_file() and entry.name.endswith(".json")
+            ]
+
+    def _disk_usage(self) -> int:
+        return sum(entry.stat().st_size for entry in self._disk_files())
+
+    def _evict_disk(self):
+        files = sorted(self._disk_files(), key=lambda entry: entry.stat().st_mtime)
+        total = sum(entry.stat().st_size for entry in files)
+        for entry in files:
+            if total <= self.disk_max_bytes:
+                break
+            size = entry.stat().st_size
+            try:
+                os.remove(entry.path)
+                total -= size
+            except OSError:
+                pass
+
+
+result_cache = ResultCache()
@@ -0,0 +1,278 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import IO, Dict, Iterator
+
+from app.adapters.instrumentation.metrics import metrics
+from app.config import (
+    SCRATCH_MIN_FREE_BYTES,
+    SCRATCH_UPLOAD_DIR,
+    SCRATCH_UPLOAD_MAX_BYTES,
+    SCRATCH_UPLOAD_TTL,
+    SCRATCH_VIEWS_DIR,
+    SCRATCH_VIEWS_MAX_BYTES,
+    SCRATCH_VIEWS_TTL,
+    UPLOAD_MAX_BYTES,
+)
+
+CHUNK_SIZE = 1024 * 1024
+# Expired entries are looked for at most this often, when a directory is created
+SWEEP_INTERVAL = 60
+
+
+class ScratchStorageError(RuntimeError):
+    pass
+
+
+class UploadTooLargeError(ScratchStorageError):
+    pass
+
+
+class ScratchQuotaExceededError(ScratchStorageError):
+    pass
+
+
+@dataclass
+class _Entry:
+    created: float
+    size: int = 0
+    active: bool = True
+
+
+class ScratchStorage:
+    """
+    Hands out a unique directory per request under root, so concurrent requests
+    never share paths, and keeps the space they use in check:
+
+    - Uploads are streamed to disk in chunks, and refused past max_file_bytes.
+    - Writes are refused once the directories hold max_bytes or the disk has
+      less than min_free_bytes free.
+    - Directories are removed when their request fails, when it ends unless
+      kept, and ttl seconds after creation otherwise. Entries left by an
+      earlier process expire the same way.
+
+    Sizes are tracked in memory. Other code writing into a directory reserves
+    the size of each file first; files it writes without a reservation are
+    counted once the directory is released.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        root: str,
+        max_bytes: int,
+        ttl: float,
+        min_free_bytes: int = SCRATCH_MIN_FREE_BYTES,
+        max_file_bytes: int = UPLOAD_MAX_BYTES,
+    ):
+        self.name = name
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.min_free_bytes = min_free_bytes
+        self.max_file_bytes = max_file_bytes
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _Entry] = {}
+        self._scanned = False
+        self._last_sweep = 0.0
+
+    @contextmanager
+    def scratch_dir(self, keep: bool = False) -> Iterator[str]:
+        """
+        A new directory for one request. It is removed when the block raises
+        and when it ends, unless keep, in which case it lives for ttl seconds.
+        """
+        path = self.create_dir()
+        try:
+            yield path
+        except BaseException:
+            self.remove(path, reason="error")
+            raise
+
+        if keep:
+            self._release(path)
+        else:
+            self.remove(path, reason="done")
+
+    def save_upload(self, stream: IO[bytes], directory: str, suffix: str = "") -> str:
+        """
+        Streams an upload to a new file in directory (one of scratch_dir) and
+        returns its path. Raises UploadTooLargeError past max_file_bytes and
+        ScratchQuotaExceededError when the quotas are reached; the partial file
+        is removed either way.
+        """
+        fd, path = tempfile.mkstemp(suffix=suffix, dir=directory)
+        written = 0
+        try:
+            with os.fdopen(fd, "wb") as f:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    if written + len(chunk) > self.max_file_bytes:
+                        self._reject("file_size")
+                        raise UploadTooLargeError(
+                            f"Upload exceeds the {self.max_file_bytes} bytes limit"
+                        )
+                    self.reserve(directory, len(chunk))
+                    written += len(chunk)
+                    f.write(chunk)
+        except BaseException:
+            os.remove(path)
+            self.reserve(directory, -written)
+            raise
+
+        return path
+
+    def create_dir(self) -> str:
+        """
+        A new directory that stays in use, and is never expired, until it is
+        removed with remove. Raises ScratchQuotaExceededError when the quotas
+        are reached.
+        """
+        if time.monotonic() - self._last_sweep >= min(SWEEP_INTERVAL, self.ttl):
+            self.sweep()
+
+        path = os.path.join(self.root, str(uuid.uuid4()))
+        with self._lock:
+            self._scan()
+            self._check_quota(0)
+            os.makedirs(path)
+            self._entries[path] = _Entry(created=time.time())
+        return path
+
+    def reserve(self, directory: str, size: int):
+        """
+        Counts size bytes, about to be written into directory, against the
+        quotas; a negative size gives them back. Raises
+        ScratchQuotaExceededError, reserving nothing, when the quotas would be
+        exceeded.
+        """
+        with self._lock:
+            if size > 0:
+                self._check_quota(size)
+            entry = self._entries.get(directory)
+            if entry is not None:
+                entry.size += size
+
+    def remove(self, path: str, reason: str):
+        with self._lock:
+            self._entries.pop(path, None)
+        _remove_path(path)
+        metrics.inc_counter("scratch_removed_total", area=self.name, reason=reason)
+
+    def sweep(self):
+        """Removes the entries not in use that are older than ttl."""
+        expired_before = time.time() - self.ttl
+        with self._lock:
+            self._scan()
+            self._last_sweep = time.monotonic()
+            expired = [
+                path
+                for path, entry in self._entries.items()
+                if not entry.active and entry.created < expired_before
+            ]
+        for path in expired:
+            self.remove(path, reason="ttl")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            self._scan()
+            entries = list(self._entries.values())
+        return {
+            "bytes": sum(entry.size for entry in entries),
+            "entries": len(entries),
+            "active": sum(entry.active for entry in entries),
+            "max_bytes": self.max_bytes,
+            "disk_free_bytes": _disk_free(self.root),
+        }
+
+    def _release(self, path: str):
+        size = _path_size(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None:
+                entry.size = size
+                entry.active = False
+
+    def _check_quota(self, size: int):
+        used = sum(entry.size for entry in self._entries.values())
+        if used + size > self.max_bytes:
+            self._reject("quota")
+            raise ScratchQuotaExceededError(
+                f"Scratch storage {self.name} is full ({used} of "
+                f"{self.max_bytes} bytes used)"
+            )
+        if _disk_free(self.root) - size < self.min_free_bytes:
+            self._reject("disk_free")
+            raise ScratchQuotaExceededError(
+                f"Less than {self.min_free_bytes} bytes free on the disk of "
+                f"scratch storage {self.name}"
+            )
+
+    def _reject(self, reason: str):
+        metrics.inc_counter("scratch_rejected_total", area=self.name, reason=reason)
+
+    def _scan(self):
+        # Picks up what an earlier process left behind, so it is counted and
+        # expires; the caller holds the lock
+        if self._scanned:
+            return
+        self._scanned = True
+        os.makedirs(self.root, exist_ok=True)
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                self._entries.setdefault(
+                    entry.path,
+                    _Entry(
+                        created=entry.stat().st_mtime,
+                        size=_path_size(entry.path),
+                        active=False,
+                    ),
+                )
+
+
+def _path_size(path: str) -> int:
+    if not os.path.isdir(path):
+        return os.path.getsize(path) if os.path.exists(path) else 0
+
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, filename))
+            except OSError:
+                pass
+    return total
+
+
+def _remove_path(path: str):
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _disk_free(path: str) -> int:
+    # The directory may not exist yet; its nearest existing parent is on the
+    # same disk
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        path = os.path.dirname(path)
+    return shutil.disk_usage(path).free
+
+
+upload_storage = ScratchStorage(
+    "uploads", SCRATCH_UPLOAD_DIR, SCRATCH_UPLOAD_MAX_BYTES, SCRATCH_UPLOAD_TTL
+)
+view_storage = ScratchStorage(
+    "views", SCRATCH_VIEWS_DIR, SCRATCH_VIEWS_MAX_BYTES, SCRATCH_VIEWS_TTL
+)
@@ -1,13 +1,26 @@
+import logging
+
 from flasgger import Swagger
 from flask import Flask
 
+from app.adapters.object_detection.model_registry import model_registry
+from app.config import LOG_LEVEL, MODEL_WORKERS, REQUEST_MAX_BYTES, WARMUP_MODEL
+from app.routes.cache_routes import cache_blueprint
 from app.routes.detect_routes import detect_blueprint
+from app.routes.jobs_routes import jobs_blueprint
+from app.routes.metrics_routes import init_request_metrics, metrics_blueprint
+from app.routes.models_routes import models_blueprint
 from app.routes.preprocess_routes import preprocess_blueprint
 from app.routes.process_routes import process_blueprint
+from app.usecases.model_worker_pool import model_worker_pool
 
 
 def create_app():
+    logging.basicConfig(level=LOG_LEVEL)
+
     app = Flask(__name__)
+    # Larger requests are refused with 413 before their uploads are read
+    app.config["MAX_CONTENT_LENGTH"] = REQUEST_MAX_BYTES
 
     app.config["SWAGGER"] = {
         "title": "Object Detection API",
@@ -18,6 +31,18 @@ def create_app():
     app.register_blueprint(preprocess_blueprint, url_prefix="/preprocess")
     app.register_blueprint(detect_blueprint, url_prefix="/detect")
     app.register_blueprint(process_blueprint, url_prefix="/process")
+    app.register_blueprint(models_blueprint, url_prefix="/models")
+    app.register_blueprint(jobs_blueprint, url_prefix="/jobs")
+    app.register_blueprint(cache_blueprint, url_prefix="/cache")
+    app.register_blueprint(metrics_blueprint)
+    init_request_metrics(app)
+
+    if WARMUP_MODEL:
+        # Model workers load their own models as they start
+        if MODEL_WORKERS:
+            model_worker_pool.start()
+        else:
+            model_registry.get()
 
     return app
 
@@ -0,0 +1,31 @@
+from flask import Blueprint, jsonify
+
+from app.gateways.result_cache import result_cache
+
+cache_blueprint = Blueprint("cache", __name__)
+
+
+@cache_blueprint.route("/", methods=["GET"])
+def cache_stats():
+    """
+    Result cache statistics
+
+    ---
+    responses:
+      200:
+        description: Hits and misses of the detection result cache
+        schema:
+          type: object
+          properties:
+            memory_hits:
+              type: integer
+            disk_hits:
+              type: integer
+            misses:
+              type: integer
+            memory_entries:
+              type: integer
+            disk_bytes:
+              type: integer
+    """
+    return jsonify(result_cache.stats())
@@ -1,20 +1,20 @@
-import os
-from io import BytesIO
+from typing import Dict, Iterator, List
 
 import requests
 from flask import Blueprint, jsonify, request
-from PIL import Image
-from werkzeug.utils import secure_filename
 
-from app.usecases.postprocess_detections import postprocess_detections_with_tracking
-from app.usecases.preprocess_equirect import preprocess_image
-from app.usecases.run_object_detection import run_detection_on_folder
+from app.config import DEDUP_MODE, VIEW_PLAN
+from app.entities.detection_settings import DetectionSettings
+from app.entities.view_plan import ViewPlan, get_view_plan
+from app.gateways.image_downloader import image_downloader
+from app.routes.detection_params import detection_settings_from_request
+from app.routes.streaming import ndjson_response, stream_requested
+from app.typing.class_stats import ClassStats
+from app.usecases.detect_objects import add_object_counts, count_objects_in_content
+from app.usecases.postprocess_detections import DEDUP_MODES
 
 detect_blueprint = Blueprint("detect", __name__)
 
-UPLOAD_FOLDER = "temp_uploads"
-PREPROCESS_OUTPUT = "output_views"
-
 
 @detect_blueprint.route("/", methods=["POST"])
 def detect():
@@ -33,6 +33,65 @@ def detect():
         items:
           type: string
           format: url
+      - in: query
+        name: view_plan
+        type: string
+        required: false
+        enum: [cube_6, grid_12, dense_24, grid_12_hd]
+        description: Perspective view layout (defaults to the VIEW_PLAN setting)
+      - in: query
+        name: model_size
+        type: string
+        required: false
+        enum: [n, s, m, l, x]
+        description: >
+          YOLO11 model size, smaller ones are faster and less accurate (defaults
+          to the MODEL_SIZE setting); sizes whose weights are not installed in
+          MODEL_DIR are rejected with 400
+      - in: query
+        name: conf
+        type: number
+        required: false
+        description: Minimum confidence (defaults to the DETECTION_CONF setting)
+      - in: query
+        name: classes
+        type: string
+        required: false
+        description: >
+          Comma-separated COCO class ids to detect, or "all" (defaults to the
+          DETECTION_CLASSES setting, the furniture classes)
+      - in: query
+        name: tiled
+        type: boolean
+        required: false
+        description: >
+          Also detect on overlapping tiles of views larger than TILE_SIZE, for
+          small objects; needs a high-resolution view plan such as grid_12_hd,
+          other plans are rejected with 400 (defaults to the TILED_INFERENCE
+          setting)
+      - in: query
+        name: view_selection
+        type: string
+        required: false
+        enum: ["off", stats, model]
+        description: >
+          Skip views unlikely to contain objects, judged by image detail (stats)
+          or a small model (model) (defaults to the VIEW_SELECTION setting)
+      - in: query
+        name: dedup
+        type: string
+        required: false
+        enum: [deepsort, spherical]
+        description: >
+          How detections of the same object in overlapping views are merged
+          (defaults to the DEDUP_MODE setting)
+      - in: query
+        name: stream
+        type: boolean
+        required: false
+        description: >
+          Stream NDJSON, one line per image as soon as it finishes ({"url",
+          "objects"} or {"url", "error"}), then a final {"aggregate"} line
     responses:
       200:
         description: Object counts detected in the images
@@ -55,39 +114,61 @@ def detect():
     if not image_urls:
         return jsonify({"error": "No image URLs provided"}), 400
 
-    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-    os.makedirs(PREPROCESS_OUTPUT, exist_ok=True)
+    try:
+        view_plan = get_view_plan(request.args.get("view_plan", VIEW_PLAN))
+        settings = detection_settings_from_request(view_plan)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    aggregated_objects = {}
+    dedup_mode = request.args.get("dedup", DEDUP_MODE)
+    if dedup_mode not in DEDUP_MODES:
+        return jsonify({"error": f"Unknown dedup mode: {dedup_mode}"}), 400
 
-    for url in image_urls:
-        try:
-            response = requests.get(url)
-            response.raise_for_status()
-
-            image = Image.open(BytesIO(response.content))
-            filename = secure_filename(url.split("/")[-1])
-            filepath = os.path.join(UPLOAD_FOLDER, filename)
-            image.save(filepath)
-
-            # Process
-            folder = preprocess_image(filepath, PREPROCESS_OUTPUT)
-            detections = run_detection_on_folder(folder)
-            objects_count = postprocess_detections_with_tracking(detections, filepath)
-
-            # Count objects
-            for class_id, data in objects_count.items():
-                if class_id not in aggregated_objects:
-                    aggregated_objects[class_id] = {"name": data["name"], "count": 0}
-                aggregated_objects[class_id]["count"] += data["count"]
-
-            # Delete images
-            os.remove(filepath)
-            for preprocessed_img in os.listdir(folder):
-                os.remove(os.path.join(folder, preprocessed_img))
-            os.rmdir(folder)
-
-        except requests.exceptions.RequestException as e:
-            return jsonify({"error": f"Failed to download image: {str(e)}"}), 400
+    if stream_requested():
+        return ndjson_response(
+            _stream_detect(image_urls, view_plan, dedup_mode, settings)
+        )
+
+    aggregated_objects: Dict[str, ClassStats] = {}
+
+    try:
+        for url, content in image_downloader.fetch(image_urls):
+            try:
+                objects_count = count_objects_in_content(
+                    content, view_plan, dedup_mode, settings
+                )
+            except ValueError as e:
+                return jsonify({"error": f"Invalid image {url}: {str(e)}"}), 400
+
+            add_object_counts(aggregated_objects, objects_count)
+
+    except requests.exceptions.RequestException as e:
+        return jsonify({"error": f"Failed to download image: {str(e)}"}), 400
 
     return jsonify(aggregated_objects)
+
+
+def _stream_detect(
+    image_urls: List[str],
+    view_plan: ViewPlan,
+    dedup_mode: str,
+    settings: DetectionSettings,
+) -> Iterator[Dict]:
+    aggregated_objects: Dict[str, ClassStats] = {}
+
+    for url, content, error in image_downloader.fetch_settled(image_urls):
+        if error is not None:
+            yield {"url": url, "error": f"Failed to download image: {str(error)}"}
+            continue
+        try:
+            objects_count = count_objects_in_content(
+                content or b"", view_plan, dedup_mode, settings
+            )
+        except ValueError as e:
+            yield {"url": url, "error": f"Invalid image: {str(e)}"}
+            continue
+
+        add_object_counts(aggregated_objects, objects_count)
+        yield {"url": url, "objects": objects_count}
+
+    yield {"aggregate": aggregated_objects}
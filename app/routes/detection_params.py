@@ -0,0 +1,49 @@
+from flask import request
+
+from app.adapters.object_detection.model_registry import model_registry
+from app.config import TILE_SIZE
+from app.entities.detection_settings import (
+    MODEL_SIZES,
+    DetectionSettings,
+    get_detection_settings,
+    model_path_for_size,
+)
+from app.entities.view_plan import ViewPlan
+
+
+def detection_settings_from_request(view_plan: ViewPlan) -> DetectionSettings:
+    """
+    Detection settings from the model_size, conf, classes, tiled and
+    view_selection query parameters. Raises ValueError on invalid values, when
+    the weights of the requested model_size are not installed and when tiled is
+    requested for a view plan whose views are too small to be tiled.
+    """
+    model_size = request.args.get("model_size")
+    settings = get_detection_settings(
+        model_size,
+        request.args.get("conf"),
+        request.args.get("classes"),
+        request.args.get("tiled"),
+        request.args.get("view_selection"),
+    )
+
+    # A missing default model is a deployment error, not the client's
+    if model_size and not model_registry.is_available(settings.model_path):
+        available = [
+            size
+            for size in MODEL_SIZES
+            if model_registry.is_available(model_path_for_size(size))
+        ]
+        raise ValueError(
+            f"Model size {model_size} is not installed. "
+            f"Available: {', '.join(available) or 'none'}"
+        )
+
+    tiled_requested = settings.tiled and request.args.get("tiled")
+    if tiled_requested and max(view_plan.output_size) <= TILE_SIZE:
+        raise ValueError(
+            f"tiled needs views larger than TILE_SIZE ({TILE_SIZE}px); the views "
+            f"of {view_plan.name} are {view_plan.output_size[0]}px, use a "
+            "high-resolution view plan such as grid_12_hd"
+        )
+    return settings
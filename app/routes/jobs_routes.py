@@ -0,0 +1,285 @@
+from flask import Blueprint, jsonify, request
+from werkzeug.utils import secure_filename
+
+from app.config import DEDUP_MODE, VIEW_PLAN
+from app.entities.view_plan import get_view_plan
+from app.gateways.scratch_storage import (
+    ScratchQuotaExceededError,
+    UploadTooLargeError,
+    upload_storage,
+)
+from app.routes.detection_params import detection_settings_from_request
+from app.usecases.detection_jobs import JobQueueFullError, job_manager
+from app.usecases.postprocess_detections import DEDUP_MODES
+
+jobs_blueprint = Blueprint("jobs", __name__)
+
+
+@jobs_blueprint.route("/detect", methods=["POST"])
+def submit_detect_job():
+    """
+    Queue object detection for 360º equirectangular images from URLs
+
+    ---
+    consumes:
+      - application/json
+    parameters:
+      - in: body
+        name: image_urls
+        description: List of URLs of the 360º .jpg or .png images to detect objects in
+        required: true
+        type: array
+        items:
+          type: string
+          format: url
+      - in: query
+        name: view_plan
+        type: string
+        required: false
+        enum: [cube_6, grid_12, dense_24, grid_12_hd]
+        description: Perspective view layout (defaults to the VIEW_PLAN setting)
+      - in: query
+        name: model_size
+        type: string
+        required: false
+        enum: [n, s, m, l, x]
+        description: >
+          YOLO11 model size, smaller ones are faster and less accurate (defaults
+          to the MODEL_SIZE setting); sizes whose weights are not installed in
+          MODEL_DIR are rejected with 400
+      - in: query
+        name: conf
+        type: number
+        required: false
+        description: Minimum confidence (defaults to the DETECTION_CONF setting)
+      - in: query
+        name: classes
+        type: string
+        required: false
+        description: >
+          Comma-separated COCO class ids to detect, or "all" (defaults to the
+          DETECTION_CLASSES setting, the furniture classes)
+      - in: query
+        name: tiled
+        type: boolean
+        required: false
+        description: >
+          Also detect on overlapping tiles of views larger than TILE_SIZE, for
+          small objects; needs a high-resolution view plan such as grid_12_hd,
+          other plans are rejected with 400 (defaults to the TILED_INFERENCE
+          setting)
+      - in: query
+        name: view_selection
+        type: string
+        required: false
+        enum: ["off", stats, model]
+        description: >
+          Skip views unlikely to contain objects, judged by image detail (stats)
+          or a small model (model) (defaults to the VIEW_SELECTION setting)
+      - in: query
+        name: dedup
+        type: string
+        required: false
+        enum: [deepsort, spherical]
+        description: >
+          How detections of the same object in overlapping views are merged
+          (defaults to the DEDUP_MODE setting)
+    responses:
+      202:
+        description: Job accepted, poll GET /jobs/{job_id} for its results
+      400:
+        description: Error due to invalid input
+      429:
+        description: Job queue is full
+    """
+    image_urls = request.json
+    if not image_urls:
+        return jsonify({"error": "No image URLs provided"}), 400
+
+    try:
+        view_plan = get_view_plan(request.args.get("view_plan", VIEW_PLAN))
+        settings = detection_settings_from_request(view_plan)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    dedup_mode = request.args.get("dedup", DEDUP_MODE)
+    if dedup_mode not in DEDUP_MODES:
+        return jsonify({"error": f"Unknown dedup mode: {dedup_mode}"}), 400
+
+    try:
+        job = job_manager.submit_detect(image_urls, view_plan, dedup_mode, settings)
+    except JobQueueFullError as e:
+        return jsonify({"error": str(e)}), 429
+
+    return jsonify({"job_id": job.id, "status": job.status}), 202
+
+
+@jobs_blueprint.route("/process", methods=["POST"])
+def submit_process_job():
+    """
+    Queue per-view object detection for uploaded 360° images
+
+    ---
+    consumes:
+      - multipart/form-data
+    parameters:
+      - in: formData
+        name: files
+        type: file
+        required: true
+        description: One or more 360° .jpg or .png images
+      - in: query
+        name: view_plan
+        type: string
+        required: false
+        enum: [cube_6, grid_12, dense_24, grid_12_hd]
+        description: Perspective view layout (defaults to the VIEW_PLAN setting)
+      - in: query
+        name: model_size
+        type: string
+        required: false
+        enum: [n, s, m, l, x]
+        description: >
+          YOLO11 model size, smaller ones are faster and less accurate (defaults
+          to the MODEL_SIZE setting); sizes whose weights are not installed in
+          MODEL_DIR are rejected with 400
+      - in: query
+        name: conf
+        type: number
+        required: false
+        description: Minimum confidence (defaults to the DETECTION_CONF setting)
+      - in: query
+        name: classes
+        type: string
+        required: false
+        description: >
+          Comma-separated COCO class ids to detect, or "all" (defaults to the
+          DETECTION_CLASSES setting, the furniture classes)
+      - in: query
+        name: tiled
+        type: boolean
+        required: false
+        description: >
+          Also detect on overlapping tiles of views larger than TILE_SIZE, for
+          small objects; needs a high-resolution view plan such as grid_12_hd,
+          other plans are rejected with 400 (defaults to the TILED_INFERENCE
+          setting)
+      - in: query
+        name: view_selection
+        type: string
+        required: false
+        enum: ["off", stats, model]
+        description: >
+          Skip views unlikely to contain objects, judged by image detail (stats)
+          or a small model (model) (defaults to the VIEW_SELECTION setting)
+    responses:
+      202:
+        description: Job accepted, poll GET /jobs/{job_id} for its results
+      400:
+        description: Error due to invalid input
+      413:
+        description: The request exceeds REQUEST_MAX_BYTES or an upload UPLOAD_MAX_BYTES
+      429:
+        description: Job queue is full
+      507:
+        description: Scratch storage quota or disk space exhausted
+    """
+    files = request.files.getlist("files")
+    if not files:
+        return jsonify({"error": "No files uploaded"}), 400
+
+    try:
+        view_plan = get_view_plan(request.args.get("view_plan", VIEW_PLAN))
+        settings = detection_settings_from_request(view_plan)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Uploads wait for the job in scratch storage, not in memory; the job
+    # removes them when it ends
+    try:
+        upload_dir = upload_storage.create_dir()
+        try:
+            images = [
+                (
+                    secure_filename(file.filename),
+                    upload_storage.save_upload(file.stream, upload_dir),
+                )
+                for file in files
+            ]
+            job = job_manager.submit_process(upload_dir, images, view_plan, settings)
+        except BaseException:
+            upload_storage.remove(upload_dir, reason="error")
+            raise
+    except UploadTooLargeError as e:
+        return jsonify({"error": str(e)}), 413
+    except ScratchQuotaExceededError as e:
+        return jsonify({"error": str(e)}), 507
+    except JobQueueFullError as e:
+        return jsonify({"error": str(e)}), 429
+
+    return jsonify({"job_id": job.id, "status": job.status}), 202
+
+
+@jobs_blueprint.route("/<job_id>", methods=["GET"])
+def get_job(job_id):
+    """
+    Status and results of a detection job
+
+    ---
+    parameters:
+      - in: path
+        name: job_id
+        type: string
+        required: true
+    responses:
+      200:
+        description: >
+          Job status, per-image results finished so far and, for detect jobs,
+          the aggregated object counts once the job is done
+        schema:
+          type: object
+          properties:
+            job_id:
+              type: string
+            kind:
+              type: string
+              enum: [detect, process]
+            status:
+              type: string
+              enum: [queued, running, done, failed]
+            total_images:
+              type: integer
+            completed_images:
+              type: integer
+            results:
+              type: array
+              description: >
+                Per-image results in the order images finished; index is the
+                position of the image in the request
+              items:
+                type: object
+                properties:
+                  index:
+                    type: integer
+                  url:
+                    type: string
+                  original_file:
+                    type: string
+                  objects:
+                    type: object
+                  views_detected:
+                    type: array
+                  error:
+                    type: string
+            aggregate:
+              type: object
+            error:
+              type: string
+      404:
+        description: Unknown or expired job
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Job not found: {job_id}"}), 404
+
+    return jsonify(job.to_dict())
@@ -0,0 +1,138 @@
+import json
+import logging
+import time
+
+import psutil
+from flask import Blueprint, Flask, Response, g, request
+
+from app.adapters.image_processing.perspective_converter import (
+    perspective_map_cache_info,
+)
+from app.adapters.instrumentation.metrics import (
+    metrics,
+    request_stages,
+    start_request_stages,
+)
+from app.adapters.object_detection.model_registry import model_registry
+from app.adapters.object_detection.yolo_inference import micro_batch_scheduler
+from app.gateways.result_cache import result_cache
+from app.gateways.scratch_storage import upload_storage, view_storage
+from app.usecases.detection_jobs import job_manager
+from app.usecases.model_worker_pool import model_worker_pool
+
+metrics_blueprint = Blueprint("metrics", __name__)
+
+request_logger = logging.getLogger("app.requests")
+
+
+@metrics_blueprint.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    """
+    Prometheus metrics
+
+    ---
+    produces:
+      - text/plain
+    responses:
+      200:
+        description: >
+          Request and per-stage latency histograms, in-flight gauges and
+          model, cache and queue statistics in Prometheus text format
+    """
+    _collect_component_metrics()
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
+def init_request_metrics(app: Flask):
+    """Times every request and logs its per-stage timings as one JSON line."""
+
+    @app.before_request
+    def start_request_timing():
+        g.request_start = time.perf_counter()
+        start_request_stages()
+        metrics.add_gauge("http_requests_in_flight", 1)
+
+    @app.after_request
+    def record_request_timing(response):
+        duration = time.perf_counter() - g.request_start
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        metrics.observe(
+            "http_request_duration_seconds",
+            duration,
+            method=request.method,
+            endpoint=endpoint,
+            status=response.status_code,
+        )
+        request_logger.info(
+            json.dumps(
+                {
+                    "method": request.method,
+                    "endpoint": endpoint,
+                    "status": response.status_code,
+                    "duration_s": round(duration, 6),
+                    "stages_s": {
+                        stage: round(seconds, 6)
+                        for stage, seconds in request_stages().items()
+                    },
+                }
+            )
+        )
+        return response
+
+    @app.teardown_request
+    def finish_request(error=None):
+        # Runs after streamed responses finish, so in-flight stays accurate
+        metrics.add_gauge("http_requests_in_flight", -1)
+
+
+def _collect_component_metrics():
+    metrics.set_gauge(
+        "process_resident_memory_bytes", psutil.Process().memory_info().rss
+    )
+
+    for loaded in model_registry.stats():
+        labels = {
+            "model_path": loaded["model_path"],
+            "device": loaded["device"] or "default",
+        }
+        metrics.set_gauge("model_load_seconds", loaded["load_time_s"], **labels)
+        metrics.set_gauge("model_rss_delta_bytes", loaded["rss_delta_bytes"], **labels)
+
+    cache_stats = result_cache.stats()
+    for outcome in ("memory_hits", "disk_hits", "misses"):
+        metrics.set_counter(
+            "result_cache_lookups_total", cache_stats[outcome], outcome=outcome
+        )
+    metrics.set_gauge("result_cache_memory_entries", cache_stats["memory_entries"])
+    metrics.set_gauge("result_cache_disk_bytes", cache_stats["disk_bytes"])
+
+    for storage in (upload_storage, view_storage):
+        scratch_stats = storage.stats()
+        metrics.set_gauge("scratch_bytes", scratch_stats["bytes"], area=storage.name)
+        metrics.set_gauge(
+            "scratch_entries", scratch_stats["entries"], area=storage.name
+        )
+        metrics.set_gauge(
+            "scratch_disk_free_bytes",
+            scratch_stats["disk_free_bytes"],
+            area=storage.name,
+        )
+
+    map_cache = perspective_map_cache_info()
+    metrics.set_counter(
+        "perspective_map_cache_lookups_total", map_cache["hits"], outcome="hit"
+    )
+    metrics.set_counter(
+        "perspective_map_cache_lookups_total", map_cache["misses"], outcome="miss"
+    )
+
+    batch_stats = micro_batch_scheduler.stats()
+    metrics.set_gauge("micro_batch_queue_depth", batch_stats["queue_depth"])
+    for size, count in batch_stats["batch_size_histogram"].items():
+        metrics.set_counter("micro_batch_batches_total", count, size=size)
+
+    metrics.set_gauge("job_queue_depth", job_manager.queue_depth())
+
+    worker_stats = model_worker_pool.stats()
+    metrics.set_gauge("model_workers_alive", worker_stats["alive"])
+    metrics.set_gauge("model_worker_pending_tasks", worker_stats["pending_tasks"])
@@ -0,0 +1,69 @@
+import psutil
+from flask import Blueprint, jsonify
+
+from app.adapters.object_detection.model_registry import model_registry
+from app.adapters.object_detection.yolo_inference import micro_batch_scheduler
+from app.usecases.model_worker_pool import model_worker_pool
+
+models_blueprint = Blueprint("models", __name__)
+
+
+@models_blueprint.route("/", methods=["GET"])
+def loaded_models():
+    """
+    Models loaded by this worker
+
+    ---
+    responses:
+      200:
+        description: Load time and memory footprint of each loaded model
+        schema:
+          type: object
+          properties:
+            process_rss_bytes:
+              type: integer
+            micro_batching:
+              type: object
+              properties:
+                queue_depth:
+                  type: integer
+                batches:
+                  type: integer
+                batch_size_histogram:
+                  type: object
+            model_workers:
+              type: object
+              description: >
+                Model worker processes (MODEL_WORKERS); models they load are
+                not listed under models
+              properties:
+                workers:
+                  type: integer
+                threads_per_worker:
+                  type: integer
+                alive:
+                  type: integer
+                pending_tasks:
+                  type: integer
+            models:
+              type: array
+              items:
+                type: object
+                properties:
+                  model_path:
+                    type: string
+                  device:
+                    type: string
+                  load_time_s:
+                    type: number
+                  rss_delta_bytes:
+                    type: integer
+    """
+    return jsonify(
+        {
+            "process_rss_bytes": psutil.Process().memory_info().rss,
+            "models": model_registry.stats(),
+            "micro_batching": micro_batch_scheduler.stats(),
+            "model_workers": model_worker_pool.stats(),
+        }
+    )
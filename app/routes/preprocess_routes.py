@@ -1,14 +1,22 @@
 import os
+from functools import partial
 
 from flask import Blueprint, jsonify, request
 from werkzeug.utils import secure_filename
 
+from app.config import VIEW_PLAN, VIEW_SELECTION
+from app.entities.detection_settings import VIEW_SELECTION_MODES
+from app.entities.view_plan import get_view_plan
+from app.gateways.scratch_storage import (
+    ScratchQuotaExceededError,
+    UploadTooLargeError,
+    upload_storage,
+    view_storage,
+)
 from app.usecases.preprocess_equirect import preprocess_image
 
 preprocess_blueprint = Blueprint("preprocess", __name__)
 
-UPLOAD_FOLDER = "temp_uploads"
-
 
 @preprocess_blueprint.route("/", methods=["POST"])
 def preprocess():
@@ -24,6 +32,20 @@ def preprocess():
         type: file
         required: true
         description: One or more 360º .jpg or .png images
+      - in: query
+        name: view_plan
+        type: string
+        required: false
+        enum: [cube_6, grid_12, dense_24, grid_12_hd]
+        description: Perspective view layout (defaults to the VIEW_PLAN setting)
+      - in: query
+        name: view_selection
+        type: string
+        required: false
+        enum: ["off", stats, model]
+        description: >
+          Only write views likely to contain objects, judged by image detail
+          (stats) or a small model (model) (defaults to the VIEW_SELECTION setting)
     responses:
       200:
         description: Preprocessing result
@@ -36,20 +58,51 @@ def preprocess():
                 type: string
               output_path:
                 type: string
+      400:
+        description: Error due to invalid input
+      413:
+        description: The request exceeds REQUEST_MAX_BYTES or an upload UPLOAD_MAX_BYTES
+      507:
+        description: Scratch storage quota or disk space exhausted
     """
     files = request.files.getlist("files")
     if not files:
         return jsonify({"error": "No files uploaded"}), 400
 
+    try:
+        view_plan = get_view_plan(request.args.get("view_plan", VIEW_PLAN))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    view_selection = request.args.get("view_selection", VIEW_SELECTION)
+    if view_selection not in VIEW_SELECTION_MODES:
+        return jsonify({"error": f"Unknown view selection: {view_selection}"}), 400
+
     results = []
-    for file in files:
-        filename = secure_filename(file.filename)
-        upload_dir = "temp_uploads"
-        os.makedirs(upload_dir, exist_ok=True)
-        filepath = os.path.join(upload_dir, filename)
-        file.save(filepath)
-
-        output_dir = preprocess_image(filepath, "output_views")
-        results.append({"input_file": filename, "output_path": output_dir})
+    # Uploads are removed with the request; views are kept until they expire,
+    # or removed if preprocessing fails
+    with upload_storage.scratch_dir() as upload_dir:
+        for file in files:
+            filename = secure_filename(file.filename)
+            try:
+                filepath = upload_storage.save_upload(
+                    file.stream, upload_dir, os.path.splitext(filename)[1]
+                )
+                with view_storage.scratch_dir(keep=True) as output_dir:
+                    preprocess_image(
+                        filepath,
+                        output_dir,
+                        view_plan,
+                        view_selection,
+                        reserve=partial(view_storage.reserve, output_dir),
+                    )
+            except UploadTooLargeError as e:
+                return jsonify({"error": str(e)}), 413
+            except ScratchQuotaExceededError as e:
+                return jsonify({"error": str(e)}), 507
+            except FileNotFoundError:
+                return jsonify({"error": f"Invalid image: {filename}"}), 400
+
+            results.append({"input_file": filename, "output_path": output_dir})
 
     return jsonify(results)
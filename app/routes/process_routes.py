@@ -1,16 +1,23 @@
-import os
+from contextlib import ExitStack
+from typing import Dict, Iterator, List, Tuple
 
 from flask import Blueprint, jsonify, request
 from werkzeug.utils import secure_filename
 
-from app.usecases.preprocess_equirect import preprocess_image
-from app.usecases.run_object_detection import run_detection_on_folder
+from app.config import VIEW_PLAN
+from app.entities.detection_settings import DetectionSettings
+from app.entities.view_plan import ViewPlan, get_view_plan
+from app.gateways.scratch_storage import (
+    ScratchQuotaExceededError,
+    UploadTooLargeError,
+    upload_storage,
+)
+from app.routes.detection_params import detection_settings_from_request
+from app.routes.streaming import ndjson_response, stream_requested
+from app.usecases.detect_objects import detect_views_in_content
 
 process_blueprint = Blueprint("process", __name__)
 
-UPLOAD_FOLDER = "temp_uploads"
-PREPROCESS_OUTPUT = "output_views"
-
 
 @process_blueprint.route("/", methods=["POST"])
 def detect_from_360_images():
@@ -26,36 +33,134 @@ def detect_from_360_images():
         type: file
         required: true
         description: One or more 360° .jpg or .png images
+      - in: query
+        name: view_plan
+        type: string
+        required: false
+        enum: [cube_6, grid_12, dense_24, grid_12_hd]
+        description: Perspective view layout (defaults to the VIEW_PLAN setting)
+      - in: query
+        name: model_size
+        type: string
+        required: false
+        enum: [n, s, m, l, x]
+        description: >
+          YOLO11 model size, smaller ones are faster and less accurate (defaults
+          to the MODEL_SIZE setting); sizes whose weights are not installed in
+          MODEL_DIR are rejected with 400
+      - in: query
+        name: conf
+        type: number
+        required: false
+        description: Minimum confidence (defaults to the DETECTION_CONF setting)
+      - in: query
+        name: classes
+        type: string
+        required: false
+        description: >
+          Comma-separated COCO class ids to detect, or "all" (defaults to the
+          DETECTION_CLASSES setting, the furniture classes)
+      - in: query
+        name: tiled
+        type: boolean
+        required: false
+        description: >
+          Also detect on overlapping tiles of views larger than TILE_SIZE, for
+          small objects; needs a high-resolution view plan such as grid_12_hd,
+          other plans are rejected with 400 (defaults to the TILED_INFERENCE
+          setting)
+      - in: query
+        name: view_selection
+        type: string
+        required: false
+        enum: ["off", stats, model]
+        description: >
+          Skip views unlikely to contain objects, judged by image detail (stats)
+          or a small model (model) (defaults to the VIEW_SELECTION setting)
+      - in: query
+        name: stream
+        type: boolean
+        required: false
+        description: >
+          Stream NDJSON, one line per image as soon as it finishes ({"original_file",
+          "views_detected"} or {"original_file", "error"})
     responses:
       200:
         description: Detections for each 360° image
+      413:
+        description: The request exceeds REQUEST_MAX_BYTES or an upload UPLOAD_MAX_BYTES
+      507:
+        description: Scratch storage quota or disk space exhausted
     """
     files = request.files.getlist("files")
     if not files:
         return jsonify({"error": "No files uploaded"}), 400
 
-    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-    os.makedirs(PREPROCESS_OUTPUT, exist_ok=True)
-
-    results = []
+    try:
+        view_plan = get_view_plan(request.args.get("view_plan", VIEW_PLAN))
+        settings = detection_settings_from_request(view_plan)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    for file in files:
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(UPLOAD_FOLDER, filename)
-        file.save(filepath)
+    # Uploads are spooled to scratch storage, within its quotas, and read back
+    # one at a time, so only one is held in memory
+    uploads = ExitStack()
+    upload_dir = uploads.enter_context(upload_storage.scratch_dir())
+    try:
+        try:
+            paths = [
+                (
+                    secure_filename(file.filename),
+                    upload_storage.save_upload(file.stream, upload_dir),
+                )
+                for file in files
+            ]
+        except BaseException:
+            uploads.close()
+            raise
+    except UploadTooLargeError as e:
+        return jsonify({"error": str(e)}), 413
+    except ScratchQuotaExceededError as e:
+        return jsonify({"error": str(e)}), 507
 
-        # Step 1: Preprocess
-        folder = preprocess_image(filepath, PREPROCESS_OUTPUT)
+    if stream_requested():
+        # Uploads are closed once the view returns, before the response is
+        # streamed; the spooled copies are removed when the response is closed
+        response = ndjson_response(_stream_process(paths, view_plan, settings))
+        response.call_on_close(uploads.close)
+        return response
 
-        # Step 2: Detect objects
-        detections = run_detection_on_folder(folder)
+    with uploads:
+        results = []
+        for filename, path in paths:
+            try:
+                detections = detect_views_in_content(_read(path), view_plan, settings)
+            except ValueError:
+                return jsonify({"error": f"Invalid image: {filename}"}), 400
 
-        results.append(
-            {
-                "original_file": filename,
-                "preprocess_folder": folder,
-                "views_detected": detections,
-            }
-        )
+            results.append(
+                {
+                    "original_file": filename,
+                    "views_detected": detections.to_dicts(),
+                }
+            )
 
     return jsonify(results)
+
+
+def _stream_process(
+    paths: List[Tuple[str, str]], view_plan: ViewPlan, settings: DetectionSettings
+) -> Iterator[Dict]:
+    for filename, path in paths:
+        try:
+            detections = detect_views_in_content(_read(path), view_plan, settings)
+        except ValueError:
+            yield {"original_file": filename, "error": f"Invalid image: {filename}"}
+            continue
+
+        yield {"original_file": filename, "views_detected": detections.to_dicts()}
+
+
+def _read(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
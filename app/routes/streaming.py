@@ -0,0 +1,16 @@
+import json
+from typing import Any, Iterator
+
+from flask import Response, request, stream_with_context
+
+
+def stream_requested() -> bool:
+    return request.args.get("stream", "false").lower() == "true"
+
+
+def ndjson_response(lines: Iterator[Any]) -> Response:
+    """Streams each object of lines as one JSON line, as soon as it is produced."""
+    return Response(
+        stream_with_context(json.dumps(line) + "\n" for line in lines),
+        mimetype="application/x-ndjson",
+    )
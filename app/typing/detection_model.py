@@ -0,0 +1,16 @@
+from typing import Any, List, Optional, Protocol
+
+
+class DetectionModel(Protocol):
+    """
+    Models served by yolo_inference: ultralytics YOLO (PyTorch or any
+    ultralytics format) and OnnxModel. predict takes a BGR image or a list of
+    them and returns one result per image, whose boxes expose cls, conf and
+    xyxy.
+    """
+
+    def predict(
+        self, img: Any, /, *, conf: float = ..., classes: Optional[List[int]] = ...
+    ) -> Any: ...
+
+    def to(self, device: Optional[str]) -> Any: ...
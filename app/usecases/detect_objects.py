@@ -0,0 +1,170 @@
+import random
+from dataclasses import asdict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.adapters.image_processing.image_decoder import (
+    decode_image,
+    required_equirect_width,
+)
+from app.adapters.instrumentation.metrics import stage_timer
+from app.config import (
+    DECODE_REDUCED_RESOLUTION,
+    DEDUP_MODE,
+    VIEW_SELECTION_AUDIT_RATE,
+)
+from app.entities.detection_settings import DetectionSettings, get_detection_settings
+from app.entities.detections import Detections
+from app.entities.view_plan import ViewPlan
+from app.gateways.result_cache import result_cache
+from app.typing.class_stats import ClassStats
+from app.usecases.model_worker_pool import model_worker_pool
+from app.usecases.postprocess_detections import postprocess_detections_with_tracking
+from app.usecases.preprocess_equirect import generate_views, view_metadata
+from app.usecases.run_object_detection import run_detection_on_views
+from app.usecases.select_views import record_selection_audit, select_views
+
+# Part of the cache key of views results: bumped whenever their cached layout
+# changes, so disk entries of an older layout are missed instead of misread.
+# 2: Detections.to_columns instead of per-view dicts.
+VIEWS_CACHE_FORMAT = 2
+
+
+def detect_views_in_image(
+    img: np.ndarray, view_plan: ViewPlan, settings: Optional[DetectionSettings] = None
+) -> Detections:
+    """
+    Per-view detections of one equirectangular image. settings default to the
+    configured model, confidence and classes.
+
+    Views skipped by settings.view_selection have no detections and are
+    flagged in Detections.skipped. A VIEW_SELECTION_AUDIT_RATE share of the
+    images with skipped views runs every view anyway, to measure the recall
+    lost. Those results have detections in every view; detect_views_in_content
+    caches them like any other, so later cache hits for the image return them
+    and are never audited again.
+    """
+    settings = settings or get_detection_settings()
+    n_views = len(view_plan.angles)
+    selected = select_views(img, view_plan, settings.view_selection, settings)
+    audit = len(selected) < n_views and random.random() < VIEW_SELECTION_AUDIT_RATE
+
+    views = generate_views(img, view_plan, None if audit else selected)
+    detections = run_detection_on_views(
+        views,
+        settings.conf,
+        list(settings.classes),
+        model_path=settings.model_path,
+        tiled=settings.tiled,
+    )
+
+    if audit:
+        record_selection_audit(detections, selected, settings.view_selection)
+    elif len(selected) < n_views:
+        detections = _with_skipped_views(detections, view_plan, selected)
+    return detections
+
+
+def _with_skipped_views(
+    detections: Detections, view_plan: ViewPlan, selected: List[int]
+) -> Detections:
+    # Renumber the rows' views from the selected views to all of the plan's
+    plan_indices = np.array(sorted(selected), dtype=np.int32)
+    skipped = np.ones(len(view_plan.angles), dtype=bool)
+    skipped[plan_indices] = False
+    return Detections(
+        view_metadata(view_plan),
+        plan_indices[detections.view],
+        detections.class_id,
+        detections.confidence,
+        detections.xyxy,
+        skipped,
+    )
+
+
+def count_objects_in_image(
+    img: np.ndarray,
+    view_plan: ViewPlan,
+    dedup_mode: str = DEDUP_MODE,
+    settings: Optional[DetectionSettings] = None,
+) -> Dict[str, ClassStats]:
+    """Unique objects of one equirectangular image, counted by class."""
+    detections = detect_views_in_image(img, view_plan, settings)
+    return postprocess_detections_with_tracking(detections, img, dedup_mode=dedup_mode)
+
+
+def detect_views_in_content(
+    content: bytes, view_plan: ViewPlan, settings: Optional[DetectionSettings] = None
+) -> Detections:
+    """
+    detect_views_in_image for an encoded image, served from the result cache
+    when the same image was processed with the same parameters.
+    Raises ValueError if the image cannot be decoded.
+    """
+    settings = settings or get_detection_settings()
+    key = result_cache.make_key(
+        content,
+        kind="views",
+        format=VIEWS_CACHE_FORMAT,
+        detection=asdict(settings),
+        view_plan=asdict(view_plan),
+    )
+    cached = result_cache.get(key)
+    if cached is not None:
+        return Detections.from_columns(cached)
+
+    with stage_timer("decode"):
+        img = decode_image(content)
+    if model_worker_pool.enabled:
+        detections = model_worker_pool.detect_views(img, view_plan, settings)
+    else:
+        detections = detect_views_in_image(img, view_plan, settings)
+    result_cache.put(key, detections.to_columns())
+    return detections
+
+
+def count_objects_in_content(
+    content: bytes,
+    view_plan: ViewPlan,
+    dedup_mode: str = DEDUP_MODE,
+    settings: Optional[DetectionSettings] = None,
+) -> Dict[str, ClassStats]:
+    """
+    count_objects_in_image for an encoded image, served from the result cache
+    when the same image was processed with the same parameters.
+    Raises ValueError if the image cannot be decoded.
+    """
+    settings = settings or get_detection_settings()
+    min_width = required_equirect_width(view_plan) if DECODE_REDUCED_RESOLUTION else 0
+    key = result_cache.make_key(
+        content,
+        kind="objects",
+        detection=asdict(settings),
+        view_plan=asdict(view_plan),
+        dedup_mode=dedup_mode,
+        min_width=min_width,
+    )
+    cached = result_cache.get(key)
+    if cached is not None:
+        return cached
+
+    with stage_timer("decode"):
+        img = decode_image(content, min_width)
+    if model_worker_pool.enabled:
+        objects_count = model_worker_pool.count_objects(
+            img, view_plan, dedup_mode, settings
+        )
+    else:
+        objects_count = count_objects_in_image(img, view_plan, dedup_mode, settings)
+    result_cache.put(key, objects_count)
+    return objects_count
+
+
+def add_object_counts(
+    aggregated_objects: Dict[str, ClassStats], objects_count: Dict[str, ClassStats]
+):
+    for class_id, data in objects_count.items():
+        if class_id not in aggregated_objects:
+            aggregated_objects[class_id] = {"name": data["name"], "count": 0}
+        aggregated_objects[class_id]["count"] += data["count"]
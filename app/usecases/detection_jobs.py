@@ -0,0 +1,191 @@
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from app.config import JOB_QUEUE_SIZE, JOB_RESULT_TTL, JOB_WORKERS
+from app.entities.detection_settings import DetectionSettings
+from app.entities.job import JOB_DONE, JOB_FAILED, JOB_RUNNING, Job
+from app.entities.view_plan import ViewPlan
+from app.gateways.image_downloader import image_downloader
+from app.gateways.scratch_storage import upload_storage
+from app.typing.class_stats import ClassStats
+from app.usecases.detect_objects import (
+    add_object_counts,
+    count_objects_in_content,
+    detect_views_in_content,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFullError(Exception):
+    pass
+
+
+class JobManager:
+    """
+    Runs detection jobs in the background: a bounded in-process queue feeds a
+    pool of worker threads, and each job records per-image results as they
+    finish so clients can poll partial progress.
+    """
+
+    def __init__(
+        self,
+        workers: int = JOB_WORKERS,
+        queue_size: int = JOB_QUEUE_SIZE,
+        result_ttl: float = JOB_RESULT_TTL,
+    ):
+        self.workers = workers
+        self.result_ttl = result_ttl
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def submit_detect(
+        self,
+        image_urls: List[str],
+        view_plan: ViewPlan,
+        dedup_mode: str,
+        settings: Optional[DetectionSettings] = None,
+    ) -> Job:
+        job = Job(id=str(uuid.uuid4()), kind="detect", total_images=len(image_urls))
+        self._enqueue(
+            job,
+            lambda: self._run_detect(job, image_urls, view_plan, dedup_mode, settings),
+        )
+        return job
+
+    def submit_process(
+        self,
+        upload_dir: str,
+        images: List[Tuple[str, str]],
+        view_plan: ViewPlan,
+        settings: Optional[DetectionSettings] = None,
+    ) -> Job:
+        """
+        images: (filename, path) pairs of uploads saved in upload_dir, a
+        directory of upload_storage that the job removes when it ends. It is
+        left to the caller if the job cannot be queued.
+        """
+        job = Job(id=str(uuid.uuid4()), kind="process", total_images=len(images))
+        self._enqueue(
+            job,
+            lambda: self._run_process(job, upload_dir, images, view_plan, settings),
+        )
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def _enqueue(self, job: Job, task: Callable[[], None]):
+        self._start_workers()
+        self._prune_finished()
+        with self._lock:
+            self._jobs[job.id] = job
+        try:
+            self._queue.put_nowait((job, task))
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job.id]
+            raise JobQueueFullError("Job queue is full, retry later")
+
+    def _start_workers(self):
+        with self._lock:
+            if self._threads:
+                return
+            for idx in range(self.workers):
+                thread = threading.Thread(
+                    target=self._work, name=f"detection-job-{idx}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            job, task = self._queue.get()
+            job.status = JOB_RUNNING
+            try:
+                task()
+                job.status = JOB_DONE
+            except Exception as e:
+                logger.exception("Detection job %s failed", job.id)
+                job.status = JOB_FAILED
+                job.error = str(e)
+            finally:
+                job.finished_at = time.time()
+                self._queue.task_done()
+
+    def _prune_finished(self):
+        expired_before = time.time() - self.result_ttl
+        with self._lock:
+            for job_id, job in list(self._jobs.items()):
+                if job.finished_at is not None and job.finished_at < expired_before:
+                    del self._jobs[job_id]
+
+    @staticmethod
+    def _run_detect(
+        job: Job,
+        image_urls: List[str],
+        view_plan: ViewPlan,
+        dedup_mode: str,
+        settings: Optional[DetectionSettings],
+    ):
+        aggregated_objects: Dict[str, ClassStats] = {}
+        # Downloads finish out of order; repeated urls take their indices in turn
+        indices: Dict[str, Deque[int]] = defaultdict(deque)
+        for idx, url in enumerate(image_urls):
+            indices[url].append(idx)
+
+        for url, content, error in image_downloader.fetch_settled(image_urls):
+            result: Dict[str, Any]
+            if error is not None:
+                result = {"url": url, "error": f"Failed to download image: {error}"}
+            else:
+                try:
+                    objects_count = count_objects_in_content(
+                        content or b"", view_plan, dedup_mode, settings
+                    )
+                except ValueError as e:
+                    result = {"url": url, "error": f"Invalid image: {e}"}
+                else:
+                    add_object_counts(aggregated_objects, objects_count)
+                    result = {"url": url, "objects": objects_count}
+            job.add_result(indices[url].popleft(), result)
+
+        job.aggregate = aggregated_objects
+
+    @staticmethod
+    def _run_process(
+        job: Job,
+        upload_dir: str,
+        images: List[Tuple[str, str]],
+        view_plan: ViewPlan,
+        settings: Optional[DetectionSettings],
+    ):
+        try:
+            for idx, (filename, path) in enumerate(images):
+                with open(path, "rb") as f:
+                    content = f.read()
+                try:
+                    detections = detect_views_in_content(content, view_plan, settings)
+                except ValueError as e:
+                    job.add_result(
+                        idx, {"original_file": filename, "error": f"Invalid image: {e}"}
+                    )
+                else:
+                    job.add_result(
+                        idx, {"original_file": filename, "views_detected": detections}
+                    )
+        finally:
+            upload_storage.remove(upload_dir, reason="done")
+
+
+job_manager = JobManager()
@@ -0,0 +1,80 @@
+import multiprocessing
+import os
+import queue
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Dict
+
+# Only the standard library is imported at module level: the app configuration
+# is read on import, after worker_main has set this worker's thread counts.
+
+
+def worker_main(threads: int, warmup: bool, task_queue, result_queue):
+    """
+    Entry point of a model worker process. Runs tasks of ModelWorkerPool until it
+    receives None: each task names a shared memory block holding a decoded
+    panorama, and its result is sent back with the stage timings it took.
+    """
+    os.environ["MODEL_WORKERS"] = "0"
+    os.environ["PROJECTION_WORKERS"] = str(threads)
+    os.environ["INFERENCE_THREADS"] = str(threads)
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+
+    import cv2
+    import numpy as np
+    import torch
+
+    from app.adapters.image_processing.projection_engine import projection_engine
+    from app.adapters.instrumentation.metrics import (
+        request_stages,
+        start_request_stages,
+    )
+    from app.adapters.object_detection.model_registry import model_registry
+    from app.usecases.detect_objects import (
+        count_objects_in_image,
+        detect_views_in_image,
+    )
+
+    # Also set explicitly in case the configuration was read before, e.g. by a
+    # main module imported again by spawn
+    torch.set_num_threads(threads)
+    cv2.setNumThreads(threads)
+    projection_engine.workers = threads
+    handlers: Dict[str, Callable[..., Any]] = {
+        "views": detect_views_in_image,
+        "objects": count_objects_in_image,
+    }
+
+    if warmup:
+        model_registry.get()
+
+    # Daemon workers outlive a parent that was killed without cleanup
+    parent = multiprocessing.parent_process()
+    while True:
+        try:
+            task = task_queue.get(timeout=1)
+        except queue.Empty:
+            if parent is not None and not parent.is_alive():
+                break
+            continue
+        if task is None:
+            break
+
+        task_id, kind, shm_name, shape, dtype, args = task
+        try:
+            shm = SharedMemory(name=shm_name)
+        except FileNotFoundError as e:
+            # The caller gave up on the task, e.g. it timed out while queued,
+            # and removed its block; the result is dropped by the pool
+            result_queue.put((task_id, None, (type(e).__name__, str(e)), {}))
+            continue
+        img = np.ndarray(shape, dtype, buffer=shm.buf)
+        try:
+            start_request_stages()
+            result = handlers[kind](img, *args)
+            result_queue.put((task_id, result, None, request_stages()))
+        except Exception as e:
+            result_queue.put((task_id, None, (type(e).__name__, str(e)), {}))
+        finally:
+            # The block cannot be closed while an array still points into it
+            del img
+            shm.close()
@@ -0,0 +1,204 @@
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.adapters.image_processing.image_decoder import ImageDecodeError
+from app.adapters.instrumentation.metrics import record_stage
+from app.config import (
+    MODEL_WORKER_THREADS,
+    MODEL_WORKER_TIMEOUT,
+    MODEL_WORKERS,
+    WARMUP_MODEL,
+)
+from app.entities.detection_settings import DetectionSettings
+from app.entities.detections import Detections
+from app.entities.view_plan import ViewPlan
+from app.typing.class_stats import ClassStats
+from app.usecases.model_worker import worker_main
+
+logger = logging.getLogger(__name__)
+
+
+class ModelWorkerError(RuntimeError):
+    pass
+
+
+class ModelWorkerPool:
+    """
+    Runs detection of decoded panoramas in a pool of model worker processes, so
+    the Python-side work of concurrent requests (projection bookkeeping,
+    postprocessing, result building) is not serialized by the GIL of the HTTP
+    process. Each worker loads its own models and uses a fixed number of torch,
+    ONNX Runtime and projection threads.
+
+    Panoramas are handed over through shared memory; only the task parameters
+    and the small results are pickled. Errors of a task are raised in the
+    caller as ModelWorkerError, except image decoding errors, raised as
+    ImageDecodeError. A task that takes longer than timeout seconds fails with
+    ModelWorkerError; its late result is dropped.
+    """
+
+    def __init__(
+        self,
+        workers: int = MODEL_WORKERS,
+        threads_per_worker: int = MODEL_WORKER_THREADS,
+        warmup: bool = WARMUP_MODEL,
+        timeout: float = MODEL_WORKER_TIMEOUT,
+    ):
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker or max(
+            1, (os.cpu_count() or 1) // max(workers, 1)
+        )
+        self.warmup = warmup
+        self.timeout = timeout
+        # Fork would copy the HTTP process's threads and torch state
+        self._context = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self._task_ids = itertools.count()
+        self._pending: Dict[int, Future] = {}
+        self._processes: List[Any] = []
+        self._task_queue: Any = None
+        self._result_queue: Any = None
+        self._collector: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def detect_views(
+        self, img: np.ndarray, view_plan: ViewPlan, settings: DetectionSettings
+    ) -> Detections:
+        """detect_views_in_image, run by a worker."""
+        return self._run("views", img, (view_plan, settings))
+
+    def count_objects(
+        self,
+        img: np.ndarray,
+        view_plan: ViewPlan,
+        dedup_mode: str,
+        settings: DetectionSettings,
+    ) -> Dict[str, ClassStats]:
+        """count_objects_in_image, run by a worker."""
+        return self._run("objects", img, (view_plan, dedup_mode, settings))
+
+    def start(self):
+        with self._lock:
+            if self._processes:
+                return
+            self._task_queue = self._context.Queue()
+            self._result_queue = self._context.Queue()
+            for _ in range(self.workers):
+                self._processes.append(self._start_process())
+            self._collector = threading.Thread(
+                target=self._collect, name="model-worker-results", daemon=True
+            )
+            self._collector.start()
+
+    def shutdown(self):
+        with self._lock:
+            processes, self._processes = self._processes, []
+        for _ in processes:
+            self._task_queue.put(None)
+        for process in processes:
+            process.join()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "threads_per_worker": self.threads_per_worker,
+                "alive": sum(process.is_alive() for process in self._processes),
+                "pending_tasks": len(self._pending),
+            }
+
+    def _run(self, kind: str, img: np.ndarray, args: Tuple):
+        self.start()
+
+        shm = SharedMemory(create=True, size=max(img.nbytes, 1))
+        try:
+            np.ndarray(img.shape, img.dtype, buffer=shm.buf)[...] = img
+            future: Future = Future()
+            with self._lock:
+                task_id = next(self._task_ids)
+                self._pending[task_id] = future
+            self._task_queue.put(
+                (task_id, kind, shm.name, img.shape, img.dtype.str, args)
+            )
+            try:
+                result, stages = future.result(timeout=self.timeout)
+            except FutureTimeoutError:
+                with self._lock:
+                    self._pending.pop(task_id, None)
+                raise ModelWorkerError(
+                    f"Model worker task timed out after {self.timeout}s"
+                )
+        finally:
+            shm.close()
+            shm.unlink()
+
+        for stage, elapsed in stages.items():
+            record_stage(stage, elapsed)
+        return result
+
+    def _start_process(self):
+        process = self._context.Process(
+            target=worker_main,
+            args=(
+                self.threads_per_worker,
+                self.warmup,
+                self._task_queue,
+                self._result_queue,
+            ),
+            daemon=True,
+        )
+        process.start()
+        return process
+
+    def _collect(self):
+        while True:
+            try:
+                task_id, result, error, stages = self._result_queue.get(timeout=1)
+            except queue.Empty:
+                self._replace_dead_workers()
+                continue
+
+            with self._lock:
+                future = self._pending.pop(task_id, None)
+            if future is None:
+                continue
+            if error is None:
+                future.set_result((result, stages))
+            elif error[0] == ImageDecodeError.__name__:
+                future.set_exception(ImageDecodeError(error[1]))
+            else:
+                future.set_exception(ModelWorkerError(f"{error[0]}: {error[1]}"))
+
+    def _replace_dead_workers(self):
+        with self._lock:
+            dead = [process for process in self._processes if not process.is_alive()]
+            if not dead:
+                return
+            # The tasks the dead workers held are unknown, so every pending
+            # task fails; late results of the others are dropped
+            pending, self._pending = self._pending, {}
+            for process in dead:
+                logger.error(
+                    "Model worker %s exited with %s", process.pid, process.exitcode
+                )
+                self._processes.remove(process)
+                self._processes.append(self._start_process())
+
+        for future in pending.values():
+            future.set_exception(ModelWorkerError("Model worker exited"))
+
+
+model_worker_pool = ModelWorkerPool()
@@ -1,17 +1,29 @@
-from typing import Dict, List
+from typing import Dict
 
-import cv2
 import numpy as np
+import torch
+import torchvision
 
 from app.adapters.image_processing.coordinate_mapper import (
-    perspective_bbox_to_equirectangular,
+    perspective_bboxes_to_equirectangular,
 )
+from app.adapters.instrumentation.metrics import stage_timer
 from app.adapters.tracking.deep_sort_tracking import DeepSortTracker
+from app.adapters.tracking.spherical_dedup import spherical_deduplication
+from app.config import DEDUP_MODE
 from app.entities.class_names import CLASS_ID_TO_NAME
+from app.entities.detections import Detections
 from app.typing.class_stats import ClassStats
 
+DEDUP_MODES = ("deepsort", "spherical")
 
-def non_max_suppression(boxes, scores, iou_threshold=0.5):
+
+def non_max_suppression(boxes, scores, iou_threshold=0.5, wrap_width=None):
+    """
+    Greedy NMS. With wrap_width, boxes live on a horizontally periodic image
+    (equirectangular panorama): xmax may exceed wrap_width and overlaps across
+    the seam are taken into account.
+    """
     x1 = boxes[:, 0]
     y1 = boxes[:, 1]
     x2 = boxes[:, 2]
@@ -33,101 +45,149 @@ def non_max_suppression(boxes, scores, iou_threshold=0.5):
         h = np.maximum(0, yy2 - yy1 + 1)
         inter = w * h
 
+        if wrap_width:
+            for shift in (-wrap_width, wrap_width):
+                xx1_s = np.maximum(x1[i] + shift, x1[order[1:]])
+                xx2_s = np.minimum(x2[i] + shift, x2[order[1:]])
+                w_s = np.maximum(0, xx2_s - xx1_s + 1)
+                inter = np.maximum(inter, w_s * h)
+
         iou = inter / (areas[i] + areas[order[1:]] - inter)
         inds = np.where(iou <= iou_threshold)[0]
         order = order[inds + 1]
 
-    return keep
+    return np.array(keep, dtype=np.int64)
+
+
+def batched_non_max_suppression(
+    boxes, scores, class_ids, iou_threshold=0.5, wrap_width=None
+) -> np.ndarray:
+    """
+    Class-aware NMS over all classes in one torchvision batched_nms call.
+    Returns the indices of the kept boxes, sorted by decreasing score.
+
+    With wrap_width, each box crossing the seam (xmax > wrap_width) also takes
+    part as a copy shifted left by wrap_width, so it meets the boxes at the
+    left edge of the panorama. A seam-crossing box is kept only when both of
+    its copies survive. In dense clusters at the seam the result can differ
+    from the wrap-aware greedy non_max_suppression by a box or two.
+    """
+    if len(boxes) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    _, class_rank = np.unique(class_ids, return_inverse=True)
+    class_rank = class_rank.reshape(-1)
+    scores = np.asarray(scores, dtype=np.float64)
+
+    # +1 on the max corner reproduces the inclusive pixel areas of
+    # non_max_suppression
+    inclusive_boxes = boxes.astype(np.float64, copy=True)
+    inclusive_boxes[:, 2:] += 1
+    source = np.arange(len(boxes))
+
+    if wrap_width:
+        wrapped = np.flatnonzero(boxes[:, 2] > wrap_width)
+        if len(wrapped):
+            shifted = inclusive_boxes[wrapped]
+            shifted[:, [0, 2]] -= wrap_width
+            inclusive_boxes = np.concatenate([inclusive_boxes, shifted])
+            scores = np.concatenate([scores, scores[wrapped]])
+            class_rank = np.concatenate([class_rank, class_rank[wrapped]])
+            source = np.concatenate([source, wrapped])
+
+    keep = torchvision.ops.batched_nms(
+        torch.from_numpy(inclusive_boxes),
+        torch.from_numpy(scores),
+        torch.from_numpy(class_rank),
+        iou_threshold,
+    ).numpy()
+
+    kept = source[keep]
+    all_copies_kept = np.bincount(kept, minlength=len(boxes)) == np.bincount(source)
+    kept = kept[all_copies_kept[kept]]
+    # Both copies of a kept seam-crossing box are listed; keep the first
+    _, first = np.unique(kept, return_index=True)
+    return kept[np.sort(first)]
+
+
+def map_detections_to_equirectangular(
+    detections: Detections, w_eq: int, h_eq: int
+) -> np.ndarray:
+    """(N, 4) equirectangular boxes of all detections, mapped at once."""
+    w_out, h_out, yaw, pitch, fov = detections.view_params().T
+    return perspective_bboxes_to_equirectangular(
+        detections.xyxy, w_out, h_out, yaw, pitch, fov, w_eq, h_eq
+    )
 
 
 def postprocess_detections_with_tracking(
-    detections: List[Dict], original_360_img_path: str, iou_threshold=0.05
+    detections: Detections,
+    img_360: np.ndarray,
+    iou_threshold=0.05,
+    dedup_mode: str = DEDUP_MODE,
 ) -> Dict[str, ClassStats]:
     """
     Aplica NMS global y luego DeepSORT para tracking.
     Devuelve conteo de objetos únicos con nombres en español.
-    """
 
-    img_360 = cv2.imread(original_360_img_path)
-    if img_360 is None:
-        raise FileNotFoundError(
-            f"Original 360 image not found: {original_360_img_path}"
-        )
+    dedup_mode "spherical" reemplaza DeepSORT por deduplicación geométrica
+    sobre la esfera.
+    """
+    if dedup_mode not in DEDUP_MODES:
+        raise ValueError(f"Unknown dedup mode: {dedup_mode}")
 
     h_eq, w_eq = img_360.shape[:2]
-    tracker = DeepSortTracker()
-
-    all_boxes = []
-    all_scores = []
-    all_class_ids = []
-
-    # For each view, map bboxes to equirectangular coordinates
-    for view in detections:
-        yaw = view["yaw"]
-        pitch = view["pitch"]
-        fov = view["fov"]
-        w_out, h_out = 512, 512  # tamaño salida asumido
-
-        for det in view["detections"]:
-            bbox_persp = det["xyxy"]
-            bbox_eq = perspective_bbox_to_equirectangular(
-                bbox_persp, w_out, h_out, yaw, pitch, fov, w_eq, h_eq
-            )
-            all_boxes.append(bbox_eq)
-            all_scores.append(det["confidence"])
-            all_class_ids.append(det["class_id"])
 
-    if not all_boxes:
+    if len(detections) == 0:
         return {}
 
-    boxes_np = np.array(all_boxes)
-    scores_np = np.array(all_scores)
-    class_ids_np = np.array(all_class_ids)
+    # Map all bboxes to equirectangular coordinates at once
+    with stage_timer("bbox_mapping"):
+        boxes_np = map_detections_to_equirectangular(detections, w_eq, h_eq)
+    scores_np = detections.confidence
+    class_ids_np = detections.class_id
 
     # NMS global by class
-    filtered_boxes = []
-    filtered_scores = []
-    filtered_class_ids = []
-
-    for class_id in np.unique(class_ids_np):
-        inds = np.where(class_ids_np == class_id)[0]
-        boxes_class = boxes_np[inds]
-        scores_class = scores_np[inds]
-
-        keep = non_max_suppression(boxes_class, scores_class, iou_threshold)
-
-        filtered_boxes.extend(boxes_class[keep])
-        filtered_scores.extend(scores_class[keep])
-        filtered_class_ids.extend([class_id] * len(keep))
-
-    # Prepare detections for DeepSORT
-    detections_for_tracking = []
-    for bbox, score, class_id in zip(
-        filtered_boxes, filtered_scores, filtered_class_ids
-    ):
-        detections_for_tracking.append([bbox, score, class_id])
-
-    print(detections_for_tracking)
-
-    detections_for_tracking = [
-        [det[0], det[1], det[2]] for det in detections_for_tracking
-    ]
-
-    # Update tracker with equirectangular image and filtered detections
-    tracked_objects = tracker.update(img_360, detections_for_tracking)
-
-    # Count unique objects by track_id and class
-    objects_by_id = {}
-    for obj in tracked_objects:
-        track_id = obj["track_id"]
-        if track_id not in objects_by_id:
-            objects_by_id[track_id] = {"class_id": obj["class_id"], "count": 0}
-        objects_by_id[track_id]["count"] += 1
+    with stage_timer("nms"):
+        keep = batched_non_max_suppression(
+            boxes_np, scores_np, class_ids_np, iou_threshold, wrap_width=w_eq
+        )
+    filtered_boxes = boxes_np[keep]
+    filtered_scores = scores_np[keep]
+    filtered_class_ids = class_ids_np[keep]
+
+    if dedup_mode == "spherical":
+        with stage_timer("spherical_dedup"):
+            unique = spherical_deduplication(
+                filtered_boxes, filtered_scores, filtered_class_ids, w_eq, h_eq
+            )
+        unique_class_ids = filtered_class_ids[unique].tolist()
+    else:
+        # Prepare detections for DeepSORT, cropping seam-crossing boxes to the image
+        detections_for_tracking = []
+        for bbox, score, class_id in zip(
+            filtered_boxes, filtered_scores, filtered_class_ids
+        ):
+            bbox = np.minimum(bbox, [w_eq, h_eq, w_eq, h_eq])
+            detections_for_tracking.append([bbox, score, class_id])
+
+        # Update tracker with equirectangular image and filtered detections
+        with stage_timer("deepsort"):
+            tracker = DeepSortTracker()
+            tracked_objects = tracker.update(img_360, detections_for_tracking)
+
+        # Count unique objects by track_id and class
+        objects_by_id = {}
+        for obj in tracked_objects:
+            track_id = obj["track_id"]
+            if track_id not in objects_by_id:
+                objects_by_id[track_id] = {"class_id": obj["class_id"], "count": 0}
+            objects_by_id[track_id]["count"] += 1
+        unique_class_ids = [obj["class_id"] for obj in objects_by_id.values()]
 
     # Group by name, id and count objects
     result: Dict[str, ClassStats] = {}
-    for obj in objects_by_id.values():
-        class_id = obj["class_id"]
+    for class_id in unique_class_ids:
         class_id_str = str(class_id)
         name = CLASS_ID_TO_NAME.get(class_id)
         if name:
@@ -1,30 +1,71 @@
-import os
-import uuid
+from typing import Callable, List, Optional, Tuple
 
 import cv2
+import numpy as np
 
-from app.adapters.image_processing.perspective_converter import convert_to_perspective
+from app.adapters.image_processing.projection_engine import projection_engine
+from app.adapters.instrumentation.metrics import stage_timer
+from app.config import VIEW_PLAN
 from app.entities.view_metadata import ViewMetadata
+from app.entities.view_plan import ViewPlan, get_view_plan
 from app.gateways.file_storage import save_views
+from app.usecases.select_views import select_views
 
 
-def preprocess_image(image_path: str, output_base_dir: str) -> str:
+def view_metadata(view_plan: ViewPlan) -> List[ViewMetadata]:
+    w_out, h_out = view_plan.output_size
+    return [
+        ViewMetadata(
+            filename=f"view_{idx:03}.jpg",
+            yaw=yaw,
+            pitch=pitch,
+            fov=view_plan.fov,
+            width=w_out,
+            height=h_out,
+        )
+        for idx, (yaw, pitch) in enumerate(view_plan.angles)
+    ]
+
+
+def generate_views(
+    img: np.ndarray,
+    view_plan: Optional[ViewPlan] = None,
+    view_indices: Optional[List[int]] = None,
+) -> List[Tuple[np.ndarray, ViewMetadata]]:
+    """Projects the plan's views, or only those at view_indices, in plan order."""
+    view_plan = view_plan or get_view_plan(VIEW_PLAN)
+    metas = view_metadata(view_plan)
+    if view_indices is not None:
+        metas = [metas[idx] for idx in sorted(view_indices)]
+
+    with stage_timer("projection"):
+        persps = projection_engine.project(
+            img,
+            [(meta.yaw, meta.pitch, meta.fov, view_plan.output_size) for meta in metas],
+        )
+    return list(zip(persps, metas))
+
+
+def preprocess_image(
+    image_path: str,
+    output_dir: str,
+    view_plan: Optional[ViewPlan] = None,
+    view_selection: str = "off",
+    reserve: Optional[Callable[[int], None]] = None,
+) -> str:
+    """
+    Writes the views of an equirectangular image to output_dir. With
+    view_selection, views select_views deems empty are not written. reserve
+    is called with the size of each file before it is written (see
+    save_views).
+    """
     img = cv2.imread(image_path)
+    if img is None:
+        raise FileNotFoundError(f"Image not found: {image_path}")
+
+    view_plan = view_plan or get_view_plan(VIEW_PLAN)
+    views = generate_views(img, view_plan, select_views(img, view_plan, view_selection))
 
-    yaws = [0, 90, 180, 270]
-    pitches = [45, 0, -45]  # Up, horizontal, down
-    fov = 90
-    output_size = (512, 512)
-
-    views = []
-    for pitch in pitches:
-        for yaw in yaws:
-            persp = convert_to_perspective(img, yaw, pitch, fov, output_size)
-            meta = ViewMetadata(filename="", yaw=yaw, pitch=pitch, fov=fov)
-            views.append((persp, meta))
-
-    folder_id = str(uuid.uuid4())
-    output_dir = os.path.join(output_base_dir, folder_id)
-    save_views(output_dir, views)
+    save_views(output_dir, views, reserve)
 
     return output_dir
@@ -1,48 +1,197 @@
-import json
-import os
-from typing import Dict, List
+from typing import List, Tuple
 
-import cv2
+import numpy as np
 
-from app.adapters.object_detection.yolo_inference import load_model, predict
+from app.adapters.image_processing.coordinate_mapper import view_rotation_matrix
+from app.adapters.image_processing.tiling import tile_origins
+from app.adapters.instrumentation.metrics import metrics, stage_timer
+from app.adapters.object_detection.model_registry import model_registry
+from app.adapters.object_detection.yolo_inference import predict_batch, result_columns
+from app.config import (
+    DETECTION_BATCH_SIZE,
+    MODEL_PATH,
+    TILE_MAX_PER_IMAGE,
+    TILE_OVERLAP,
+    TILE_SIZE,
+)
+from app.entities.detections import Detections
+from app.entities.view_metadata import ViewMetadata
+from app.gateways.file_storage import load_views
 
+View = Tuple[np.ndarray, ViewMetadata]
 
-def run_detection_on_folder(
-    folder_path: str,
+
+def run_detection_on_view_sets(
+    view_sets: List[List[View]],
     conf: float = 0.5,
     classes: List[int] = [],
-) -> List[Dict]:
-    model = load_model()
-
-    metadata_file = os.path.join(folder_path, "metadata.json")
-    with open(metadata_file, "r") as f:
-        metadata = json.load(f)
-
-    results = []
-
-    for view in metadata:
-        image_path = os.path.join(folder_path, view["filename"])
-        img = cv2.imread(image_path)
-        detections = predict(model, img, classes=classes, conf=conf)[0]
-
-        boxes = []
-        for box in detections.boxes:
-            boxes.append(
-                {
-                    "class_id": int(box.cls[0]),
-                    "confidence": float(box.conf[0]),
-                    "xyxy": [float(v) for v in box.xyxy[0]],
-                }
+    batch_size: int = DETECTION_BATCH_SIZE,
+    model_path: str = MODEL_PATH,
+    tiled: bool = False,
+) -> List[Detections]:
+    """
+    Runs detection over the views of several panoramas, batching views of all
+    panoramas together. Returns the detections of each panorama, in the order
+    of view_sets.
+
+    With tiled, selected views are also run as overlapping tiles (see
+    _select_tiled_views) and the tile boxes are added to their view's
+    detections, in view coordinates; the global NMS merges duplicates.
+    """
+    loaded_model = model_registry.get(model_path)
+
+    imgs = [img for views in view_sets for img, _ in views]
+    with stage_timer("inference"):
+        predictions = predict_batch(
+            loaded_model.model,
+            imgs,
+            classes=classes,
+            conf=conf,
+            batch_size=batch_size,
+        )
+    metrics.inc_counter("views_inferred_total", len(imgs))
+
+    results_per_set = []
+    prediction_idx = 0
+    for views in view_sets:
+        end = prediction_idx + len(views)
+        columns = [result_columns(p) for p in predictions[prediction_idx:end]]
+        prediction_idx = end
+
+        detections = Detections.empty([meta for _, meta in views])
+        if columns:
+            class_ids, confidences, boxes = zip(*columns)
+            detections = detections.append(
+                np.repeat(np.arange(len(views)), [len(c) for c in class_ids]),
+                np.concatenate(class_ids),
+                np.concatenate(confidences),
+                np.concatenate(boxes),
             )
+        results_per_set.append(detections)
 
-        results.append(
-            {
-                "filename": view["filename"],
-                "yaw": view["yaw"],
-                "pitch": view["pitch"],
-                "fov": view["fov"],
-                "detections": boxes,
-            }
+    if tiled:
+        results_per_set = _add_tile_detections(
+            loaded_model.model, view_sets, results_per_set, conf, classes, batch_size
         )
 
-    return results
+    return results_per_set
+
+
+def _select_tiled_views(views: List[View], detections: Detections) -> List[int]:
+    """
+    Views of one panorama to tile within TILE_MAX_PER_IMAGE tiles. Only views
+    larger than a tile gain detail from tiling. Views whose center looks at or
+    below the horizon come first (furniture stands there), then views where
+    the full-view pass found the most objects.
+
+    Pitch alone does not tell up from down: it rotates about the world x axis
+    after the yaw, so pitch 45 looks down at yaw 0 but up at yaw 180. The
+    latitude of the view center is read from its rotation instead.
+    """
+    candidates = [
+        idx for idx, (img, _) in enumerate(views) if max(img.shape[:2]) > TILE_SIZE
+    ]
+    counts = detections.view_counts()
+    candidates.sort(key=lambda idx: (_looks_up(views[idx][1]), -counts[idx]))
+
+    selected = []
+    budget = TILE_MAX_PER_IMAGE
+    for idx in candidates:
+        h, w = views[idx][0].shape[:2]
+        n_tiles = len(tile_origins(w, h, TILE_SIZE, TILE_OVERLAP))
+        if n_tiles <= budget:
+            selected.append(idx)
+            budget -= n_tiles
+    return selected
+
+
+def _looks_up(meta: ViewMetadata) -> bool:
+    # World y of the camera's forward axis, R @ (0, 0, 1)
+    return view_rotation_matrix(meta.yaw, meta.pitch)[1, 2] > 1e-6
+
+
+def _add_tile_detections(
+    model,
+    view_sets: List[List[View]],
+    results_per_set: List[Detections],
+    conf: float,
+    classes: List[int],
+    batch_size: int,
+) -> List[Detections]:
+    tiles = []
+    tile_targets = []  # (set index, view index, x offset, y offset) of each tile
+    for set_idx, (views, detections) in enumerate(zip(view_sets, results_per_set)):
+        for idx in _select_tiled_views(views, detections):
+            img = views[idx][0]
+            h, w = img.shape[:2]
+            for x, y in tile_origins(w, h, TILE_SIZE, TILE_OVERLAP):
+                tile_end_x, tile_end_y = x + TILE_SIZE, y + TILE_SIZE
+                tiles.append(img[y:tile_end_y, x:tile_end_x])
+                tile_targets.append((set_idx, idx, x, y))
+
+    if not tiles:
+        return results_per_set
+
+    with stage_timer("tile_inference"):
+        predictions = predict_batch(
+            model, tiles, classes=classes, conf=conf, batch_size=batch_size
+        )
+    metrics.inc_counter("tiles_inferred_total", len(tiles))
+
+    # Rows of each panorama's tiles: (view index, class id, confidence, xyxy)
+    tile_rows: List[List[Tuple[np.ndarray, ...]]] = [[] for _ in results_per_set]
+    for prediction, (set_idx, idx, x, y) in zip(predictions, tile_targets):
+        class_id, confidence, boxes = result_columns(prediction)
+        offset = np.array([x, y, x, y], dtype=np.float32)
+        tile_rows[set_idx].append(
+            (np.full(len(class_id), idx), class_id, confidence, boxes + offset)
+        )
+
+    return [
+        (
+            detections.append(*(np.concatenate(column) for column in zip(*rows)))
+            if rows
+            else detections
+        )
+        for detections, rows in zip(results_per_set, tile_rows)
+    ]
+
+
+def run_detection_on_views(
+    views: List[View],
+    conf: float = 0.5,
+    classes: List[int] = [],
+    batch_size: int = DETECTION_BATCH_SIZE,
+    model_path: str = MODEL_PATH,
+    tiled: bool = False,
+) -> Detections:
+    return run_detection_on_view_sets(
+        [views], conf, classes, batch_size, model_path, tiled
+    )[0]
+
+
+def run_detection_on_folders(
+    folder_paths: List[str],
+    conf: float = 0.5,
+    classes: List[int] = [],
+    batch_size: int = DETECTION_BATCH_SIZE,
+    model_path: str = MODEL_PATH,
+    tiled: bool = False,
+) -> List[Detections]:
+    view_sets = [load_views(folder_path) for folder_path in folder_paths]
+    return run_detection_on_view_sets(
+        view_sets, conf, classes, batch_size, model_path, tiled
+    )
+
+
+def run_detection_on_folder(
+    folder_path: str,
+    conf: float = 0.5,
+    classes: List[int] = [],
+    batch_size: int = DETECTION_BATCH_SIZE,
+    model_path: str = MODEL_PATH,
+    tiled: bool = False,
+) -> Detections:
+    return run_detection_on_folders(
+        [folder_path], conf, classes, batch_size, model_path, tiled
+    )[0]
@@ -0,0 +1,121 @@
+from math import ceil
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+from app.adapters.image_processing.projection_engine import projection_engine
+from app.adapters.instrumentation.metrics import metrics, stage_timer
+from app.adapters.object_detection.model_registry import model_registry
+from app.adapters.object_detection.yolo_inference import predict_batch
+from app.config import (
+    VIEW_SELECTION_CONF,
+    VIEW_SELECTION_MIN_DETAIL,
+    VIEW_SELECTION_MODEL_SIZE,
+)
+from app.entities.detection_settings import (
+    VIEW_SELECTION_MODES,
+    DetectionSettings,
+    get_detection_settings,
+    model_path_for_size,
+)
+from app.entities.detections import Detections
+from app.entities.view_plan import ViewPlan
+
+# Size of the low-resolution views each mode looks at
+STATS_VIEW_SIZE = 96
+MODEL_VIEW_SIZE = 320
+
+
+def select_views(
+    img: np.ndarray,
+    view_plan: ViewPlan,
+    mode: str = "off",
+    settings: Optional[DetectionSettings] = None,
+) -> List[int]:
+    """
+    Indices of the plan's views worth running the detection model on, judged
+    from low-resolution views of a downscaled copy of the panorama:
+
+    - "off" keeps every view.
+    - "stats" keeps views with image detail (mean absolute Laplacian) of at
+      least VIEW_SELECTION_MIN_DETAIL; flat ceilings and floors are skipped.
+    - "model" keeps views where the VIEW_SELECTION_MODEL_SIZE model finds one of
+      settings' classes with confidence VIEW_SELECTION_CONF.
+    """
+    if mode not in VIEW_SELECTION_MODES:
+        raise ValueError(
+            f"Unknown view selection: {mode}. "
+            f"Available: {', '.join(VIEW_SELECTION_MODES)}"
+        )
+
+    all_views = list(range(len(view_plan.angles)))
+    if mode == "off":
+        return all_views
+
+    with stage_timer("view_selection"):
+        if mode == "stats":
+            views = _low_res_views(img, view_plan, STATS_VIEW_SIZE)
+            selected = [
+                idx
+                for idx in all_views
+                if _detail(views[idx]) >= VIEW_SELECTION_MIN_DETAIL
+            ]
+        else:
+            settings = settings or get_detection_settings()
+            views = _low_res_views(img, view_plan, MODEL_VIEW_SIZE)
+            model = model_registry.get(model_path_for_size(VIEW_SELECTION_MODEL_SIZE))
+            predictions = predict_batch(
+                model.model,
+                views,
+                classes=list(settings.classes),
+                conf=VIEW_SELECTION_CONF,
+            )
+            selected = [idx for idx in all_views if len(predictions[idx].boxes) > 0]
+
+    metrics.inc_counter("views_selected_total", len(selected), mode=mode)
+    metrics.inc_counter(
+        "views_skipped_total", len(all_views) - len(selected), mode=mode
+    )
+    return selected
+
+
+def record_selection_audit(detections: Detections, selected: List[int], mode: str):
+    """
+    Counts the detections of an image whose views all ran, split by whether
+    select_views kept their view; skipped / all is the recall lost by mode.
+    """
+    view_counts = detections.view_counts()
+    kept = np.zeros(len(view_counts), dtype=bool)
+    kept[selected] = True
+    counts = {
+        "selected": int(view_counts[kept].sum()),
+        "skipped": int(view_counts[~kept].sum()),
+    }
+
+    metrics.inc_counter("view_selection_audited_images_total", mode=mode)
+    for view_state, count in counts.items():
+        metrics.inc_counter(
+            "view_selection_audit_detections_total", count, mode=mode, view=view_state
+        )
+
+
+def _low_res_views(img: np.ndarray, view_plan: ViewPlan, size: int) -> List[np.ndarray]:
+    # Downscale first: the projection then reads a panorama of about the views'
+    # resolution instead of the full image
+    width = ceil(360 / view_plan.fov * size)
+    h, w = img.shape[:2]
+    if w > width:
+        img = cv2.resize(
+            img, (width, round(h * width / w)), interpolation=cv2.INTER_AREA
+        )
+
+    return projection_engine.project(
+        img,
+        [(yaw, pitch, view_plan.fov, (size, size)) for yaw, pitch in view_plan.angles],
+    )
+
+
+def _detail(view: np.ndarray) -> float:
+    gray = cv2.cvtColor(view, cv2.COLOR_BGR2GRAY)
+    return float(np.abs(cv2.Laplacian(gray, cv2.CV_32F)).mean())
@@ -0,0 +1,139 @@
+"""
+Compares DeepSORT and spherical deduplication on a set of panoramas.
+
+Detection runs once per image; only postprocessing is timed for each mode. With
+--ground-truth (a JSON file mapping image filename to {class_id: count}) count
+errors are measured against it, otherwise against the DeepSORT counts.
+
+Without --images, synthetic panoramas are generated and detected with the stub
+model, as in benchmarks.pipeline: this times both modes offline, but count
+errors are only meaningful on a folder of real panoramas with --model weights.
+
+    python -m benchmarks.dedup --synthetic 4
+    python -m benchmarks.dedup --images path/to/panoramas --model yolo11n.pt
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import Any, Dict, Iterator, Optional, Tuple, cast
+
+import cv2
+import numpy as np
+from ultralytics import YOLO
+
+from app.adapters.object_detection.model_registry import model_registry
+from app.adapters.object_detection.yolo_inference import load_model
+from app.entities.view_plan import VIEW_PLANS
+from app.usecases.postprocess_detections import (
+    DEDUP_MODES,
+    postprocess_detections_with_tracking,
+)
+from app.usecases.preprocess_equirect import generate_views
+from app.usecases.run_object_detection import run_detection_on_views
+from benchmarks.pipeline import synthetic_panorama
+from benchmarks.stub_model import StubModel
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+
+def count_error(counts: Dict, reference: Dict) -> int:
+    class_ids = set(counts) | set(reference)
+    return sum(
+        abs(counts.get(class_id, 0) - reference.get(class_id, 0))
+        for class_id in class_ids
+    )
+
+
+def folder_images(images_dir: str) -> Iterator[Tuple[str, np.ndarray]]:
+    for filename in sorted(os.listdir(images_dir)):
+        if not filename.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        img = cv2.imread(os.path.join(images_dir, filename))
+        if img is not None:
+            yield filename, img
+
+
+def synthetic_images(count: int) -> Iterator[Tuple[str, np.ndarray]]:
+    for seed in range(count):
+        yield f"synthetic_{seed}.jpg", synthetic_panorama(2048, 1024, seed)
+
+
+def run(
+    images: Iterator[Tuple[str, np.ndarray]],
+    view_plan: str,
+    ground_truth: Optional[Dict],
+) -> Dict:
+    per_image = {}
+    totals = {mode: {"postprocess_s": 0.0, "count_error": 0} for mode in DEDUP_MODES}
+
+    for filename, img in images:
+        detections = run_detection_on_views(generate_views(img, VIEW_PLANS[view_plan]))
+
+        image_result: Dict[str, Dict[str, Any]] = {}
+        for mode in DEDUP_MODES:
+            start = time.perf_counter()
+            objects = postprocess_detections_with_tracking(
+                detections, img, dedup_mode=mode
+            )
+            elapsed = time.perf_counter() - start
+            counts = {class_id: data["count"] for class_id, data in objects.items()}
+            image_result[mode] = {"postprocess_s": elapsed, "counts": counts}
+            totals[mode]["postprocess_s"] += elapsed
+
+        reference = (
+            ground_truth.get(filename, {})
+            if ground_truth is not None
+            else image_result["deepsort"]["counts"]
+        )
+        for mode in DEDUP_MODES:
+            error = count_error(image_result[mode]["counts"], reference)
+            image_result[mode]["count_error"] = error
+            totals[mode]["count_error"] += error
+
+        per_image[filename] = image_result
+
+    return {
+        "view_plan": view_plan,
+        "reference": "ground_truth" if ground_truth is not None else "deepsort",
+        "images": len(per_image),
+        "totals": totals,
+        "per_image": per_image,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", help="Folder of panoramas")
+    parser.add_argument(
+        "--synthetic",
+        type=int,
+        default=4,
+        help="Number of synthetic panoramas to generate without --images",
+    )
+    parser.add_argument("--ground-truth", help="JSON with expected counts per image")
+    parser.add_argument("--view-plan", default="grid_12", choices=VIEW_PLANS)
+    parser.add_argument(
+        "--model", help="Local weights to use instead of the stub model"
+    )
+    args = parser.parse_args()
+
+    if args.model:
+        model_registry.register(load_model(args.model))
+    else:
+        model_registry.register(cast(YOLO, StubModel()))
+    images = (
+        folder_images(args.images) if args.images else synthetic_images(args.synthetic)
+    )
+
+    ground_truth = None
+    if args.ground_truth:
+        with open(args.ground_truth, "r") as f:
+            ground_truth = json.load(f)
+
+    print(json.dumps(run(images, args.view_plan, ground_truth), indent=2))
+
+
+if __name__ == "__main__":
+    main()
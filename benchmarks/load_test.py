@@ -0,0 +1,163 @@
+"""
+Load tests serve.py with an increasing number of model worker processes and
+reports requests per second and latency of /process for each.
+
+Each run starts its own server on --port with the result cache disabled, waits
+for the workers to load the model and then keeps --concurrency requests per
+worker in flight for --duration seconds.
+
+    python -m benchmarks.load_test --workers 1 2 4 8 --model models/yolo11n.pt
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+import cv2
+import requests
+
+from benchmarks.pipeline import RESOLUTIONS, synthetic_panorama
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def start_server(workers: int, port: int, model_path: Optional[str]):
+    env = dict(
+        os.environ,
+        MODEL_WORKERS=str(workers),
+        SERVER_HOST="127.0.0.1",
+        SERVER_PORT=str(port),
+        WARMUP_MODEL="true",
+        RESULT_CACHE_SIZE="0",
+        RESULT_CACHE_DIR="",
+    )
+    if model_path:
+        env["MODEL_PATH"] = os.path.abspath(model_path)
+    return subprocess.Popen(
+        [sys.executable, os.path.join(REPO_ROOT, "serve.py")],
+        cwd=REPO_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def wait_until_ready(base_url: str, workers: int, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            stats = requests.get(f"{base_url}/models/", timeout=1).json()
+            if stats["model_workers"]["alive"] == workers:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError(f"Server with {workers} model workers did not start")
+
+
+def drive_load(url: str, content: bytes, concurrency: int, duration: float) -> Dict:
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client():
+        nonlocal errors
+        session = requests.Session()
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            response = session.post(url, files={"files": ("pano.jpg", content)})
+            elapsed = time.perf_counter() - start
+            with lock:
+                if response.ok:
+                    latencies.append(elapsed)
+                else:
+                    errors += 1
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_s": len(latencies) / elapsed,
+        "p50_s": statistics.median(latencies) if latencies else None,
+        "p95_s": latencies[int(0.95 * (len(latencies) - 1))] if latencies else None,
+    }
+
+
+def run(
+    worker_counts: List[int],
+    concurrency: int,
+    duration: float,
+    resolution: str,
+    port: int,
+    model_path: Optional[str],
+    startup_timeout: float,
+) -> Dict:
+    _, encoded = cv2.imencode(".jpg", synthetic_panorama(*RESOLUTIONS[resolution]))
+    content = encoded.tobytes()
+    base_url = f"http://127.0.0.1:{port}"
+
+    results = {}
+    for workers in worker_counts:
+        server = start_server(workers, port, model_path)
+        try:
+            wait_until_ready(base_url, workers, startup_timeout)
+            results[str(workers)] = drive_load(
+                f"{base_url}/process/", content, concurrency * workers, duration
+            )
+        finally:
+            server.terminate()
+            server.wait()
+
+    baseline = results[str(worker_counts[0])]["requests_per_s"]
+    for result in results.values():
+        result["scaling"] = result["requests_per_s"] / baseline if baseline else None
+
+    return {
+        "cpu_count": os.cpu_count(),
+        "resolution": resolution,
+        "concurrency_per_worker": concurrency,
+        "duration_s": duration,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--resolution", default="2k", choices=RESOLUTIONS)
+    parser.add_argument("--port", type=int, default=5252)
+    parser.add_argument("--model", help="Weights to serve instead of MODEL_PATH")
+    parser.add_argument("--startup-timeout", type=float, default=120)
+    args = parser.parse_args()
+
+    report = run(
+        args.workers,
+        args.concurrency,
+        args.duration,
+        args.resolution,
+        args.port,
+        args.model,
+        args.startup_timeout,
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Compares the per-class NMS loop with batched_non_max_suppression.
+
+    python -m benchmarks.nms --sizes 100 1000 10000
+"""
+
+import argparse
+import json
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from app.entities.class_names import CLASS_ID_TO_NAME
+from app.usecases.postprocess_detections import (
+    batched_non_max_suppression,
+    non_max_suppression,
+)
+
+W_EQ, H_EQ = 8192, 4096
+
+
+def synthetic_boxes(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    xy = rng.uniform(0, [W_EQ, H_EQ], (n, 2))
+    wh = rng.uniform(20, 400, (n, 2))
+    boxes = np.concatenate([xy, np.minimum(xy + wh, [W_EQ, H_EQ])], axis=1)
+    scores = rng.uniform(0.5, 1, n)
+    class_ids = rng.choice(list(CLASS_ID_TO_NAME), n)
+    return boxes, scores, class_ids
+
+
+def per_class_nms(boxes, scores, class_ids, iou_threshold) -> np.ndarray:
+    keep = []
+    for class_id in np.unique(class_ids):
+        inds = np.where(class_ids == class_id)[0]
+        keep.extend(inds[non_max_suppression(boxes[inds], scores[inds], iou_threshold)])
+    return np.array(keep, dtype=np.int64)
+
+
+def best_of(fn, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(sizes: List[int], iou_threshold: float, repeats: int) -> Dict:
+    results = {}
+    for n in sizes:
+        boxes, scores, class_ids = synthetic_boxes(n)
+        loop_keep = per_class_nms(boxes, scores, class_ids, iou_threshold)
+        batched_keep = batched_non_max_suppression(
+            boxes, scores, class_ids, iou_threshold
+        )
+        loop_s = best_of(
+            lambda: per_class_nms(boxes, scores, class_ids, iou_threshold), repeats
+        )
+        batched_s = best_of(
+            lambda: batched_non_max_suppression(
+                boxes, scores, class_ids, iou_threshold
+            ),
+            repeats,
+        )
+        results[str(n)] = {
+            "per_class_loop_s": loop_s,
+            "batched_s": batched_s,
+            "speedup": loop_s / batched_s,
+            "same_kept": set(loop_keep.tolist()) == set(batched_keep.tolist()),
+        }
+    return {"iou_threshold": iou_threshold, "repeats": repeats, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[100, 1000, 10000])
+    parser.add_argument("--iou-threshold", type=float, default=0.05)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.sizes, args.iou_threshold, args.repeats), indent=2))
+
+
+if __name__ == "__main__":
+    main()
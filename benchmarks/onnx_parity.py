@@ -0,0 +1,151 @@
+"""
+Checks that an ONNX export detects the same objects as its PyTorch weights and
+compares their CPU latency on the views of synthetic panoramas.
+
+Detections of both backends are matched per view by class and IoU; an export is
+at parity when (nearly) every detection finds a partner and the confidences
+agree closely. INT8 exports are expected to drift a little more.
+
+    python -m benchmarks.onnx_parity models/yolo11x.pt models/yolo11x.onnx
+"""
+
+import argparse
+import json
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from app.adapters.object_detection.yolo_inference import (
+    load_model,
+    predict_batch,
+    result_columns,
+)
+from app.entities.view_plan import VIEW_PLANS
+from app.usecases.preprocess_equirect import generate_views
+from benchmarks.pipeline import synthetic_panorama
+
+
+def box_iou(a: List[float], b: List[float]) -> float:
+    w = max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+    h = max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = w * h
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def match_detections(
+    reference: List[Dict], candidate: List[Dict], iou_threshold: float
+) -> List[Dict]:
+    """Greedily pairs each reference detection with its best unused candidate."""
+    used = set()
+    pairs = []
+    for ref in sorted(reference, key=lambda det: -det["confidence"]):
+        best, best_iou = None, iou_threshold
+        for idx, det in enumerate(candidate):
+            if idx in used or det["class_id"] != ref["class_id"]:
+                continue
+            iou = box_iou(ref["xyxy"], det["xyxy"])
+            if iou >= best_iou:
+                best, best_iou = idx, iou
+        if best is not None:
+            used.add(best)
+            pairs.append(
+                {
+                    "iou": best_iou,
+                    "confidence_diff": abs(
+                        ref["confidence"] - candidate[best]["confidence"]
+                    ),
+                }
+            )
+    return pairs
+
+
+def result_to_dicts(result) -> List[Dict]:
+    class_ids, confidences, boxes = result_columns(result)
+    return [
+        {"class_id": class_id, "confidence": confidence, "xyxy": xyxy}
+        for class_id, confidence, xyxy in zip(
+            class_ids.tolist(), confidences.tolist(), boxes.tolist()
+        )
+    ]
+
+
+def timed_detections(model, imgs: List[np.ndarray], conf: float, batch_size: int):
+    start = time.perf_counter()
+    results = predict_batch(model, imgs, conf=conf, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+    return [result_to_dicts(result) for result in results], elapsed
+
+
+def run(
+    pytorch_path: str,
+    onnx_path: str,
+    images: int,
+    view_plan: str,
+    conf: float,
+    iou_threshold: float,
+    batch_size: int,
+) -> Dict:
+    pytorch_model = load_model(pytorch_path)
+    onnx_model = load_model(onnx_path)
+
+    imgs: List[np.ndarray] = []
+    for seed in range(images):
+        views = generate_views(
+            synthetic_panorama(2048, 1024, seed), VIEW_PLANS[view_plan]
+        )
+        imgs.extend(img for img, _ in views)
+
+    # Warm up both runtimes so only steady-state inference is timed
+    timed_detections(pytorch_model, imgs[:1], conf, batch_size)
+    timed_detections(onnx_model, imgs[:1], conf, batch_size)
+    reference, pytorch_s = timed_detections(pytorch_model, imgs, conf, batch_size)
+    candidate, onnx_s = timed_detections(onnx_model, imgs, conf, batch_size)
+
+    pairs = []
+    for ref_dets, cand_dets in zip(reference, candidate):
+        pairs.extend(match_detections(ref_dets, cand_dets, iou_threshold))
+    n_reference = sum(len(dets) for dets in reference)
+    n_candidate = sum(len(dets) for dets in candidate)
+
+    return {
+        "views": len(imgs),
+        "pytorch": {"detections": n_reference, "inference_s": pytorch_s},
+        "onnx": {"detections": n_candidate, "inference_s": onnx_s},
+        "speedup": pytorch_s / onnx_s,
+        "matched": len(pairs),
+        "recall_vs_pytorch": len(pairs) / n_reference if n_reference else 1.0,
+        "precision_vs_pytorch": len(pairs) / n_candidate if n_candidate else 1.0,
+        "mean_iou": float(np.mean([p["iou"] for p in pairs])) if pairs else None,
+        "max_confidence_diff": (
+            max(p["confidence_diff"] for p in pairs) if pairs else None
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("pytorch_path")
+    parser.add_argument("onnx_path")
+    parser.add_argument("--images", type=int, default=2)
+    parser.add_argument("--view-plan", default="grid_12", choices=VIEW_PLANS)
+    parser.add_argument("--conf", type=float, default=0.25)
+    parser.add_argument("--iou-threshold", type=float, default=0.9)
+    parser.add_argument("--batch-size", type=int, default=12)
+    args = parser.parse_args()
+
+    report = run(
+        args.pytorch_path,
+        args.onnx_path,
+        args.images,
+        args.view_plan,
+        args.conf,
+        args.iou_threshold,
+        args.batch_size,
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
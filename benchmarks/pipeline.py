@@ -0,0 +1,251 @@
+"""
+Times each stage of the 360° pipeline and the /process and /detect routes on
+synthetic panoramas. Runs on CPU without network access: /detect downloads from
+a loopback HTTP server and detection uses a stub model unless --model points to
+local weights (e.g. a yolo11n.pt).
+
+    python -m benchmarks.pipeline --resolutions 2k 4k --output pipeline.json
+"""
+
+import argparse
+import contextlib
+import functools
+import io
+import json
+import os
+import platform
+import statistics
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Optional, cast
+
+import cv2
+import numpy as np
+import torch
+from ultralytics import YOLO
+
+from app.adapters.image_processing.coordinate_mapper import (
+    perspective_bboxes_to_equirectangular,
+)
+from app.adapters.image_processing.perspective_converter import (
+    convert_to_perspective,
+)
+from app.adapters.object_detection.model_registry import model_registry
+from app.adapters.object_detection.yolo_inference import load_model
+from app.adapters.tracking.deep_sort_tracking import DeepSortTracker
+from app.entities.view_plan import VIEW_PLANS
+from app.gateways.result_cache import result_cache
+from app.main import create_app
+from app.usecases.postprocess_detections import (
+    batched_non_max_suppression,
+    postprocess_detections_with_tracking,
+)
+from app.usecases.preprocess_equirect import preprocess_image
+from app.usecases.run_object_detection import run_detection_on_folder
+from benchmarks.stub_model import StubModel
+
+RESOLUTIONS = {
+    "2k": (2048, 1024),
+    "4k": (3840, 1920),
+    "8k": (7680, 3840),
+}
+
+
+def synthetic_panorama(width: int, height: int, seed: int = 0) -> np.ndarray:
+    """Smooth random texture, closer to a photo than white noise once encoded."""
+    rng = np.random.default_rng(seed)
+    coarse = rng.integers(0, 256, (height // 32, width // 32, 3), dtype=np.uint8)
+    img = cv2.resize(coarse, (width, height), interpolation=cv2.INTER_CUBIC)
+    noise = rng.integers(-8, 9, img.shape, dtype=np.int16)
+    return np.clip(img.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def timed(fn: Callable, repeats: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return {"best_s": min(timings), "mean_s": statistics.mean(timings)}
+
+
+@contextlib.contextmanager
+def serve_directory(directory: str) -> Iterator[str]:
+    """Serves directory over HTTP on loopback and yields its base URL."""
+    handler = functools.partial(_QuietHandler, directory=directory)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def bench_resolution(
+    client,
+    img: np.ndarray,
+    view_plan: str,
+    repeats: int,
+    work_dir: str,
+    base_url: str,
+) -> Dict:
+    plan = VIEW_PLANS[view_plan]
+    h_eq, w_eq = img.shape[:2]
+    stages = {}
+
+    def project_views():
+        for yaw, pitch in plan.angles:
+            convert_to_perspective(img, yaw, pitch, plan.fov, plan.output_size)
+
+    # Warm up the remap tables so only steady-state projection is timed
+    project_views()
+    stages["convert_to_perspective"] = timed(project_views, repeats)
+
+    image_path = os.path.join(work_dir, f"pano_{w_eq}x{h_eq}.jpg")
+    cv2.imwrite(image_path, img)
+    views_dir = preprocess_image(
+        image_path, os.path.join(work_dir, f"views_{w_eq}x{h_eq}"), plan
+    )
+
+    detections = run_detection_on_folder(views_dir)
+    stages["run_detection_on_folder"] = timed(
+        lambda: run_detection_on_folder(views_dir), repeats
+    )
+
+    boxes = detections.xyxy
+    w_out, h_out, yaw, pitch, fov = detections.view_params().T
+    scores, class_ids = detections.confidence, detections.class_id
+
+    def map_boxes():
+        return perspective_bboxes_to_equirectangular(
+            boxes, w_out, h_out, yaw, pitch, fov, w_eq, h_eq
+        )
+
+    boxes_eq = map_boxes()
+    stages["perspective_bbox_to_equirectangular"] = timed(map_boxes, repeats)
+
+    def nms():
+        return batched_non_max_suppression(
+            boxes_eq, scores, class_ids, 0.05, wrap_width=w_eq
+        )
+
+    keep = nms()
+    stages["non_max_suppression"] = timed(nms, repeats)
+
+    tracking_input = [
+        [np.minimum(bbox, [w_eq, h_eq, w_eq, h_eq]), score, class_id]
+        for bbox, score, class_id in zip(boxes_eq[keep], scores[keep], class_ids[keep])
+    ]
+    stages["tracking"] = timed(
+        lambda: DeepSortTracker().update(img, tracking_input), repeats
+    )
+    stages["postprocess_detections_with_tracking"] = timed(
+        lambda: postprocess_detections_with_tracking(detections, img), repeats
+    )
+
+    with open(image_path, "rb") as f:
+        content = f.read()
+
+    def process_route():
+        # Cached results would turn repeats into lookups
+        result_cache.clear()
+        response = client.post(
+            f"/process/?view_plan={view_plan}",
+            data={"files": [(io.BytesIO(content), "pano.jpg")]},
+            content_type="multipart/form-data",
+        )
+        assert response.status_code == 200, response.get_data(as_text=True)
+
+    process_route()
+    stages["process_route"] = timed(process_route, repeats)
+
+    image_url = f"{base_url}/{os.path.basename(image_path)}"
+
+    def detect_route():
+        result_cache.clear()
+        response = client.post(f"/detect/?view_plan={view_plan}", json=[image_url])
+        assert response.status_code == 200, response.get_data(as_text=True)
+
+    detect_route()
+    stages["detect_route"] = timed(detect_route, repeats)
+
+    return {
+        "width": w_eq,
+        "height": h_eq,
+        "views": len(plan.angles),
+        "boxes": len(boxes),
+        "boxes_after_nms": len(keep),
+        "stages": stages,
+    }
+
+
+def run(
+    resolutions: List[str],
+    view_plan: str,
+    repeats: int,
+    model_path: Optional[str],
+) -> Dict:
+    if model_path:
+        model_registry.register(load_model(model_path))
+    else:
+        model_registry.register(cast(YOLO, StubModel()))
+
+    app = create_app()
+    client = app.test_client()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir, serve_directory(
+        work_dir
+    ) as base_url:
+        for name in resolutions:
+            img = synthetic_panorama(*RESOLUTIONS[name])
+            results[name] = bench_resolution(
+                client, img, view_plan, repeats, work_dir, base_url
+            )
+
+    return {
+        "model": model_path or "stub",
+        "view_plan": view_plan,
+        "repeats": repeats,
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "torch_threads": torch.get_num_threads(),
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--resolutions", nargs="+", default=["2k", "4k"], choices=RESOLUTIONS
+    )
+    parser.add_argument("--view-plan", default="grid_12", choices=VIEW_PLANS)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument(
+        "--model", help="Local weights to use instead of the stub model"
+    )
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    args = parser.parse_args()
+
+    report = json.dumps(
+        run(args.resolutions, args.view_plan, args.repeats, args.model), indent=2
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
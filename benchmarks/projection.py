@@ -0,0 +1,78 @@
+"""
+Compares serial and parallel perspective projection of the 12 default views.
+
+    python -m benchmarks.projection --workers 8 --repeats 5
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from app.adapters.image_processing.projection_engine import ProjectionEngine
+from app.entities.view_plan import GRID_12
+
+RESOLUTIONS = {
+    "4k": (3840, 1920),
+    "8k": (7680, 3840),
+}
+
+
+def synthetic_equirect(width: int, height: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+
+def default_view_params() -> List:
+    return [
+        (yaw, pitch, GRID_12.fov, GRID_12.output_size) for yaw, pitch in GRID_12.angles
+    ]
+
+
+def time_engine(engine: ProjectionEngine, img: np.ndarray, repeats: int) -> float:
+    view_params = default_view_params()
+    # Warm up the remap table cache so only steady-state projection is timed
+    engine.project(img, view_params)
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        engine.project(img, view_params)
+    return (time.perf_counter() - start) / repeats
+
+
+def run(resolutions: List[str], workers: int, repeats: int) -> Dict:
+    serial = ProjectionEngine(workers=1)
+    parallel = ProjectionEngine(workers=workers)
+
+    results = {}
+    for name in resolutions:
+        img = synthetic_equirect(*RESOLUTIONS[name])
+        serial_s = time_engine(serial, img, repeats)
+        parallel_s = time_engine(parallel, img, repeats)
+        results[name] = {
+            "serial_s": serial_s,
+            "parallel_s": parallel_s,
+            "speedup": serial_s / parallel_s,
+        }
+
+    parallel.shutdown()
+    return {"workers": parallel.workers, "repeats": repeats, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--resolutions", nargs="+", default=list(RESOLUTIONS), choices=RESOLUTIONS
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.resolutions, args.workers, args.repeats), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+from typing import List
+
+import numpy as np
+
+from app.entities.class_names import CLASS_ID_TO_NAME
+
+
+class _StubBoxes:
+    def __init__(self, cls: np.ndarray, conf: np.ndarray, xyxy: np.ndarray):
+        self.cls = cls
+        self.conf = conf
+        self.xyxy = xyxy
+
+    def __iter__(self):
+        for i in range(len(self.cls)):
+            j = i + 1
+            yield _StubBoxes(self.cls[i:j], self.conf[i:j], self.xyxy[i:j])
+
+
+class _StubResult:
+    def __init__(self, boxes: _StubBoxes):
+        self.boxes = boxes
+        self.names = CLASS_ID_TO_NAME
+
+
+class StubModel:
+    """
+    Stands in for an ultralytics YOLO model without weights: returns a fixed
+    number of furniture boxes per image, derived from the image content so runs
+    are reproducible.
+    """
+
+    def __init__(self, boxes_per_image: int = 8):
+        self.boxes_per_image = boxes_per_image
+
+    def predict(self, img, conf=0.5, classes=None, **kwargs) -> List[_StubResult]:
+        imgs = img if isinstance(img, list) else [img]
+        return [self._predict_one(image, conf, classes) for image in imgs]
+
+    def _predict_one(self, image: np.ndarray, conf, classes) -> _StubResult:
+        h, w = image.shape[:2]
+        rng = np.random.default_rng(int(image[::64, ::64].sum()))
+        n = self.boxes_per_image
+
+        class_ids = np.array(classes or list(CLASS_ID_TO_NAME))
+        cls = rng.choice(class_ids, n).astype(np.float32)
+        scores = rng.uniform(conf, 1, n).astype(np.float32)
+        xy = rng.uniform(0, [w * 0.8, h * 0.8], (n, 2))
+        wh = rng.uniform(0.05, 0.2, (n, 2)) * [w, h]
+        xyxy = np.concatenate([xy, np.minimum(xy + wh, [w, h])], axis=1)
+
+        return _StubResult(_StubBoxes(cls, scores, xyxy.astype(np.float32)))
@@ -0,0 +1,108 @@
+"""
+Measures what adaptive view selection saves and what it misses on a local set
+of panoramas.
+
+Every view of each image is run through the detection model once; a selection
+mode then decides which views it would have skipped. Detections in skipped
+views are the recall lost, and the time of the skipped views' projection and
+inference (estimated per view) is weighed against the time of the selection
+pass itself.
+
+    python -m benchmarks.view_selection --images fixtures/panoramas --mode stats
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import Any, Dict
+
+import cv2
+
+from app.entities.detection_settings import VIEW_SELECTION_MODES
+from app.entities.view_plan import VIEW_PLANS
+from app.usecases.preprocess_equirect import generate_views
+from app.usecases.run_object_detection import run_detection_on_views
+from app.usecases.select_views import select_views
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+
+def run(images_dir: str, view_plan: str, mode: str) -> Dict:
+    plan = VIEW_PLANS[view_plan]
+    per_image = {}
+    totals: Dict[str, Any] = {
+        "views": 0,
+        "views_skipped": 0,
+        "detections": 0,
+        "detections_lost": 0,
+        "detection_s": 0.0,
+        "selection_s": 0.0,
+        "saved_s": 0.0,
+    }
+
+    for filename in sorted(os.listdir(images_dir)):
+        if not filename.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        img = cv2.imread(os.path.join(images_dir, filename))
+        if img is None:
+            continue
+
+        start = time.perf_counter()
+        detections = run_detection_on_views(generate_views(img, plan))
+        detection_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        selected = set(select_views(img, plan, mode))
+        selection_s = time.perf_counter() - start
+
+        view_counts = detections.view_counts()
+        skipped = [idx for idx in range(len(view_counts)) if idx not in selected]
+        n_detections = len(detections)
+        lost = int(view_counts[skipped].sum())
+        saved_s = detection_s * len(skipped) / len(view_counts)
+
+        per_image[filename] = {
+            "views_skipped": skipped,
+            "detections": n_detections,
+            "detections_lost": lost,
+            "detection_s": detection_s,
+            "selection_s": selection_s,
+            "saved_s": saved_s,
+        }
+        totals["views"] += len(view_counts)
+        totals["views_skipped"] += len(skipped)
+        totals["detections"] += n_detections
+        totals["detections_lost"] += lost
+        totals["detection_s"] += detection_s
+        totals["selection_s"] += selection_s
+        totals["saved_s"] += saved_s
+
+    n_detections = totals["detections"]
+    return {
+        "view_plan": view_plan,
+        "mode": mode,
+        "images": len(per_image),
+        "recall": 1 - totals["detections_lost"] / n_detections if n_detections else 1.0,
+        "net_saved_s": totals["saved_s"] - totals["selection_s"],
+        "totals": totals,
+        "per_image": per_image,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", required=True, help="Folder of panoramas")
+    parser.add_argument("--view-plan", default="grid_12", choices=VIEW_PLANS)
+    parser.add_argument(
+        "--mode",
+        default="stats",
+        choices=[mode for mode in VIEW_SELECTION_MODES if mode != "off"],
+    )
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.images, args.view_plan, args.mode), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+"""
+Exports YOLO weights to ONNX for the ONNX Runtime backend; point MODEL_PATH at
+the printed path to serve it.
+
+    python export_model.py models/yolo11x.pt --int8
+"""
+
+import argparse
+
+from app.adapters.object_detection.onnx_inference import export_onnx
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("model_path")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument(
+        "--int8", action="store_true", help="Also quantize the weights to INT8"
+    )
+    args = parser.parse_args()
+
+    print(export_onnx(args.model_path, args.imgsz, args.int8))
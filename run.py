@@ -1,6 +1,9 @@
 from app.main import create_app
 
-app = create_app()
+# Spawned model workers import the main module again as __mp_main__; only the
+# serving process builds the app. WSGI servers can point at run:app.
+if __name__ != "__mp_main__":
+    app = create_app()
 
 if __name__ == "__main__":
     app.run(port=5151, debug=True)
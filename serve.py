@@ -0,0 +1,17 @@
+"""
+Production server: waitress with SERVER_THREADS request threads instead of the
+Flask development server. Set MODEL_WORKERS to run detection in that many model
+worker processes.
+
+    MODEL_WORKERS=4 python serve.py
+"""
+
+if __name__ == "__main__":
+    # Imported here: model workers are spawned, re-import this module and must
+    # read the configuration only after setting their thread counts
+    from waitress import serve
+
+    from app.config import SERVER_HOST, SERVER_PORT, SERVER_THREADS
+    from app.main import create_app
+
+    serve(create_app(), host=SERVER_HOST, port=SERVER_PORT, threads=SERVER_THREADS)
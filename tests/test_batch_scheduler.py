@@ -0,0 +1,98 @@
+import threading
+
+import pytest
+
+from app.adapters.object_detection.batch_scheduler import (
+    MicroBatchScheduler,
+    _PendingRequest,
+)
+
+TIMEOUT = 10
+
+
+class _RecordingRunner:
+    """A run_batch that returns each image as its result and records every call."""
+
+    def __init__(self, error=None):
+        self.calls = []
+        self.error = error
+        self._lock = threading.Lock()
+
+    def __call__(self, model, imgs, classes, conf):
+        with self._lock:
+            self.calls.append((model, list(imgs), classes, conf))
+        if self.error is not None:
+            raise self.error
+        return list(imgs)
+
+
+def _submit(scheduler, requests):
+    # Queue everything before the worker starts, so batching does not depend on
+    # thread timing
+    for request in requests:
+        scheduler._queue.put(request)
+    scheduler._ensure_started()
+
+
+def test_groups_requests_by_model_classes_and_conf():
+    model_a, model_b = object(), object()
+    runner = _RecordingRunner()
+    scheduler = MicroBatchScheduler(runner, max_batch_size=16, max_wait_ms=200)
+    requests = [
+        _PendingRequest(model_a, ["a1", "a2"], [0], 0.25),
+        _PendingRequest(model_b, ["b1"], [0], 0.25),
+        _PendingRequest(model_a, ["a3"], [0], 0.25),
+        _PendingRequest(model_a, ["c1"], [1], 0.25),
+        _PendingRequest(model_a, ["d1"], [0], 0.5),
+    ]
+    _submit(scheduler, requests)
+
+    results = [request.future.result(TIMEOUT) for request in requests]
+
+    assert results == [["a1", "a2"], ["b1"], ["a3"], ["c1"], ["d1"]]
+    assert sorted(imgs for _, imgs, _, _ in runner.calls) == [
+        ["a1", "a2", "a3"],
+        ["b1"],
+        ["c1"],
+        ["d1"],
+    ]
+    assert scheduler.stats()["batch_size_histogram"] == {1: 3, 3: 1}
+
+
+def test_request_that_overflows_a_batch_starts_the_next_one():
+    model = object()
+    runner = _RecordingRunner()
+    scheduler = MicroBatchScheduler(runner, max_batch_size=3, max_wait_ms=200)
+    requests = [
+        _PendingRequest(model, ["a1", "a2"], [0], 0.25),
+        _PendingRequest(model, ["b1", "b2"], [0], 0.25),
+        _PendingRequest(model, ["c1"], [0], 0.25),
+    ]
+    _submit(scheduler, requests)
+
+    results = [request.future.result(TIMEOUT) for request in requests]
+
+    assert results == [["a1", "a2"], ["b1", "b2"], ["c1"]]
+    assert [imgs for _, imgs, _, _ in runner.calls] == [
+        ["a1", "a2"],
+        ["b1", "b2", "c1"],
+    ]
+    assert scheduler.stats() == {
+        "queue_depth": 0,
+        "batches": 2,
+        "batch_size_histogram": {2: 1, 3: 1},
+    }
+
+
+def test_model_error_is_raised_to_every_caller_in_the_batch():
+    model = object()
+    runner = _RecordingRunner(error=RuntimeError("out of memory"))
+    scheduler = MicroBatchScheduler(runner, max_batch_size=16, max_wait_ms=200)
+    requests = [_PendingRequest(model, [name], [0], 0.25) for name in ("a", "b")]
+    _submit(scheduler, requests)
+
+    for request in requests:
+        with pytest.raises(RuntimeError, match="out of memory"):
+            request.future.result(TIMEOUT)
+    assert len(runner.calls) == 1
+    assert scheduler.stats()["batches"] == 0
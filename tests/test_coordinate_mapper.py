@@ -0,0 +1,124 @@
+from math import asin, atan2, cos, pi, radians, sin, tan
+
+import numpy as np
+import pytest
+
+from app.adapters.image_processing import perspective_converter
+from app.adapters.image_processing.coordinate_mapper import (
+    perspective_bboxes_to_equirectangular,
+)
+from app.entities.view_plan import VIEW_PLANS
+from app.usecases.postprocess_detections import (
+    batched_non_max_suppression,
+    non_max_suppression,
+)
+
+W_EQ, H_EQ = 2048, 1024
+VIEW = 512
+FOV = 90
+CENTRED_BOX = [200.0, 200.0, 312.0, 312.0]
+
+
+def _corner_bbox(bbox, yaw, pitch):
+    """The previous mapping: the box spanned by its four projected corners."""
+    yaw_r, pitch_r = radians(yaw), radians(pitch)
+    ry = np.array(
+        [[cos(yaw_r), 0, sin(yaw_r)], [0, 1, 0], [-sin(yaw_r), 0, cos(yaw_r)]]
+    )
+    rx = np.array(
+        [[1, 0, 0], [0, cos(pitch_r), -sin(pitch_r)], [0, sin(pitch_r), cos(pitch_r)]]
+    )
+    focal = 1 / tan(radians(FOV) / 2)
+    us, vs = [], []
+    x1, y1, x2, y2 = bbox
+    for x, y in [(x1, y1), (x2, y1), (x2, y2), (x1, y2)]:
+        d = np.array([x / VIEW * 2 - 1, 1 - y / VIEW * 2, focal])
+        d = rx @ ry @ (d / np.linalg.norm(d))
+        us.append((atan2(d[0], d[2]) / (2 * pi) + 0.5) * W_EQ)
+        vs.append((0.5 - asin(np.clip(d[1], -1, 1)) / pi) * H_EQ)
+    return [max(0, min(us)), max(0, min(vs)), min(W_EQ, max(us)), min(H_EQ, max(vs))]
+
+
+def _map(bbox, yaw, pitch):
+    return perspective_bboxes_to_equirectangular(
+        [bbox], VIEW, VIEW, yaw, pitch, FOV, W_EQ, H_EQ
+    )[0]
+
+
+def test_box_on_the_seam_extends_past_the_right_edge():
+    # The yaw 180 view looks straight at the ±180° seam
+    box = _map(CENTRED_BOX, 180, 0)
+
+    assert 0 <= box[0] < W_EQ < box[2]
+    assert box[0] + box[2] == pytest.approx(2 * W_EQ)
+
+
+def test_both_nms_paths_merge_a_seam_box_with_its_wrapped_copy():
+    box = _map(CENTRED_BOX, 180, 0)
+    wrapped = box - np.array([W_EQ, 0, W_EQ, 0])
+    boxes = np.stack([box, wrapped])
+    scores = np.array([0.9, 0.8])
+
+    assert len(non_max_suppression(boxes, scores, 0.5, wrap_width=W_EQ)) == 1
+    keep = batched_non_max_suppression(
+        boxes, scores, np.zeros(2, dtype=int), 0.5, wrap_width=W_EQ
+    )
+    assert len(keep) == 1
+    assert len(batched_non_max_suppression(boxes, scores, np.zeros(2), 0.5)) == 2
+
+
+@pytest.mark.parametrize("pitch, top, bottom", [(-90, 0, None), (90, None, H_EQ)])
+def test_box_around_a_pole_spans_the_full_width(pitch, top, bottom):
+    x1, y1, x2, y2 = _map(CENTRED_BOX, 0, pitch)
+
+    assert (x1, x2) == (0, W_EQ)
+    if top is not None:
+        assert y1 == top and y2 < H_EQ / 2
+    else:
+        assert y2 == bottom and y1 > H_EQ / 2
+
+
+@pytest.mark.parametrize(
+    "yaw, pitch", [(0, 0), (90, 0), (270, 45), (0, -45), (45, 20), (315, -30)]
+)
+def test_boxes_off_the_seam_and_poles_match_the_corner_mapping(yaw, pitch):
+    rng = np.random.default_rng(yaw + pitch + 90)
+    for _ in range(5):
+        x1, y1 = rng.uniform(50, 350, 2)
+        bbox = [x1, y1, x1 + rng.uniform(10, 100), y1 + rng.uniform(10, 100)]
+        mapped = _map(bbox, yaw, pitch)
+        reference = np.array(_corner_bbox(bbox, yaw, pitch))
+
+        # Sampling the edges only adds the bulge of a curved edge past its corners
+        assert np.all(mapped[:2] <= reference[:2] + 1e-6)
+        assert np.all(mapped[2:] >= reference[2:] - 1e-6)
+        np.testing.assert_allclose(mapped, reference, atol=5)
+
+
+@pytest.mark.parametrize("plan", VIEW_PLANS.values(), ids=VIEW_PLANS.keys())
+def test_rendered_pixels_map_back_to_where_they_were_sampled(plan, monkeypatch):
+    monkeypatch.setattr(perspective_converter, "PERSPECTIVE_FIXED_POINT_MAPS", False)
+    w_out, h_out = plan.output_size
+    cols = np.linspace(0, w_out - 1, 7).astype(int)
+    rows = np.linspace(0, h_out - 1, 7).astype(int)
+    for yaw, pitch in plan.angles:
+        map_x, map_y = perspective_converter.get_perspective_maps.__wrapped__(
+            yaw, pitch, plan.fov, plan.output_size, (W_EQ, H_EQ)
+        )
+        # The maps sample pixel i at i / (size - 1) of the view, box coordinates
+        # put it at i / size
+        points = [
+            [c * w_out / (w_out - 1), r * h_out / (h_out - 1)] * 2
+            for r in rows
+            for c in cols
+        ]
+        mapped = perspective_bboxes_to_equirectangular(
+            points, w_out, h_out, yaw, pitch, plan.fov, W_EQ, H_EQ
+        )
+
+        expected_u = map_x[rows][:, cols].ravel()
+        expected_v = map_y[rows][:, cols].ravel()
+        # A point on the seam may land on either side of it
+        du = (mapped[:, 0] - expected_u + W_EQ / 2) % W_EQ - W_EQ / 2
+        np.testing.assert_allclose(du, 0, atol=0.05)
+        np.testing.assert_allclose(mapped[:, 1], expected_v, atol=0.05)
@@ -0,0 +1,62 @@
+from dataclasses import asdict
+
+import numpy as np
+
+from app.entities.detection_settings import DetectionSettings
+from app.entities.detections import Detections
+from app.entities.view_plan import VIEW_PLANS
+from app.gateways.result_cache import ResultCache
+from app.usecases import detect_objects
+
+SETTINGS = DetectionSettings(model_path="yolo11n.pt", conf=0.5, classes=())
+
+
+def test_views_cache_ignores_entries_of_the_old_layout(monkeypatch, tmp_path):
+    cache = ResultCache(max_entries=8, disk_dir=str(tmp_path))
+    monkeypatch.setattr(detect_objects, "result_cache", cache)
+    monkeypatch.setattr(
+        detect_objects, "decode_image", lambda content: np.zeros((8, 16, 3))
+    )
+    monkeypatch.setattr(
+        detect_objects,
+        "detect_views_in_image",
+        lambda img, view_plan, settings: Detections.empty([]),
+    )
+    view_plan = VIEW_PLANS["cube_6"]
+    # Per-view dicts, as cached before the columnar layout, under the old key
+    old_key = cache.make_key(
+        b"pano", kind="views", detection=asdict(SETTINGS), view_plan=asdict(view_plan)
+    )
+    cache.put(old_key, [{"filename": "view_000.jpg", "detections": []}])
+
+    detections = detect_objects.detect_views_in_content(b"pano", view_plan, SETTINGS)
+    assert len(detections) == 0
+
+    cached = detect_objects.detect_views_in_content(b"pano", view_plan, SETTINGS)
+    assert cached.views == [] and len(cached) == 0
+
+
+def test_views_cache_format_bump_misses_old_entries(monkeypatch, tmp_path):
+    cache = ResultCache(max_entries=8, disk_dir=str(tmp_path))
+    monkeypatch.setattr(detect_objects, "result_cache", cache)
+    monkeypatch.setattr(
+        detect_objects, "decode_image", lambda content: np.zeros((8, 16, 3))
+    )
+    calls = []
+
+    def detect(img, view_plan, settings):
+        calls.append(view_plan.name)
+        return Detections.empty([])
+
+    monkeypatch.setattr(detect_objects, "detect_views_in_image", detect)
+    view_plan = VIEW_PLANS["cube_6"]
+
+    detect_objects.detect_views_in_content(b"pano", view_plan, SETTINGS)
+    detect_objects.detect_views_in_content(b"pano", view_plan, SETTINGS)
+    assert len(calls) == 1
+
+    monkeypatch.setattr(
+        detect_objects, "VIEWS_CACHE_FORMAT", detect_objects.VIEWS_CACHE_FORMAT + 1
+    )
+    detect_objects.detect_views_in_content(b"pano", view_plan, SETTINGS)
+    assert len(calls) == 2
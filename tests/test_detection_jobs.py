@@ -0,0 +1,62 @@
+import threading
+import time
+
+from app.entities.job import JOB_DONE, Job
+from app.entities.view_plan import VIEW_PLANS
+from app.usecases import detection_jobs
+from app.usecases.detection_jobs import JobManager
+
+
+def _wait_until_finished(job: Job, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while job.finished_at is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_same_named_uploads_keep_separate_results(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        detection_jobs,
+        "detect_views_in_content",
+        lambda content, view_plan, settings: {"size": len(content)},
+    )
+    manager = JobManager(workers=1, queue_size=2)
+    upload_dir = tmp_path / "uploads"
+    upload_dir.mkdir()
+    images = []
+    for idx, content in enumerate([b"a", b"bb"]):
+        path = upload_dir / f"upload_{idx}"
+        path.write_bytes(content)
+        images.append(("pano.jpg", str(path)))
+
+    job = manager.submit_process(str(upload_dir), images, VIEW_PLANS["grid_12"])
+    _wait_until_finished(job)
+
+    results = job.to_dict()["results"]
+    assert job.status == JOB_DONE
+    assert sorted((r["index"], r["views_detected"]["size"]) for r in results) == [
+        (0, 1),
+        (1, 2),
+    ]
+    assert {r["original_file"] for r in results} == {"pano.jpg"}
+    assert not upload_dir.exists()
+
+
+def test_to_dict_while_results_are_added():
+    job = Job(id="job", kind="process", total_images=5000)
+    errors = []
+
+    def poll():
+        try:
+            while job.completed_images < job.total_images:
+                job.to_dict()
+        except Exception as e:
+            errors.append(e)
+
+    poller = threading.Thread(target=poll)
+    poller.start()
+    for idx in range(job.total_images):
+        job.add_result(idx, {"original_file": f"{idx}.jpg", "error": "Invalid image"})
+    poller.join()
+
+    assert not errors
+    assert len(job.to_dict()["results"]) == job.total_images
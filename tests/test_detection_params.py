@@ -0,0 +1,56 @@
+import pytest
+from flask import Flask
+
+from app.adapters.object_detection.model_registry import model_registry
+from app.entities.detection_settings import model_path_for_size
+from app.entities.view_plan import VIEW_PLANS
+from app.routes.detection_params import detection_settings_from_request
+
+app = Flask(__name__)
+
+
+@pytest.fixture
+def installed_sizes(monkeypatch):
+    monkeypatch.setattr(
+        model_registry,
+        "is_available",
+        lambda model_path: model_path == model_path_for_size("n"),
+    )
+
+
+def test_accepts_installed_model_size(installed_sizes):
+    with app.test_request_context("/?model_size=n"):
+        settings = detection_settings_from_request(VIEW_PLANS["grid_12"])
+
+    assert settings.model_path == model_path_for_size("n")
+
+
+def test_rejects_model_size_without_weights(installed_sizes):
+    with app.test_request_context("/?model_size=s"):
+        with pytest.raises(ValueError, match="Available: n$"):
+            detection_settings_from_request(VIEW_PLANS["grid_12"])
+
+
+def test_registered_model_is_available(tmp_path):
+    model_path = str(tmp_path / "yolo11n.pt")
+    assert not model_registry.is_available(model_path)
+
+    model_registry.register(object(), model_path)  # type: ignore[arg-type]
+    try:
+        assert model_registry.is_available(model_path)
+    finally:
+        model_registry.clear()
+
+
+@pytest.mark.parametrize("view_plan", ["grid_12", "cube_6"])
+def test_rejects_tiled_for_views_smaller_than_a_tile(view_plan):
+    with app.test_request_context("/?tiled=true"):
+        with pytest.raises(ValueError, match="tiled needs views larger"):
+            detection_settings_from_request(VIEW_PLANS[view_plan])
+
+
+def test_accepts_tiled_for_high_resolution_views():
+    with app.test_request_context("/?tiled=true"):
+        settings = detection_settings_from_request(VIEW_PLANS["grid_12_hd"])
+
+    assert settings.tiled
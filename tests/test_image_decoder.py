@@ -0,0 +1,40 @@
+from math import atan, degrees, tan
+
+import cv2
+import numpy as np
+import pytest
+
+from app.adapters.image_processing.image_decoder import (
+    decode_image,
+    required_equirect_width,
+)
+from app.entities.view_plan import VIEW_PLANS
+
+
+def _edge_pixel_degrees(fov: float, width: int) -> float:
+    # Angle covered by the outermost pixel of a perspective view
+    half = tan(np.radians(fov / 2))
+    return degrees(atan(half) - atan(half * (1 - 2 / width)))
+
+
+@pytest.mark.parametrize("plan_name", sorted(VIEW_PLANS))
+def test_required_width_resolves_view_edges(plan_name):
+    plan = VIEW_PLANS[plan_name]
+
+    width = required_equirect_width(plan)
+
+    assert 360 / width <= _edge_pixel_degrees(plan.fov, plan.output_size[0])
+
+
+def test_decode_keeps_required_width():
+    _, encoded = cv2.imencode(".jpg", np.zeros((2048, 8192, 3), np.uint8))
+    min_width = required_equirect_width(VIEW_PLANS["grid_12"])
+
+    img = decode_image(encoded.tobytes(), min_width)
+
+    assert img.shape[1] == 4096
+
+
+def test_decode_rejects_invalid_content():
+    with pytest.raises(ValueError):
+        decode_image(b"not an image", 1024)
@@ -0,0 +1,137 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from app.adapters.instrumentation.metrics import request_stages, start_request_stages
+from app.gateways.image_downloader import DownloadTooLargeError, ImageDownloader
+
+IMAGE = b"\xff\xd8" + b"x" * 1000
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:  # type: ignore[attr-defined]
+            server.requests.append(self.path)  # type: ignore[attr-defined]
+            server.clients.add(self.client_address)  # type: ignore[attr-defined]
+
+        if self.path.startswith("/image"):
+            self._send(IMAGE)
+        elif self.path == "/slow":
+            time.sleep(1)
+            self._send(IMAGE)
+        elif self.path == "/big":
+            self._send(b"x" * 5000)
+        elif self.path == "/big-unsized":
+            # No Content-Length: the limit is only found while reading
+            self.send_response(200)
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.wfile.write(b"x" * 5000)
+        else:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+    def _send(self, body: bytes):
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.lock = threading.Lock()  # type: ignore[attr-defined]
+    httpd.requests = []  # type: ignore[attr-defined]
+    httpd.clients = set()  # type: ignore[attr-defined]
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _url(server, path: str) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+
+def test_download_returns_content(server):
+    downloader = ImageDownloader(concurrency=2, timeout=5, max_bytes=4096)
+
+    assert downloader.download(_url(server, "/image")) == IMAGE
+
+
+def test_download_times_out(server):
+    downloader = ImageDownloader(concurrency=1, timeout=0.2, max_bytes=4096)
+
+    with pytest.raises(requests.exceptions.Timeout):
+        downloader.download(_url(server, "/slow"))
+
+
+@pytest.mark.parametrize("path", ["/big", "/big-unsized"])
+def test_download_enforces_max_bytes(server, path):
+    downloader = ImageDownloader(concurrency=1, timeout=5, max_bytes=4096)
+
+    with pytest.raises(DownloadTooLargeError):
+        downloader.download(_url(server, path))
+
+
+def test_fetch_settled_reports_errors_per_url(server):
+    downloader = ImageDownloader(concurrency=2, timeout=5, max_bytes=4096)
+    urls = [_url(server, "/image"), _url(server, "/missing")]
+
+    results = {
+        url: (content, error) for url, content, error in downloader.fetch_settled(urls)
+    }
+
+    assert results[urls[0]] == (IMAGE, None)
+    assert isinstance(results[urls[1]][1], requests.exceptions.HTTPError)
+
+
+def test_fetch_raises_download_errors(server):
+    downloader = ImageDownloader(concurrency=2, timeout=5, max_bytes=4096)
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        list(downloader.fetch([_url(server, "/missing")]))
+
+
+def test_sequential_downloads_reuse_the_connection(server):
+    downloader = ImageDownloader(concurrency=1, timeout=5, max_bytes=4096)
+
+    for idx in range(3):
+        downloader.download(_url(server, f"/image?{idx}"))
+
+    assert len(server.requests) == 3
+    assert len(server.clients) == 1
+
+
+def test_fetch_bounds_downloads_ahead_of_the_consumer(server):
+    downloader = ImageDownloader(concurrency=2, timeout=5, max_bytes=4096)
+    urls = [_url(server, f"/image?{idx}") for idx in range(6)]
+
+    results = downloader.fetch(urls)
+    next(results)
+    time.sleep(0.3)
+    assert len(server.requests) == 2
+
+    assert len(list(results)) == 5
+    assert len(server.requests) == 6
+
+
+def test_fetch_records_download_time_in_the_callers_request(server):
+    downloader = ImageDownloader(concurrency=2, timeout=5, max_bytes=4096)
+    start_request_stages()
+
+    list(downloader.fetch([_url(server, f"/image?{idx}") for idx in range(3)]))
+
+    assert request_stages()["download"] > 0
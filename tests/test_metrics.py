@@ -0,0 +1,14 @@
+from app.adapters.instrumentation.metrics import MetricsRegistry
+
+
+def test_set_counter_exports_totals_as_counters():
+    registry = MetricsRegistry()
+
+    registry.set_counter("lookups_total", 3, outcome="hit")
+    registry.set_counter("lookups_total", 5, outcome="hit")
+    registry.set_gauge("queue_depth", 2)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE lookups_total counter" in lines
+    assert 'lookups_total{outcome="hit"} 5' in lines
+    assert "# TYPE queue_depth gauge" in lines
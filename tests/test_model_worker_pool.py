@@ -0,0 +1,65 @@
+import queue
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+import pytest
+
+from app.adapters.image_processing.image_decoder import ImageDecodeError
+from app.entities.detection_settings import DetectionSettings
+from app.entities.view_plan import VIEW_PLANS
+from app.usecases.model_worker_pool import ModelWorkerError, ModelWorkerPool
+
+
+def _pool_without_processes(timeout: float = 5) -> ModelWorkerPool:
+    pool = ModelWorkerPool(workers=1, threads_per_worker=1, timeout=timeout)
+    pool.start = lambda: None  # type: ignore[method-assign]
+    pool._task_queue = queue.Queue()
+    pool._result_queue = queue.Queue()
+    return pool
+
+
+def test_only_decode_errors_keep_their_type():
+    pool = _pool_without_processes()
+    futures = {task_id: Future() for task_id in range(2)}
+    pool._pending.update(futures)
+    pool._result_queue.put((0, None, ("ImageDecodeError", "Could not decode"), {}))
+    pool._result_queue.put((1, None, ("ValueError", "bad model input"), {}))
+
+    threading.Thread(target=pool._collect, daemon=True).start()
+
+    with pytest.raises(ImageDecodeError):
+        futures[0].result(timeout=5)
+    with pytest.raises(ModelWorkerError, match="ValueError: bad model input"):
+        futures[1].result(timeout=5)
+
+
+def test_task_times_out():
+    pool = _pool_without_processes(timeout=0.1)
+    settings = DetectionSettings(model_path="yolo11n.pt", conf=0.5, classes=())
+
+    with pytest.raises(ModelWorkerError, match="timed out"):
+        pool.detect_views(np.zeros((4, 8, 3), np.uint8), VIEW_PLANS["cube_6"], settings)
+    assert pool._pending == {}
+    assert pool._task_queue.qsize() == 1
+
+
+def test_worker_survives_a_task_that_timed_out_while_queued():
+    pool = ModelWorkerPool(workers=1, threads_per_worker=1, warmup=False, timeout=0)
+    img = np.zeros((4, 8, 3), np.uint8)
+    try:
+        # The worker is still starting, so the task times out in the queue
+        # and its shared memory block is gone when the worker gets to it
+        with pytest.raises(ModelWorkerError, match="timed out"):
+            pool._run("views", img, ())
+        pid = pool._processes[0].pid
+
+        # An unknown kind fails in the worker without loading a model; the
+        # error proves the same worker took the next task
+        pool.timeout = 120
+        with pytest.raises(ModelWorkerError, match="KeyError"):
+            pool._run("unknown", img, ())
+        assert pool.stats()["alive"] == 1
+        assert [process.pid for process in pool._processes] == [pid]
+    finally:
+        pool.shutdown()
@@ -0,0 +1,72 @@
+from typing import Any
+
+import numpy as np
+import pytest
+import torch
+from ultralytics import YOLO
+
+from app.adapters.object_detection.onnx_inference import OnnxModel, export_onnx
+from app.adapters.object_detection.yolo_inference import load_model, predict_batch
+from benchmarks.onnx_parity import match_detections, result_to_dicts
+
+CONF = 0.25
+MIN_RECALL = 0.99
+MIN_IOU = 0.99
+MAX_CONFIDENCE_DIFF = 1e-3
+
+
+def _random_weights(path: str) -> str:
+    """
+    A yolo11n with random weights that still detects boxes: its batch norms are
+    calibrated on random images, as untrained activations otherwise vanish, and
+    its class biases raised so a few hundred boxes pass CONF.
+    """
+    torch.manual_seed(0)
+    yolo = YOLO("yolo11n.yaml")
+    model: Any = yolo.model
+    for module in model.modules():
+        if isinstance(module, torch.nn.BatchNorm2d):
+            module.reset_running_stats()
+            module.momentum = None
+    model.train()
+    with torch.no_grad():
+        model(torch.rand(4, 3, 640, 640))
+    model.eval()
+    for branch in model.model[-1].cv3:
+        branch[-1].bias.data += 5
+    yolo.save(path)
+    return path
+
+
+@pytest.fixture(scope="module")
+def models(tmp_path_factory):
+    pytorch_path = _random_weights(str(tmp_path_factory.mktemp("models") / "n.pt"))
+    return load_model(pytorch_path), load_model(export_onnx(pytorch_path))
+
+
+def test_onnx_export_detects_the_same_boxes_as_pytorch(models):
+    pytorch_model, onnx_model = models
+    assert isinstance(onnx_model, OnnxModel)
+    # Views are square, so both backends letterbox them the same way
+    rng = np.random.default_rng(0)
+    imgs = [rng.integers(0, 255, (640, 640, 3), dtype=np.uint8) for _ in range(3)]
+
+    reference = [
+        result_to_dicts(result)
+        for result in predict_batch(pytorch_model, imgs, conf=CONF)
+    ]
+    candidate = [
+        result_to_dicts(result) for result in predict_batch(onnx_model, imgs, conf=CONF)
+    ]
+
+    n_reference = sum(len(dets) for dets in reference)
+    n_candidate = sum(len(dets) for dets in candidate)
+    assert n_reference > 0
+    pairs = [
+        pair
+        for ref_dets, cand_dets in zip(reference, candidate)
+        for pair in match_detections(ref_dets, cand_dets, MIN_IOU)
+    ]
+    assert len(pairs) >= MIN_RECALL * n_reference
+    assert len(pairs) >= MIN_RECALL * n_candidate
+    assert max(pair["confidence_diff"] for pair in pairs) <= MAX_CONFIDENCE_DIFF
@@ -0,0 +1,43 @@
+import numpy as np
+
+from app.usecases.postprocess_detections import batched_non_max_suppression
+
+W_EQ = 2048
+
+
+def test_keeps_highest_score_per_overlapping_class_group():
+    boxes = np.array(
+        [[100, 100, 200, 200], [105, 105, 205, 205], [105, 105, 205, 205]],
+        dtype=float,
+    )
+    scores = np.array([0.6, 0.9, 0.8])
+    class_ids = np.array([56, 56, 57])
+
+    keep = batched_non_max_suppression(boxes, scores, class_ids, 0.5, W_EQ)
+
+    assert keep.tolist() == [1, 2]
+
+
+def test_seam_crossing_box_suppresses_its_left_edge_copy():
+    boxes = np.array([[W_EQ - 50, 100, W_EQ + 50, 200], [0, 100, 50, 200]], float)
+    class_ids = np.array([56, 56])
+
+    keep = batched_non_max_suppression(
+        boxes, np.array([0.9, 0.8]), class_ids, 0.05, W_EQ
+    )
+    assert keep.tolist() == [0]
+
+    keep = batched_non_max_suppression(
+        boxes, np.array([0.8, 0.9]), class_ids, 0.05, W_EQ
+    )
+    assert keep.tolist() == [1]
+
+
+def test_seam_is_ignored_without_wrap_width():
+    boxes = np.array([[W_EQ - 50, 100, W_EQ + 50, 200], [0, 100, 50, 200]], float)
+
+    keep = batched_non_max_suppression(
+        boxes, np.array([0.9, 0.8]), np.array([56, 56]), 0.05
+    )
+
+    assert keep.tolist() == [0, 1]
@@ -0,0 +1,89 @@
+import io
+import json
+
+import pytest
+from flask import Flask
+
+from app.entities.detections import Detections
+from app.gateways.scratch_storage import upload_storage
+from app.routes import process_routes
+from app.routes.process_routes import process_blueprint
+
+
+@pytest.fixture
+def client(monkeypatch):
+    calls = []
+
+    def detect(content, view_plan, settings):
+        calls.append(content)
+        if content == b"broken":
+            raise ValueError("Cannot decode image")
+        return Detections.empty([])
+
+    monkeypatch.setattr(process_routes, "detect_views_in_content", detect)
+    app = Flask(__name__)
+    app.register_blueprint(process_blueprint, url_prefix="/process")
+    client = app.test_client()
+    client.calls = calls  # type: ignore[attr-defined]
+    return client
+
+
+def _files(*contents: bytes):
+    return {
+        "files": [
+            (io.BytesIO(content), f"pano_{idx}.jpg")
+            for idx, content in enumerate(contents)
+        ]
+    }
+
+
+def test_stream_detects_each_upload_as_it_is_consumed(client):
+    response = client.post(
+        "/process/?stream=true", data=_files(b"a", b"broken", b"c"), buffered=False
+    )
+    lines = iter(response.response)
+
+    first = json.loads(next(lines))
+    assert first == {"original_file": "pano_0.jpg", "views_detected": []}
+    assert client.calls == [b"a"]
+
+    rest = [json.loads(line) for line in lines]
+    assert rest == [
+        {"original_file": "pano_1.jpg", "error": "Invalid image: pano_1.jpg"},
+        {"original_file": "pano_2.jpg", "views_detected": []},
+    ]
+    assert client.calls == [b"a", b"broken", b"c"]
+
+
+def test_stream_rejects_oversized_uploads(client, monkeypatch):
+    monkeypatch.setattr(upload_storage, "max_file_bytes", 2)
+
+    response = client.post("/process/?stream=true", data=_files(b"a", b"big"))
+
+    assert response.status_code == 413
+    assert client.calls == []
+
+
+def test_stream_removes_spooled_uploads(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(upload_storage, "root", str(tmp_path))
+
+    response = client.post("/process/?stream=true", data=_files(b"a", b"c"))
+
+    assert len(response.data.splitlines()) == 2
+    response.close()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_failed_spooling_removes_the_upload_dir(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(upload_storage, "root", str(tmp_path))
+
+    def fail(stream, directory, suffix=""):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(upload_storage, "save_upload", fail)
+
+    response = client.post("/process/", data=_files(b"a"))
+
+    assert response.status_code == 500
+    assert list(tmp_path.iterdir()) == []
+    assert upload_storage.stats()["active"] == 0
@@ -0,0 +1,66 @@
+import os
+
+from app.gateways.result_cache import ResultCache
+
+
+def _set_mtime(cache: ResultCache, key: str, mtime: float):
+    os.utime(cache._disk_path(key), (mtime, mtime))
+
+
+def test_memory_tier_evicts_the_least_recently_used_entry():
+    cache = ResultCache(max_entries=2, disk_dir=None)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["memory_entries"] == 2
+
+
+def test_disk_tier_evicts_the_oldest_files_beyond_its_byte_budget(tmp_path):
+    value = "x" * 100  # 102 bytes once encoded
+    cache = ResultCache(max_entries=8, disk_dir=str(tmp_path), disk_max_bytes=250)
+    cache.put("a", value)
+    cache.put("b", value)
+    _set_mtime(cache, "a", 1000)
+    _set_mtime(cache, "b", 2000)
+
+    cache.put("c", value)
+
+    assert sorted(os.listdir(tmp_path)) == ["b.json", "c.json"]
+    assert cache.stats()["disk_bytes"] == 204
+
+
+def test_entry_evicted_from_memory_is_read_back_from_disk(tmp_path):
+    cache = ResultCache(max_entries=1, disk_dir=str(tmp_path))
+    cache.put("a", {"count": 1})
+    cache.put("b", {"count": 2})
+
+    assert cache.get("a") == {"count": 1}
+    assert cache.get("a") == {"count": 1}
+
+    stats = cache.stats()
+    assert (stats["disk_hits"], stats["memory_hits"], stats["misses"]) == (1, 1, 0)
+    assert stats["memory_entries"] == 1
+
+
+def test_disk_tier_survives_a_new_cache_instance(tmp_path):
+    ResultCache(disk_dir=str(tmp_path)).put("a", [1, 2])
+
+    cache = ResultCache(disk_dir=str(tmp_path))
+
+    assert cache.get("a") == [1, 2]
+    assert cache.get("b") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_key_depends_on_content_and_every_param():
+    key = ResultCache.make_key(b"pano", kind="views", format=2)
+
+    assert key == ResultCache.make_key(b"pano", format=2, kind="views")
+    assert key != ResultCache.make_key(b"other", kind="views", format=2)
+    assert key != ResultCache.make_key(b"pano", kind="views", format=3)
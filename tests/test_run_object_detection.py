@@ -0,0 +1,28 @@
+import numpy as np
+
+from app.entities.detections import Detections
+from app.entities.view_metadata import ViewMetadata
+from app.usecases.run_object_detection import _select_tiled_views
+
+
+def _views(angles):
+    img = np.zeros((1024, 1024, 3), np.uint8)
+    return [
+        (img, ViewMetadata(f"v{idx}", yaw, pitch, 90, 1024, 1024))
+        for idx, (yaw, pitch) in enumerate(angles)
+    ]
+
+
+def test_tiles_views_below_the_horizon_first():
+    # Pitch 45 looks up at yaw 180 and down at yaw 0
+    views = _views([(180, 45), (0, 45), (180, -45), (0, -45)])
+    detections = Detections.empty([meta for _, meta in views]).append(
+        np.array([0, 0, 2]),
+        np.zeros(3),
+        np.ones(3),
+        np.zeros((3, 4)),
+    )
+
+    selected = _select_tiled_views(views, detections)
+
+    assert selected == [2, 1, 0, 3]
@@ -0,0 +1,96 @@
+import io
+import os
+import time
+
+import numpy as np
+import pytest
+
+from app.config import REQUEST_MAX_BYTES
+from app.entities.view_metadata import ViewMetadata
+from app.gateways.file_storage import save_views
+from app.gateways.scratch_storage import (
+    ScratchQuotaExceededError,
+    ScratchStorage,
+    UploadTooLargeError,
+)
+from app.main import create_app
+
+
+def _storage(tmp_path, **kwargs) -> ScratchStorage:
+    options = dict(max_bytes=1000, ttl=60, min_free_bytes=0, max_file_bytes=400)
+    options.update(kwargs)
+    return ScratchStorage("test", str(tmp_path / "scratch"), **options)
+
+
+def test_scratch_dir_is_removed_when_the_request_ends(tmp_path):
+    storage = _storage(tmp_path)
+
+    with storage.scratch_dir() as directory:
+        path = storage.save_upload(io.BytesIO(b"x" * 100), directory)
+        assert os.path.getsize(path) == 100
+        assert storage.stats()["bytes"] == 100
+
+    assert not os.path.exists(directory)
+    assert storage.stats()["entries"] == 0
+
+
+def test_kept_dir_expires_after_ttl(tmp_path):
+    storage = _storage(tmp_path, ttl=0.05)
+
+    with storage.scratch_dir(keep=True) as directory:
+        storage.save_upload(io.BytesIO(b"x" * 100), directory)
+    assert os.path.exists(directory)
+
+    time.sleep(0.1)
+    storage.sweep()
+    assert not os.path.exists(directory)
+
+
+def test_save_upload_refuses_oversized_files(tmp_path):
+    storage = _storage(tmp_path)
+
+    with storage.scratch_dir() as directory:
+        with pytest.raises(UploadTooLargeError):
+            storage.save_upload(io.BytesIO(b"x" * 500), directory)
+        assert os.listdir(directory) == []
+        assert storage.stats()["bytes"] == 0
+
+
+def test_save_upload_enforces_the_total_quota(tmp_path):
+    storage = _storage(tmp_path)
+
+    with storage.scratch_dir() as directory:
+        for _ in range(3):
+            storage.save_upload(io.BytesIO(b"x" * 300), directory)
+        with pytest.raises(ScratchQuotaExceededError):
+            storage.save_upload(io.BytesIO(b"x" * 300), directory)
+        assert storage.stats()["bytes"] == 900
+
+
+def test_save_views_reserves_each_view_before_writing_it(tmp_path):
+    storage = _storage(tmp_path, max_bytes=4000)
+    rng = np.random.default_rng(0)
+    views = [
+        (rng.integers(0, 255, (64, 64, 3), dtype=np.uint8), ViewMetadata("", 0, 0, 90))
+        for _ in range(4)
+    ]
+
+    with pytest.raises(ScratchQuotaExceededError):
+        with storage.scratch_dir(keep=True) as directory:
+            save_views(directory, views, lambda size: storage.reserve(directory, size))
+
+    # Nothing past the quota was written, and the failed directory is gone
+    assert not os.path.exists(directory)
+    assert storage.stats()["bytes"] == 0
+
+
+def test_app_caps_the_request_body():
+    app = create_app()
+    assert app.config["MAX_CONTENT_LENGTH"] == REQUEST_MAX_BYTES
+    app.config["MAX_CONTENT_LENGTH"] = 100
+
+    response = app.test_client().post(
+        "/process/", data={"files": (io.BytesIO(b"x" * 1000), "pano.jpg")}
+    )
+
+    assert response.status_code == 413
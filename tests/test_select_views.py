@@ -0,0 +1,16 @@
+import numpy as np
+
+from app.entities.view_plan import VIEW_PLANS
+from app.usecases.select_views import select_views
+
+
+def test_stats_mode_skips_flat_views_and_keeps_textured_ones():
+    # Flat gray panorama with a noisy patch ahead (yaw 0, on the horizon)
+    img = np.full((1024, 2048, 3), 128, np.uint8)
+    rng = np.random.default_rng(0)
+    img[384:640, 896:1152] = rng.integers(0, 255, (256, 256, 3), dtype=np.uint8)
+    view_plan = VIEW_PLANS["cube_6"]
+    assert view_plan.angles[0] == (0, 0)
+
+    assert select_views(img, view_plan, "stats") == [0]
+    assert select_views(img, view_plan, "off") == list(range(6))
@@ -0,0 +1,62 @@
+from math import radians, tan
+
+import numpy as np
+
+from app.adapters.image_processing.coordinate_mapper import (
+    perspective_bboxes_to_equirectangular,
+)
+from app.adapters.tracking.spherical_dedup import spherical_deduplication
+
+W_EQ, H_EQ = 2048, 1024
+VIEW = 512
+FOV = 90
+
+
+def _seen_from(yaw: float, lon_offset: float, shift: float = 0) -> np.ndarray:
+    """
+    Equirectangular box of a 60 px detection on the horizon, lon_offset degrees
+    right of the centre of the view at yaw; shift nudges it like a detector would.
+    """
+    x = (tan(radians(lon_offset)) + 1) / 2 * VIEW + shift
+    y = VIEW / 2 + shift
+    bbox = [x - 30, y - 30, x + 30, y + 30]
+    return perspective_bboxes_to_equirectangular(
+        [bbox], VIEW, VIEW, yaw, 0, FOV, W_EQ, H_EQ
+    )[0]
+
+
+def _dedup(boxes, scores, class_ids) -> list:
+    keep = spherical_deduplication(
+        np.stack(boxes), np.array(scores), np.array(class_ids), W_EQ, H_EQ
+    )
+    return keep.tolist()
+
+
+def test_object_seen_from_two_overlapping_views_is_kept_once():
+    # The views at yaw 0 and 45 both see lon 22.5°, from opposite sides
+    boxes = [_seen_from(0, 22.5), _seen_from(45, -22.5, shift=4)]
+
+    assert _dedup(boxes, [0.7, 0.9], [56, 56]) == [1]
+
+
+def test_distinct_objects_of_the_same_class_are_both_kept():
+    boxes = [_seen_from(0, 0), _seen_from(0, 15)]
+
+    assert _dedup(boxes, [0.9, 0.8], [56, 56]) == [0, 1]
+
+
+def test_same_place_different_class_is_kept():
+    box = _seen_from(0, 0)
+
+    assert _dedup([box, box], [0.9, 0.8], [56, 57]) == [0, 1]
+
+
+def test_object_across_the_seam_is_kept_once():
+    # Lon 185° is seen across the seam from yaw 180 and on the left edge from 225
+    across = _seen_from(180, 5)
+    left_edge = _seen_from(225, -40)
+    assert across[0] < W_EQ < across[2]
+    assert left_edge[2] < W_EQ / 2
+
+    assert _dedup([across, left_edge], [0.6, 0.9], [56, 56]) == [1]
+    assert _dedup([across, left_edge], [0.9, 0.6], [56, 56]) == [0]